@@ -1,8 +1,15 @@
 # FINAL process_pdfs.py SCRIPT (for Docker)
 import fitz
 import json
+import lzma
+import mmap
 import os
+import posixpath
 import re
+import struct
+import tarfile
+import zipfile
+import zlib
 import pandas as pd
 import joblib
 from collections import defaultdict
@@ -10,6 +17,14 @@ from collections import defaultdict
 # --- Configuration ---
 INPUT_DIR = "/app/input"
 OUTPUT_DIR = "/app/output"
+# get_text("dict") without embedded image bytes; only text blocks are used
+TEXT_DICT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+# Bundles in INPUT_DIR are read member by member in memory, never extracted to disk
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+ZIP_LOCAL_HEADER = struct.Struct("<4s22xHH")  # signature, then file name and extra field lengths
+TAR_COMPRESSION_MAGIC = (b"\x1f\x8b", b"BZh", b"\xfd7zXZ")  # gzip, bzip2, xz
+# Raised by corrupt, truncated or mislabeled bundles; bzip2 data errors are OSErrors
+ARCHIVE_ERRORS = (tarfile.TarError, zipfile.BadZipFile, zlib.error, lzma.LZMAError, EOFError, OSError)
 
 # --- Load the Trained Model ---
 # This happens once when the script starts.
@@ -22,7 +37,10 @@ except FileNotFoundError:
 
 # --- Feature Extraction and Line Reconstruction (must match training) ---
 def reconstruct_lines_from_page(page):
-    spans = [span for block in page.get_text("dict")["blocks"] if block['type'] == 0 for line in block['lines'] for span in line['spans']]
+    return reconstruct_lines_from_blocks(page.get_text("dict", flags=TEXT_DICT_FLAGS)["blocks"])
+
+def reconstruct_lines_from_blocks(blocks):
+    spans = [span for block in blocks if block['type'] == 0 for line in block['lines'] for span in line['spans']]
     if not spans: return []
     lines_by_baseline = defaultdict(list)
     for span in spans:
@@ -53,26 +71,31 @@ def extract_features_for_prediction(lines, body_size):
     return pd.DataFrame(features_list)
 
 def find_title(page):
-    lines = reconstruct_lines_from_page(page)
+    return find_title_from_lines(reconstruct_lines_from_page(page))
+
+def find_title_from_lines(lines):
     if not lines: return "Untitled Document"
     max_size = max(line['size'] for line in lines)
     title_parts = [line['text'] for line in lines if line['size'] >= max_size - 1]
     return " ".join(title_parts)
 
-def process_pdf_with_ml(pdf_path):
+def process_pdf_with_ml(pdf_path, pdf_bytes=None):
     if not MODEL: return None
-    doc = fitz.open(pdf_path)
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf") if pdf_bytes is not None else fitz.open(pdf_path)
     if len(doc) == 0: return {"title": "Empty Document", "outline": []}
 
-    title = find_title(doc[0])
+    # Parse each page once; the title, body size and predictions all reuse it
+    page_blocks = [page.get_text("dict", flags=TEXT_DICT_FLAGS)["blocks"] for page in doc]
+    page_lines = [reconstruct_lines_from_blocks(blocks) for blocks in page_blocks]
+    title = find_title_from_lines(page_lines[0])
     
     # Get body size for feature engineering
-    sizes = [round(span['size']) for page in doc for block in page.get_text("dict")['blocks'] if block['type']==0 for line in block['lines'] for span in line['spans']]
+    sizes = [round(span['size']) for blocks in page_blocks for block in blocks if block['type']==0 for line in block['lines'] for span in line['spans']]
     body_size = pd.Series(sizes).mode()[0] if sizes else 10
+    del page_blocks
 
     outline = []
-    for page_num, page in enumerate(doc):
-        lines = reconstruct_lines_from_page(page)
+    for page_num, lines in enumerate(page_lines):
         if not lines: continue
 
         # Predict labels for all lines on the page at once (much faster)
@@ -90,22 +113,100 @@ def process_pdf_with_ml(pdf_path):
     doc.close()
     return {"title": title, "outline": outline}
 
+# --- Archive Input (zip/tar bundles, no temporary files) ---
+def iter_archive_pdfs(archive_path):
+    """Yields (member name, PDF bytes) for each PDF in a zip or tar archive, one buffer at a time."""
+    with open(archive_path, 'rb') as archive_file:
+        # Uncompressed members are sliced straight out of the memory-mapped archive
+        archive_map = mmap.mmap(archive_file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(archive_path) else None
+        try:
+            if zipfile.is_zipfile(archive_file):
+                with zipfile.ZipFile(archive_file) as zip_file:
+                    for info in zip_file.infolist():
+                        if info.is_dir() or not info.filename.lower().endswith(".pdf"): continue
+                        yield info.filename, read_zip_member(zip_file, info, archive_map)
+            else:
+                archive_file.seek(0)
+                # Stream mode reads compressed tars front to back without seeking
+                compressed = archive_map is not None and archive_map[:6].startswith(TAR_COMPRESSION_MAGIC)
+                with tarfile.open(fileobj=archive_file, mode="r|*") as tar_file:
+                    for info in tar_file:
+                        if not info.isfile() or not info.name.lower().endswith(".pdf"): continue
+                        if compressed or info.issparse():
+                            yield info.name, tar_file.extractfile(info).read()
+                        else:
+                            yield info.name, archive_map[info.offset_data:info.offset_data + info.size]
+        finally:
+            if archive_map is not None: archive_map.close()
+
+def read_zip_member(zip_file, info, archive_map):
+    if info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 0x1:
+        signature, name_length, extra_length = ZIP_LOCAL_HEADER.unpack_from(archive_map, info.header_offset)
+        if signature == b"PK\x03\x04":
+            data_offset = info.header_offset + ZIP_LOCAL_HEADER.size + name_length + extra_length
+            return archive_map[data_offset:data_offset + info.compress_size]
+    return zip_file.read(info)  # deflated (or encrypted) members are inflated in memory
+
+def member_output_name(member_name):
+    """Output JSON path for an archive member, kept inside OUTPUT_DIR (e.g. docs/a.pdf -> docs/a.json)."""
+    parts = [part for part in posixpath.normpath(member_name.replace("\\", "/")).split("/") if part not in ("", ".", "..")]
+    return os.path.join(*parts[:-1], os.path.splitext(parts[-1])[0] + ".json")
+
+def unique_output_name(json_filename, used_names, prefix=None):
+    """Returns json_filename, else prefix/json_filename, else a numbered name, so no output overwrites another."""
+    candidates = [json_filename] + ([os.path.join(prefix, json_filename)] if prefix else [])
+    for candidate in candidates:
+        if candidate.lower() not in used_names: break  # lower-cased: output volumes may be case-insensitive
+    else:
+        stem, extension = os.path.splitext(candidates[-1])
+        number = 2
+        while f"{stem}_{number}{extension}".lower() in used_names: number += 1
+        candidate = f"{stem}_{number}{extension}"
+    used_names.add(candidate.lower())
+    if candidate != json_filename:
+        print(f"  -> {json_filename} is already taken, writing {candidate} instead")
+    return candidate
+
+def archive_stem(filename):
+    """Archive file name without its archive suffix, e.g. docs.tar.gz -> docs."""
+    suffix = next(suffix for suffix in ARCHIVE_SUFFIXES if filename.lower().endswith(suffix))
+    return filename[:-len(suffix)]
+
+def write_outline(structured_data, json_filename):
+    output_path = os.path.join(OUTPUT_DIR, json_filename)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(structured_data, f, indent=4, ensure_ascii=False)
+    print(f"  -> Successfully created {json_filename}")
+
 def main():
     print(">>> RUNNING FINAL ML-DRIVEN ENGINE <<<")
     if not os.path.exists(INPUT_DIR): os.makedirs(INPUT_DIR, exist_ok=True)
     if not os.path.exists(OUTPUT_DIR): os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    for filename in os.listdir(INPUT_DIR):
+    # Loose PDFs first, so they keep their plain names when an archive member has the same one
+    filenames = sorted(os.listdir(INPUT_DIR), key=lambda filename: (not filename.lower().endswith(".pdf"), filename))
+    used_names = set()
+    for filename in filenames:
         if filename.lower().endswith(".pdf"):
             pdf_path = os.path.join(INPUT_DIR, filename)
             print(f"Processing {filename} with ML model...")
             structured_data = process_pdf_with_ml(pdf_path)
             if structured_data:
-                json_filename = os.path.splitext(filename)[0] + ".json"
-                output_path = os.path.join(OUTPUT_DIR, json_filename)
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    json.dump(structured_data, f, indent=4, ensure_ascii=False)
-                print(f"  -> Successfully created {json_filename}")
+                write_outline(structured_data, unique_output_name(os.path.splitext(filename)[0] + ".json", used_names))
+        elif filename.lower().endswith(ARCHIVE_SUFFIXES):
+            # Outputs are keyed by member name, as if the bundle had been extracted into INPUT_DIR;
+            # a name already taken moves under the archive's stem (b.zip: a.pdf -> b/a.json)
+            try:
+                for member_name, pdf_bytes in iter_archive_pdfs(os.path.join(INPUT_DIR, filename)):
+                    print(f"Processing {filename}:{member_name} with ML model...")
+                    structured_data = process_pdf_with_ml(member_name, pdf_bytes)
+                    if structured_data:
+                        write_outline(structured_data, unique_output_name(
+                            member_output_name(member_name), used_names, archive_stem(filename)))
+            except ARCHIVE_ERRORS as e:
+                # A corrupt or truncated bundle must not stop the remaining inputs
+                print(f"Skipping archive {filename}: {e}")
     print("Processing finished.")
 
 if __name__ == "__main__":
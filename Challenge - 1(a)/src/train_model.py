@@ -1,48 +1,222 @@
+import argparse
+import json
+import math
+import os
+import time
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.utils.class_weight import compute_class_weight
 import joblib
 
+# Define the features the model will use to learn
+FEATURES = [
+    'font_size', 'size_vs_body', 'is_bold', 'y_pos',
+    'line_length', 'word_count', 'is_all_caps',
+    'starts_with_number', 'ends_with_colon'
+]
+DATA_FILENAME = "labeled_data.csv"
+MODEL_FILENAME = "document_outline_model.pkl"
+# Holdout accuracy, size and training time of the last full retrain, plus the updates since
+STATE_FILENAME = "training_state.json"
+N_ESTIMATORS = 150
+TEST_SIZE = 0.25
+RANDOM_STATE = 42
+
+def split_labeled_data(data):
+    """The train/test split of a full retrain; the same rows always give the same split."""
+    return train_test_split(data[FEATURES], data['label'], test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=data['label'])
+
+def fit_full_model(data):
+    """Trains a fresh forest on the training split. Returns the model, its holdout accuracy and the training seconds."""
+    X_train, X_test, y_train, y_test = split_labeled_data(data)
+    model = RandomForestClassifier(n_estimators=N_ESTIMATORS, random_state=RANDOM_STATE, class_weight='balanced')
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    seconds = time.perf_counter() - start
+    return model, accuracy_score(y_test, model.predict(X_test)), seconds, (X_test, y_test)
+
+def load_state():
+    if not os.path.exists(STATE_FILENAME): return None
+    with open(STATE_FILENAME, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_state(state):
+    with open(STATE_FILENAME, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
 def train():
     """Trains a classifier on the labeled data and saves the model."""
     print("Loading labeled data...")
     try:
-        data = pd.read_csv("labeled_data.csv")
+        data = pd.read_csv(DATA_FILENAME)
     except FileNotFoundError:
         print("Error: 'labeled_data.csv' not found. Please complete the labeling step first.")
         return
 
     print(f"Training on {len(data)} labeled examples.")
 
-    # Define the features the model will use to learn
-    features = [
-        'font_size', 'size_vs_body', 'is_bold', 'y_pos', 
-        'line_length', 'word_count', 'is_all_caps', 
-        'starts_with_number', 'ends_with_colon'
-    ]
-    
-    X = data[features]
-    y = data['label']
-
-    # Split data to test the model's performance
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.25, random_state=42, stratify=y)
-
     print("Training the RandomForest model...")
-    model = RandomForestClassifier(n_estimators=150, random_state=42, class_weight='balanced')
-    model.fit(X_train, y_train)
+    model, accuracy, seconds, (X_test, y_test) = fit_full_model(data)
 
     # --- Evaluate the Model ---
     print("\n--- Model Performance Report ---")
     predictions = model.predict(X_test)
     print(classification_report(y_test, predictions))
+    print(f"Holdout accuracy: {accuracy:.4f}, training time: {seconds:.2f}s")
     print("--------------------------------\n")
-    
+
     # --- Save the Final Model ---
-    model_filename = 'document_outline_model.pkl'
-    joblib.dump(model, model_filename)
-    print(f"Model successfully trained and saved to '{model_filename}'!")
+    joblib.dump(model, MODEL_FILENAME)
+    # Incremental updates are judged against this run's accuracy and cost
+    save_state({"full_retrain": {"rows": len(data), "accuracy": accuracy, "seconds": seconds, "estimators": N_ESTIMATORS},
+                "incremental_rows": 0, "updates": []})
+    print(f"Model successfully trained and saved to '{MODEL_FILENAME}'!")
     print("Next Step: Copy this .pkl file and the new 'process_pdfs.py' to your final Docker project folder.")
 
+# --- Incremental Updates (warm start) ---
+def sample_replay(train_rows, size, min_per_class):
+    """Stratified sample of already-trained rows, with every class represented so warm-started trees keep all labels."""
+    fraction = min(1.0, size / max(len(train_rows), 1))
+    return train_rows.groupby('label', group_keys=False).apply(
+        lambda rows: rows.sample(n=min(len(rows), max(min_per_class, round(len(rows) * fraction))), random_state=RANDOM_STATE))
+
+def split_new_batch(batch):
+    """Holds out part of the new batch to measure how well the update learned it; tiny batches are all used for training."""
+    if len(batch) < 4: return batch, batch.iloc[0:0]
+    stratify = batch['label'] if batch['label'].value_counts().min() >= 2 else None
+    return train_test_split(batch, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=stratify)
+
+def accuracy_margin(accuracy, sample_count):
+    """Two standard errors of an accuracy measured on sample_count rows: a small batch holdout is noisy."""
+    return 2 * math.sqrt(accuracy * (1 - accuracy) / sample_count)
+
+def full_retrain_reason(state, model, batch, args):
+    """Why this batch needs a full retrain instead of a warm start, or None."""
+    if state is None or model is None:
+        return "no model or full-retrain record to update"
+    unknown_labels = set(batch['label']) - set(model.classes_)
+    if unknown_labels:
+        return f"new labels {sorted(unknown_labels)} (warm-started trees cannot add classes)"
+    if model.n_estimators + args.new_estimators > args.max_estimators:
+        return f"the forest would grow past {args.max_estimators} estimators"
+    incremental_rows = state["incremental_rows"] + len(batch)
+    if incremental_rows > args.max_incremental_fraction * state["full_retrain"]["rows"]:
+        return f"{incremental_rows} rows added since the last full retrain of {state['full_retrain']['rows']}"
+    return None
+
+def append_batch(batch):
+    """Adds the new batch to the labeled data, so the next full retrain sees every row."""
+    batch.to_csv(DATA_FILENAME, mode='a', header=False, index=False)
+
+def train_incremental(batch_path, args):
+    """Grows the saved forest with new estimators trained on a new batch plus a replay sample, or retrains fully when needed."""
+    print(f"Loading new batch '{batch_path}' and labeled data...")
+    try:
+        data = pd.read_csv(DATA_FILENAME)
+        batch = pd.read_csv(batch_path)
+    except FileNotFoundError as e:
+        print(f"Error: {e.filename} not found.")
+        return
+    batch = batch[data.columns]
+    state = load_state()
+    model = joblib.load(MODEL_FILENAME) if os.path.exists(MODEL_FILENAME) else None
+
+    reason = full_retrain_reason(state, model, batch, args)
+    if reason:
+        print(f"Full retrain needed: {reason}.")
+        append_batch(batch)
+        train()
+        return
+
+    # Rows of the last full retrain keep their split: its holdout is never replayed, so it measures forgetting
+    full_rows = data.iloc[:state["full_retrain"]["rows"]]
+    _, X_holdout, _, y_holdout = split_labeled_data(full_rows)
+    train_rows = data.drop(index=X_holdout.index)
+    batch_train, batch_test = split_new_batch(batch)
+    replay = sample_replay(train_rows, args.replay_ratio * len(batch_train), args.min_replay_per_class)
+    update_rows = pd.concat([batch_train, replay])
+    print(f"Warm-starting {args.new_estimators} new estimators on {len(batch_train)} new and {len(replay)} replayed rows...")
+
+    accuracy_before = accuracy_score(batch_test['label'], model.predict(batch_test[FEATURES])) if len(batch_test) else None
+    # 'balanced' would weigh classes by the update rows only; weigh them as a full retrain on all rows would
+    all_labels = pd.concat([train_rows['label'], batch_train['label']])
+    class_weight = dict(zip(model.classes_, compute_class_weight('balanced', classes=model.classes_, y=all_labels)))
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + args.new_estimators, class_weight=class_weight)
+    start = time.perf_counter()
+    model.fit(update_rows[FEATURES], update_rows['label'])
+    seconds = time.perf_counter() - start
+    model.set_params(warm_start=False, class_weight='balanced')
+
+    holdout_accuracy = accuracy_score(y_holdout, model.predict(X_holdout))
+    batch_accuracy = accuracy_score(batch_test['label'], model.predict(batch_test[FEATURES])) if len(batch_test) else None
+    baseline = state["full_retrain"]
+    # A full retrain costs roughly its recorded time, scaled to the rows it would now train on
+    estimated_full_seconds = baseline["seconds"] * (len(data) + len(batch)) / baseline["rows"]
+    print("\n--- Incremental Update Report ---")
+    if len(batch_test):
+        print(f"New-batch holdout accuracy: {accuracy_before:.4f} before, {batch_accuracy:.4f} after")
+    print(f"Original holdout accuracy: {holdout_accuracy:.4f} (last full retrain: {baseline['accuracy']:.4f})")
+    print(f"Training time: {seconds:.2f}s incremental vs ~{estimated_full_seconds:.2f}s estimated full retrain")
+    if args.compare:
+        # A fresh forest on every row the update could have used, scored on the same holdouts
+        full_rows = pd.concat([train_rows, batch_train])
+        full_model = RandomForestClassifier(n_estimators=N_ESTIMATORS, random_state=RANDOM_STATE, class_weight='balanced')
+        start = time.perf_counter()
+        full_model.fit(full_rows[FEATURES], full_rows['label'])
+        full_seconds = time.perf_counter() - start
+        full_batch_accuracy = f", new-batch holdout {accuracy_score(batch_test['label'], full_model.predict(batch_test[FEATURES])):.4f}" if len(batch_test) else ""
+        print(f"Measured full retrain: original holdout {accuracy_score(y_holdout, full_model.predict(X_holdout)):.4f}"
+              f"{full_batch_accuracy}, {full_seconds:.2f}s")
+    print("---------------------------------\n")
+
+    # The update must neither forget the old data nor fall short of what a full retrain reached on it
+    if holdout_accuracy < baseline["accuracy"] - args.max_accuracy_drop:
+        print(f"Full retrain needed: holdout accuracy fell more than {args.max_accuracy_drop:.2%} below the last full retrain.")
+        append_batch(batch)
+        train()
+        return
+    if batch_accuracy is not None and batch_accuracy < (baseline["accuracy"] - args.max_accuracy_drop
+                                                        - accuracy_margin(baseline["accuracy"], len(batch_test))):
+        print(f"Full retrain needed: the new batch is learned to only {batch_accuracy:.4f} "
+              f"(last full retrain: {baseline['accuracy']:.4f}).")
+        append_batch(batch)
+        train()
+        return
+
+    joblib.dump(model, MODEL_FILENAME)
+    append_batch(batch)
+    state["incremental_rows"] += len(batch)
+    state["updates"].append({"rows": len(batch), "replayed": len(replay), "estimators": model.n_estimators,
+                             "holdout_accuracy": holdout_accuracy, "batch_accuracy": batch_accuracy, "seconds": seconds})
+    save_state(state)
+    print(f"Model updated to {model.n_estimators} estimators and saved to '{MODEL_FILENAME}'.")
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Train the document outline classifier")
+    parser.add_argument("--incremental", metavar="NEW_CSV",
+                        help="grow the saved model with a batch of newly labeled lines (same columns as labeled_data.csv)")
+    parser.add_argument("--new-estimators", type=int, default=50,
+                        help="estimators added per update (default: 50)")
+    parser.add_argument("--replay-ratio", type=float, default=2.0,
+                        help="already-trained rows replayed per new training row (default: 2.0)")
+    parser.add_argument("--min-replay-per-class", type=int, default=5,
+                        help="replayed rows kept for every label, so rare headings are not forgotten (default: 5)")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.01,
+                        help="retrain fully if the original or new-batch holdout accuracy is more than this below "
+                             "the last full retrain's (default: 0.01)")
+    parser.add_argument("--max-incremental-fraction", type=float, default=0.5,
+                        help="retrain fully once rows added since the last full retrain exceed this share of it (default: 0.5)")
+    parser.add_argument("--max-estimators", type=int, default=3 * N_ESTIMATORS,
+                        help=f"retrain fully rather than grow the forest past this size (default: {3 * N_ESTIMATORS})")
+    parser.add_argument("--compare", action="store_true",
+                        help="also run a full retrain on the combined data, without saving it, and report its accuracy and time")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    arguments = parse_arguments()
+    if arguments.incremental:
+        train_incremental(arguments.incremental, arguments)
+    else:
+        train()
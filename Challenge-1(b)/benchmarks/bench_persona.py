@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Persona scoring benchmark for Challenge 1B
+Adobe India Hackathon 2025
+
+Compares PersonaProcessor's single-scan keyword matching against the
+previous per-scorer tokenization and substring scans (kept below as a
+reference) on synthetic collections with thousands of sections, and
+checks the results match.
+"""
+
+import random
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from persona_processor import PersonaProcessor
+
+
+# ----------------- Legacy Per-Scorer Tokenization -----------------
+
+class LegacyPersonaProcessor(PersonaProcessor):
+    """Previous scoring: every scorer lowercases and re-tokenizes the section"""
+
+    def process_with_persona(self, doc_analysis: Dict[str, Any], user_persona: Dict[str, str], user_job: Dict[str, str]) -> Dict[str, Any]:
+        role_description = user_persona.get("role", "").lower()
+        task_description = user_job.get("task", "").lower()
+        role = self._classify_user_role(role_description)
+        task = self._classify_user_task(task_description)
+        sections = [self._legacy_augment(section, role, task, task_description)
+                    for section in doc_analysis.get("sections", [])]
+        return {"persona_type": role, "persona_role": role_description, "job_type": task_description,
+                "job_context": task_description, "sections": sections}
+
+    def _legacy_augment(self, section_data: Dict[str, Any], role: str, task: str, task_description: str) -> Dict[str, Any]:
+        content = section_data.get("content", "")
+        combined = content + " " + section_data.get("section_title", "")
+        relevance = self._legacy_relevance(combined, role, task, task_description)
+        observations = self._legacy_observations(content, role, task)
+        concepts = self._legacy_concepts(content, role)
+        augmented = section_data.copy()
+        augmented.update({
+            "persona_relevance_score": relevance,
+            "persona_insights": observations,
+            "key_concepts": concepts,
+            "persona_priority": self._determine_importance_level(relevance, observations, concepts),
+            "job_alignment_score": self._legacy_alignment(combined, task_description)
+        })
+        return augmented
+
+    def _legacy_relevance(self, text: str, role: str, task: str, task_description: str) -> float:
+        tokens = re.findall(r'\b\w+\b', text.lower())
+        if not tokens:
+            return 0.0
+        role_terms = self.role_terms.get(role, [])
+        task_terms = self.task_terms.get(task, [])
+        task_words = set(re.findall(r'\b\w+\b', task_description.lower()))
+        role_relevance = sum(1 for t in tokens if t in role_terms) / len(tokens)
+        task_relevance = sum(1 for t in tokens if t in task_terms) / len(tokens)
+        direct_relevance = sum(1 for t in tokens if t in task_words and len(t) > 3) / len(tokens)
+        return min((0.4 * role_relevance + 0.3 * task_relevance + 0.3 * direct_relevance) * 10, 1.0)
+
+    def _legacy_observations(self, text: str, role: str, task: str) -> List[str]:
+        lower_text = text.lower()
+        rules = self.role_insight_rules.get(role, []) + self.task_insight_rules.get(task, [])
+        return [insight for keywords, insight in rules
+                if any(keyword in lower_text for keyword in keywords)]
+
+    def _legacy_concepts(self, text: str, role: str) -> List[str]:
+        tokens = re.findall(r'\b\w+\b', text.lower())
+        applicable = self.role_terms.get(role, [])
+        frequency = Counter(tokens)
+        concepts = []
+        for token in tokens:
+            if token in applicable and frequency[token] >= 1 and len(token) > 3 and token not in concepts:
+                concepts.append(token)
+        return concepts[:10]
+
+    def _legacy_alignment(self, text: str, task_description: str) -> float:
+        job_keywords = set(re.findall(r'\b\w{4,}\b', task_description.lower()))
+        content_words = set(re.findall(r'\b\w{4,}\b', text.lower()))
+        if not job_keywords:
+            return 0.0
+        return min(len(job_keywords & content_words) / len(job_keywords), 1.0)
+
+
+# ----------------- Synthetic Collection -----------------
+
+WORDS = (
+    "research study analysis methodology data experiment results conclusion findings "
+    "learn concept theory example exercise practice review summary overview evaluate "
+    "trend pattern metric performance forecast comparison versus dataset sample approach "
+    "the a of and to in for with on at by from is are was this that it as be"
+).split()
+
+
+def build_synthetic_analysis(section_count: int, seed: int = 5) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    sections = []
+    for section_index in range(section_count):
+        sections.append({
+            "section_title": " ".join(rng.choice(WORDS).title() for _ in range(4)),
+            "content": " ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 300))),
+            "page_number": section_index // 20 + 1,
+            "detection_method": "paragraph"
+        })
+    return {"sections": sections}
+
+
+def _time_processing(processor: PersonaProcessor, analysis: Dict[str, Any], persona: Dict[str, str], job: Dict[str, str]):
+    start = time.perf_counter()
+    result = processor.process_with_persona(analysis, persona, job)
+    return time.perf_counter() - start, result
+
+
+def run_benchmark(section_count: int = 5000) -> bool:
+    analysis = build_synthetic_analysis(section_count)
+    persona = {"role": "PhD Researcher in Computational Biology"}
+    job = {"task": "Prepare a comprehensive literature review focusing on methodologies, datasets, and performance benchmarks"}
+
+    legacy_time, legacy_result = _time_processing(LegacyPersonaProcessor(), analysis, persona, job)
+    shared_time, shared_result = _time_processing(PersonaProcessor(), analysis, persona, job)
+
+    identical = legacy_result["sections"] == shared_result["sections"]
+    print(f"Sections: {section_count}")
+    print(f"Per-scorer tokenization and scans: {legacy_time:.2f} s")
+    print(f"Single-scan keyword matching: {shared_time:.2f} s")
+    print(f"Speedup: {legacy_time / max(shared_time, 1e-9):.2f}x")
+    print(f"Identical scores: {identical}")
+    return identical
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000) else 1)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark and regression gate for Challenge 1B
+Adobe India Hackathon 2025
+
+Runs batch mode (DocumentAnalyzer -> PersonaProcessor -> SectionRanker) on the
+bundled collections and on synthetic collections scaled 10x and 100x. Every
+scale runs in a fresh process so its peak RSS is isolated. Results are
+compared with a JSON baseline and the run fails when throughput or peak memory
+regress beyond the tolerance. test_solution.py reports the 1x run and only
+fails on a regression when CHALLENGE1B_PERF_GATE=1, since timings on shared
+machines are too noisy for the regular suite.
+
+Usage:
+    python benchmarks/bench_pipeline.py                       # compare with the baseline
+    python benchmarks/bench_pipeline.py --scales 1 10 100     # include the 100x collection
+    python benchmarks/bench_pipeline.py --update-baseline     # record a new baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Any
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(PROJECT_ROOT / "src"))
+
+import fitz  # PyMuPDF
+
+from memory_monitor import peak_rss_bytes, MEBIBYTE
+
+
+BUNDLED_COLLECTIONS = ("Collection 1", "Collection 2", "Collection 3")
+BASELINE_PATH = PROJECT_ROOT / "benchmarks" / "pipeline_baseline.json"
+DEFAULT_SCALES = (1, 10)
+DEFAULT_TOLERANCE = 0.3
+# Set to 1 to make test_solution.py fail on a regression against the baseline
+GATE_ENV_VAR = "CHALLENGE1B_PERF_GATE"
+
+
+def build_scaled_collection(collection_dir: Path, scale: int, target_dir: Path) -> Path:
+    """
+    Write a collection with every PDF repeated scale times and return its query path.
+
+    Copies differ only in their metadata, so their content hashes differ and the
+    document pool analyzes each of them.
+    """
+    query_data = json.loads((collection_dir / "challenge1b_input.json").read_text(encoding="utf-8"))
+    if scale == 1:
+        return collection_dir / "challenge1b_input.json"
+
+    (target_dir / "PDFs").mkdir(parents=True, exist_ok=True)
+    scaled_documents = []
+    for document_item in query_data["documents"]:
+        source_doc = fitz.open(collection_dir / "PDFs" / document_item["filename"])
+        source_stem = Path(document_item["filename"]).stem
+        for copy_index in range(scale):
+            copy_name = f"{source_stem} - copy {copy_index + 1}.pdf"
+            source_doc.set_metadata({"subject": f"benchmark copy {copy_index + 1}"})
+            source_doc.save(target_dir / "PDFs" / copy_name)
+            scaled_documents.append({"filename": copy_name, "title": Path(copy_name).stem})
+        source_doc.close()
+
+    query_data["documents"] = scaled_documents
+    query_data["challenge_info"]["challenge_id"] += f"_x{scale}"
+    query_path = target_dir / "challenge1b_input.json"
+    query_path.write_text(json.dumps(query_data, indent=2), encoding="utf-8")
+    return query_path
+
+
+def count_workload(query_paths: List[Path]) -> Dict[str, int]:
+    """Count the documents and pages a set of queries covers."""
+    document_count = 0
+    page_count = 0
+    for query_path in query_paths:
+        query_data = json.loads(query_path.read_text(encoding="utf-8"))
+        for document_item in query_data["documents"]:
+            with fitz.open(query_path.parent / "PDFs" / document_item["filename"]) as pdf_doc:
+                page_count += pdf_doc.page_count
+            document_count += 1
+    return {"documents": document_count, "pages": page_count}
+
+
+def run_queries(query_paths: List[str], output_directory: str) -> Dict[str, Any]:
+    """Time the batch pipeline over the queries in this process."""
+    from process_pdfs import process_query_batch
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        pool_stats = process_query_batch(query_paths, output_directory)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "documents_analyzed": pool_stats["documents_analyzed"],
+        "peak_rss_mb": round(peak_rss_bytes() / MEBIBYTE, 1)
+    }
+
+
+def measure_scale(scale: int) -> Dict[str, Any]:
+    """Build one scale's collections, then run the pipeline on them in a fresh process."""
+    with tempfile.TemporaryDirectory(prefix=f"bench_x{scale}_") as work_dir:
+        query_paths = [
+            build_scaled_collection(PROJECT_ROOT / collection_name, scale, Path(work_dir) / collection_name)
+            for collection_name in BUNDLED_COLLECTIONS
+        ]
+        workload = count_workload(query_paths)
+        child = subprocess.run(
+            [sys.executable, __file__, "--run-queries", str(Path(work_dir) / "output")]
+            + [str(query_path) for query_path in query_paths],
+            capture_output=True, text=True, check=True
+        )
+        run_stats = json.loads(child.stdout.strip().splitlines()[-1])
+
+    return {
+        "documents": workload["documents"],
+        "pages": workload["pages"],
+        "seconds": run_stats["seconds"],
+        "documents_per_second": round(workload["documents"] / run_stats["seconds"], 2),
+        "pages_per_second": round(workload["pages"] / run_stats["seconds"], 2),
+        "peak_rss_mb": run_stats["peak_rss_mb"]
+    }
+
+
+def gate_enabled() -> bool:
+    """Whether the regular test suite should fail on a baseline regression."""
+    return os.environ.get(GATE_ENV_VAR) == "1"
+
+
+def compare_with_baseline(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any],
+                          tolerance: float) -> List[str]:
+    """Return a message for every scale whose throughput or peak memory regressed."""
+    regressions = []
+    for scale, result in results.items():
+        expected = baseline["results"].get(scale)
+        if expected is None:
+            continue
+        min_throughput = expected["pages_per_second"] * (1 - tolerance)
+        if result["pages_per_second"] < min_throughput:
+            regressions.append(
+                f"x{scale}: throughput {result['pages_per_second']} pages/s "
+                f"below {min_throughput:.2f} (baseline {expected['pages_per_second']})"
+            )
+        max_peak_rss = expected["peak_rss_mb"] * (1 + tolerance)
+        if result["peak_rss_mb"] > max_peak_rss:
+            regressions.append(
+                f"x{scale}: peak RSS {result['peak_rss_mb']} MiB "
+                f"above {max_peak_rss:.1f} (baseline {expected['peak_rss_mb']})"
+            )
+    return regressions
+
+
+def run_benchmark(scales: List[int], tolerance: float = None, update_baseline: bool = False,
+                  baseline_path: Path = BASELINE_PATH) -> List[str]:
+    """Measure the scales, print a table and gate against (or record) the baseline."""
+    results = {}
+    for scale in scales:
+        results[str(scale)] = result = measure_scale(scale)
+        print(f"x{scale:<4} {result['documents']:>5} docs {result['pages']:>6} pages "
+              f"{result['seconds']:>8.2f} s {result['pages_per_second']:>8.1f} pages/s "
+              f"{result['peak_rss_mb']:>7.1f} MiB peak RSS")
+
+    if update_baseline:
+        baseline = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "tolerance": tolerance if tolerance is not None else DEFAULT_TOLERANCE,
+            "results": results
+        }
+        baseline_path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline written to {baseline_path}")
+        return []
+
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline to record one")
+        return []
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    if tolerance is None:
+        tolerance = baseline.get("tolerance", DEFAULT_TOLERANCE)
+    regressions = compare_with_baseline(results, baseline, tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"Within {tolerance:.0%} of baseline")
+    return regressions
+
+
+def parse_arguments(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Challenge 1B pipeline benchmark and regression gate")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES),
+                        help="collection scale factors to run (default: 1 10)")
+    parser.add_argument("--tolerance", type=float,
+                        help="allowed fractional regression (default: the baseline's, else 0.3)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline JSON path")
+    parser.add_argument("--update-baseline", action="store_true", help="record results as the new baseline")
+    parser.add_argument("--run-queries", nargs="+", metavar=("OUTPUT_DIR", "INPUT_JSON"),
+                        help=argparse.SUPPRESS)  # child process entry point
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    if arguments.run_queries:
+        output_directory, *query_paths = arguments.run_queries
+        print(json.dumps(run_queries(query_paths, output_directory)))
+        sys.exit(0)
+    sys.exit(1 if run_benchmark(arguments.scales, arguments.tolerance,
+                                arguments.update_baseline, arguments.baseline) else 0)
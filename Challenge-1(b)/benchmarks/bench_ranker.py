@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Section ranking benchmark for Challenge 1B
+Adobe India Hackathon 2025
+
+Times CorpusIndex construction, batched query scoring, full ranking and
+streaming top-K ranking in SectionRanker on large synthetic collections
+(100k+ sections by default).
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+from itertools import groupby
+from pathlib import Path
+from typing import Dict, List, Any
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from section_ranker import SectionRanker
+
+
+VOCABULARY = (
+    "trip travel group friends hotel restaurant beach city museum tour budget plan day night "
+    "form fillable signature document acrobat export share edit create convert onboarding "
+    "recipe vegetarian buffet dinner lunch breakfast menu gluten ingredient cook serve "
+    "the a of and to in for with on at by from is are was this that it as be"
+).split()
+
+
+def build_synthetic_sections(section_count: int, seed: int = 11) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    sections = []
+    for section_index in range(section_count):
+        word_count = rng.randint(20, 200)
+        sections.append({
+            "document": f"doc_{section_index // 50}.pdf",
+            "section_title": f"Section {section_index}",
+            "content": " ".join(rng.choice(VOCABULARY) for _ in range(word_count)),
+            "page_number": (section_index % 50) + 1
+        })
+    return sections
+
+
+def run_benchmark(section_count: int = 100000, top_k: int = 15) -> None:
+    sections = build_synthetic_sections(section_count)
+    ranker = SectionRanker()
+    persona = {"role": "Travel Planner"}
+    job = {"task": "Plan a trip of 4 days for a group of 10 college friends."}
+
+    start = time.perf_counter()
+    corpus_index = ranker.build_corpus_index(sections)
+    index_time = time.perf_counter() - start
+
+    context_info = ranker._build_persona_context(persona, job)
+    start = time.perf_counter()
+    ranker._compute_tfidf_relevance(corpus_index, context_info)
+    query_time = time.perf_counter() - start
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    ranked = ranker.rank_sections(sections, persona, job, corpus_index=corpus_index)
+    rank_time = time.perf_counter() - start
+    rank_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    stream_baseline = tracemalloc.get_traced_memory()[0]  # the full ranking is still alive
+
+    start = time.perf_counter()
+    document_streams = (iter(document_sections) for _, document_sections
+                        in groupby(sections, key=lambda section: section["document"]))
+    streamed = ranker.rank_documents_top_k(document_streams, persona, job, top_k, corpus_index)
+    stream_time = time.perf_counter() - start
+    stream_peak = tracemalloc.get_traced_memory()[1] - stream_baseline
+    tracemalloc.stop()
+
+    print(f"Sections: {section_count}, vocabulary: {len(corpus_index.vocabulary)} terms")
+    print(f"Index build: {index_time:.2f} s ({section_count / index_time:,.0f} sections/s)")
+    print(f"Batched query scoring: {query_time * 1000:.1f} ms")
+    print(f"rank_sections with prebuilt index: {rank_time:.2f} s, peak {rank_peak / 2**20:.1f} MiB")
+    print(f"Streaming top-{top_k} with running merge: {stream_time:.2f} s, peak {stream_peak / 2**20:.1f} MiB, "
+          f"identical: {streamed == ranked[:top_k]}")
+    print(f"Top section: {ranked[0]['section_title']} ({ranked[0]['final_relevance_score']:.4f})")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
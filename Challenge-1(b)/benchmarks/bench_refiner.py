@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Sentence refinement benchmark for Challenge 1B
+Adobe India Hackathon 2025
+
+Times SentenceRefiner's batched sparse scoring of every sentence in a large
+synthetic collection against a per-sentence dictionary implementation of the
+same scoring, and checks that both give the same scores.
+"""
+
+import math
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from sentence_refiner import SentenceRefiner
+
+
+VOCABULARY = (
+    "trip travel group friends hotel restaurant beach city museum tour budget plan day night "
+    "form fillable signature document acrobat export share edit create convert onboarding "
+    "recipe vegetarian buffet dinner lunch breakfast menu gluten ingredient cook serve "
+    "the a of and to in for with on at by from is are was this that it as be"
+).split()
+
+
+def build_synthetic_sections(section_count: int, seed: int = 11) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    sections = []
+    for section_index in range(section_count):
+        sentences = [
+            " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(6, 30))).capitalize() + "."
+            for _ in range(rng.randint(3, 25))
+        ]
+        sections.append({"section_title": f"Section {section_index}", "content": " ".join(sentences)})
+    return sections
+
+
+def score_sentences_one_by_one(refiner: SentenceRefiner, sentences: List[str], query_text: str) -> List[float]:
+    """Reference scoring: each sentence's term counts compared with the query separately."""
+    sentence_terms = [refiner._term_counts(sentence) for sentence in sentences]
+    document_frequency = Counter(column for terms in sentence_terms for column in terms)
+    query_terms = refiner._term_counts(query_text)
+    scores = []
+    for terms in sentence_terms:
+        dot_product = 0.0
+        for column, count in terms.items():
+            if column in query_terms:
+                idf = math.log((1 + len(sentences)) / (1 + document_frequency[column])) + 1.0
+                dot_product += count * query_terms[column] * idf * idf
+        norm = math.sqrt(sum(count * count for count in terms.values()))
+        scores.append(dot_product / norm if dot_product else 0.0)
+    return scores
+
+
+def run_benchmark(section_count: int = 20000) -> None:
+    sections = build_synthetic_sections(section_count)
+    refiner = SentenceRefiner()
+    persona = {"role": "Travel Planner"}
+    job = {"task": "Plan a trip of 4 days for a group of 10 college friends."}
+    query_text = f"{persona['role']} {job['task']}"
+    sentences = [sentence for section in sections for sentence in refiner.split_sentences(section["content"])]
+
+    start = time.perf_counter()
+    reference_scores = score_sentences_one_by_one(refiner, sentences, query_text)
+    reference_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched_scores = refiner.score_sentences(sentences, query_text)
+    batched_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    refined_texts = refiner.refine_sections(sections, persona, job)
+    refine_time = time.perf_counter() - start
+
+    identical = all(abs(batched - reference) < 1e-9 for batched, reference in zip(batched_scores, reference_scores))
+    print(f"Sections: {section_count}, sentences: {len(sentences)}")
+    print(f"Per-sentence dictionary scoring: {reference_time:.2f} s")
+    print(f"Batched sparse scoring: {batched_time:.2f} s ({len(sentences) / batched_time:,.0f} sentences/s), "
+          f"identical: {identical}")
+    print(f"refine_sections (split, score, select): {refine_time:.2f} s, "
+          f"longest refined text: {max(len(text) for text in refined_texts)} chars")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Section detection benchmark for Challenge 1B
+Adobe India Hackathon 2025
+
+Compares the single-pass line scanner in DocumentAnalyzer._detect_sections
+against the previous three-pass detector (kept below as a reference).
+Paragraph and list detections must be identical. Header sections may
+differ where the old rescan anchored a header's content on an earlier line
+that merely contained the title; the scanner cuts from the header's own line.
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Any
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from document_analyzer import DocumentAnalyzer
+
+
+# ----------------- Legacy Three-Pass Detector -----------------
+
+class LegacyDetector(DocumentAnalyzer):
+    """Previous detector: three passes, each re-splitting every page"""
+
+    def detect_raw(self, pages: List[Dict]) -> List[Dict[str, Any]]:
+        sections = []
+        sections.extend(self._legacy_headers(pages))
+        sections.extend(self._legacy_paragraphs(pages))
+        sections.extend(self._legacy_lists(pages))
+        return sections
+
+    def _legacy_headers(self, pages: List[Dict]) -> List[Dict[str, Any]]:
+        patterns = [
+            r'^([A-Z][A-Z\s]{5,40})$',
+            r'^(\d+\.?\s+[A-Z][^.!?]*?)(?:\n|$)',
+            r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*):',
+            r'(?:Chapter|Section)\s+\d+[:\-\s]*(.+)',
+        ]
+        sections = []
+        for page_info in pages:
+            page_text = page_info["text"]
+            for line in page_text.split('\n'):
+                line = line.strip()
+                if not (line and len(line) >= 5):
+                    continue
+                title = None
+                for pattern in patterns:
+                    match = re.search(pattern, line, re.MULTILINE)
+                    if match:
+                        candidate = match.group(1).strip().rstrip(':')
+                        if 5 < len(candidate) < 80:
+                            title = candidate
+                            break
+                if title:
+                    content = self._legacy_content_after_header(page_text, title)
+                    section = self._create_header_section(title, content, page_info["page_number"])
+                    if section:
+                        sections.append(section)
+        return sections
+
+    def _legacy_content_after_header(self, page_text: str, header_line: str) -> str:
+        content_lines = []
+        found_header = False
+        for line in page_text.split('\n'):
+            if header_line.strip() in line.strip():
+                found_header = True
+                continue
+            if found_header:
+                stripped = line.strip()
+                if stripped and (re.match(r'^[A-Z][A-Z\s]{5,}$', stripped) or
+                                 re.match(r'^\d+\.?\s+[A-Z]', stripped) or
+                                 len(' '.join(content_lines)) > self.max_section_length):
+                    break
+                content_lines.append(stripped)
+        return ' '.join(content_lines)
+
+    def _legacy_paragraphs(self, pages: List[Dict]) -> List[Dict[str, Any]]:
+        sections = []
+        for page_info in pages:
+            paragraphs = [p.strip() for p in page_info["text"].split('\n\n') if p.strip()]
+            for paragraph in paragraphs:
+                if self._is_valid_paragraph_length(paragraph):
+                    sections.append(self._create_paragraph_section(paragraph, page_info["page_number"]))
+        return sections
+
+    def _legacy_is_list_item(self, line: str) -> bool:
+        return bool(re.match(r'^[\•\-\*]\s+.+', line) or re.match(r'^\d+[\.\)]\s+.+', line))
+
+    def _legacy_lists(self, pages: List[Dict]) -> List[Dict[str, Any]]:
+        sections = []
+        for page_info in pages:
+            lines = page_info["text"].split('\n')
+            for i, line in enumerate(lines):
+                line = line.strip()
+                if not self._legacy_is_list_item(line):
+                    continue
+                content = line
+                for j in range(i + 1, min(len(lines), i + self.max_lookahead_lines + 1)):
+                    next_line = lines[j].strip()
+                    if not next_line:
+                        continue
+                    if self._legacy_is_list_item(next_line) or not re.match(r'^[A-Z]', next_line):
+                        content += "\n" + next_line if self._legacy_is_list_item(next_line) else " " + next_line
+                    else:
+                        break
+                if len(content) > self.min_section_length:
+                    sections.append({
+                        "section_title": line[:50] + "..." if len(line) > 50 else line,
+                        "page_number": page_info["page_number"],
+                        "content": content,
+                        "detection_method": "list"
+                    })
+        return sections
+
+
+# ----------------- Synthetic Pages -----------------
+
+LINE_TEMPLATES = [
+    "INTRODUCTION AND OVERVIEW",
+    "{n}. Getting Started With The Basics",
+    "{n}) numbered step in the procedure",
+    "Key Points: things worth remembering",
+    "Chapter {n}: Planning Your Trip",
+    "• bullet item describing a feature of the product",
+    "- dash item about local cuisine and restaurants",
+    "* starred note on budget and transportation",
+    "continuation text that wraps onto the next line",
+    "Regular sentence about the document content that keeps going for a while.",
+    "Another body line. It has a couple of sentences in it.",
+    "",
+    "",
+    "   ",
+]
+
+
+def build_synthetic_pages(page_count: int, lines_per_page: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    pages = []
+    for page_index in range(page_count):
+        lines = [rng.choice(LINE_TEMPLATES).format(n=rng.randint(1, 20)) for _ in range(lines_per_page)]
+        pages.append({"page_number": page_index + 1, "text": "\n".join(lines).strip()})
+    return pages
+
+
+def _scan_raw(analyzer: DocumentAnalyzer, pages: List[Dict]) -> List[Dict[str, Any]]:
+    header_sections, paragraph_sections, list_sections = analyzer._scan_pages(pages)
+    sections = header_sections + paragraph_sections + list_sections
+    for section in sections:
+        # The legacy detector records no page spans
+        section.pop("char_start", None)
+        section.pop("char_end", None)
+    return sections
+
+
+def _time_detection(detect, pages: List[Dict[str, Any]], repeats: int):
+    best = float("inf")
+    sections = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        sections = detect(pages)
+        best = min(best, time.perf_counter() - start)
+    return best, sections
+
+
+def run_benchmark(page_count: int = 200, lines_per_page: int = 60, repeats: int = 3) -> bool:
+    pages = build_synthetic_pages(page_count, lines_per_page)
+    legacy = LegacyDetector()
+    analyzer = DocumentAnalyzer()
+    legacy_time, legacy_sections = _time_detection(legacy.detect_raw, pages, repeats)
+    scanner_time, scanner_sections = _time_detection(lambda p: _scan_raw(analyzer, p), pages, repeats)
+
+    legacy_headers, legacy_other = _split_headers(legacy_sections)
+    scanner_headers, scanner_other = _split_headers(scanner_sections)
+    identical = legacy_other == scanner_other
+    print(f"Pages: {page_count} x {lines_per_page} lines, raw detections: {len(scanner_sections)}")
+    print(f"Three-pass detector: {legacy_time * 1000:.1f} ms")
+    print(f"Single-pass scanner: {scanner_time * 1000:.1f} ms")
+    print(f"Speedup: {legacy_time / max(scanner_time, 1e-9):.2f}x")
+    print(f"Paragraph/list sections identical: {identical}")
+    print(f"Header sections: {len(legacy_headers)} legacy, {len(scanner_headers)} scanner")
+    return identical
+
+
+def _split_headers(sections: List[Dict[str, Any]]):
+    headers = [s for s in sections if s["detection_method"] == "header"]
+    others = [s for s in sections if s["detection_method"] != "header"]
+    return headers, others
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_benchmark() else 1)
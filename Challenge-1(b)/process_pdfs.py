@@ -1,7 +1,35 @@
+import argparse
+import hashlib
 import json
 import os
+import sys
+from datetime import datetime
 from utils.parser import extract_text_from_pdf
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from anytime_processor import AnytimeProcessor
+from archive_reader import CollectionArchives
+from document_analyzer import DocumentAnalyzer
+from document_pool import DocumentPool
+from memory_monitor import MemoryMonitor
+from page_cache import PageCache
+from page_filter import PagePrefilter
+from persona_processor import PersonaProcessor
+from pipeline_profiler import PipelineProfiler
+from section_ranker import SectionRanker
+from section_record import SectionRecord
+from section_store import SectionStore
+from sentence_refiner import SentenceRefiner
+from staged_pipeline import PipelineStage, StagedPipeline
+from streaming_output import StreamingOutputWriter, finalize_output
+
+TOP_SECTION_COUNT = 15
+INDEX_CANDIDATE_LIMIT = 500
+PIPELINE_STAGE_NAMES = ("load", "extract", "detect", "persona", "rank", "write")
+# MuPDF is not thread-safe, and ranking collects whole queries in one place
+SINGLE_WORKER_STAGES = ("extract", "rank")
+
 def load_json_config(config_file_path):
     """Load JSON configuration from a file."""
     with open(config_file_path, "r", encoding="utf-8") as file_handle:
@@ -15,9 +43,25 @@ def get_pdf_file_path(base_directory, file_name):
     """Construct the full path to a PDF file."""
     return os.path.join(base_directory, "PDFs", file_name)
 
-def extract_sample_pages(file_path, page_count=3):
-    """Extract text from the first few pages of a PDF."""
-    page_data = extract_text_from_pdf(file_path)
+def locate_pdf_document(base_directory, file_name, collection_archives=None):
+    """
+    Find a document under PDFs/, or else in the collection's PDFs archive (PDFs.zip, PDFs.tar, ...).
+
+    Returns (path, archive, member name): archive and member name are None for a file
+    on disk, and all three are None if the document is in neither place.
+    """
+    pdf_filepath = get_pdf_file_path(base_directory, file_name)
+    if os.path.exists(pdf_filepath):
+        return pdf_filepath, None, None
+    if collection_archives is not None:
+        pdf_archive, member_name = collection_archives.locate(os.path.dirname(pdf_filepath), file_name)
+        if pdf_archive is not None:
+            return pdf_archive.member_path(member_name), pdf_archive, member_name
+    return None, None, None
+
+def extract_sample_pages(file_path, page_count=3, pdf_bytes=None):
+    """Extract text from the first few pages of a PDF, parsed from pdf_bytes if given."""
+    page_data = extract_text_from_pdf(file_path, pdf_bytes)
     return page_data[:page_count]
 
 def append_metadata(meta_info, doc_filename):
@@ -41,17 +85,18 @@ def add_subsection_analysis(analysis_list, document_name, content_text, page_num
         "page_number": page_number
     })
 
-def process_single_document(doc_config, base_directory, output_dict):
+def process_single_document(doc_config, base_directory, output_dict, collection_archives=None):
     """Process a single document and update output data."""
     pdf_filename = doc_config["filename"]
     section_title = doc_config["title"]
-    pdf_filepath = get_pdf_file_path(base_directory, pdf_filename)
+    pdf_filepath, pdf_archive, member_name = locate_pdf_document(base_directory, pdf_filename, collection_archives)
 
-    if not os.path.exists(pdf_filepath):
-        print(colored_terminal_text(f"File not found: {pdf_filepath}", "31"))
+    if pdf_filepath is None:
+        print(colored_terminal_text(f"File not found: {get_pdf_file_path(base_directory, pdf_filename)}", "31"))
         return
 
-    sample_page_data = extract_sample_pages(pdf_filepath)
+    pdf_bytes = pdf_archive.read_member(member_name) if pdf_archive is not None else None
+    sample_page_data = extract_sample_pages(pdf_filepath, pdf_bytes=pdf_bytes)
     append_metadata(output_dict["metadata"], pdf_filename)
 
     for idx, page_info in enumerate(sample_page_data):
@@ -69,10 +114,9 @@ def process_single_document(doc_config, base_directory, output_dict):
             page_info["page_number"]
         )
 
-def process_collection_documents(configuration_data, collection_directory):
-    """Process all documents in a collection."""
-    output_json_file_path = os.path.join(collection_directory, "challenge1b_output.json")
-    output_data_structure = {
+def create_output_structure(configuration_data):
+    """Create an empty collection output."""
+    return {
         "metadata": {
             "input_documents": [],
             "persona": configuration_data["persona"]["role"],
@@ -82,28 +126,678 @@ def process_collection_documents(configuration_data, collection_directory):
         "subsection_analysis": []
     }
 
-    for document_item in configuration_data["documents"]:
-        process_single_document(document_item, collection_directory, output_data_structure)
+def process_collection_documents(configuration_data, collection_directory, stream_output=False):
+    """Process all documents in a collection."""
+    output_json_file_path = os.path.join(collection_directory, "challenge1b_output.json")
+    if stream_output:
+        process_collection_streaming(configuration_data, collection_directory, output_json_file_path)
+        return
+
+    output_data_structure = create_output_structure(configuration_data)
+
+    with CollectionArchives() as collection_archives:
+        for document_item in configuration_data["documents"]:
+            process_single_document(document_item, collection_directory, output_data_structure, collection_archives)
 
     with open(output_json_file_path, "w", encoding="utf-8") as output_file:
         json.dump(output_data_structure, output_file, indent=2)
 
     print(colored_terminal_text(f"Output written to {output_json_file_path}", "32"))
 
-def process_all_collections(collection_names):
+def process_collection_streaming(configuration_data, collection_directory, output_json_file_path):
+    """Write each document's entries to JSONL as it finishes, then assemble the JSON output."""
+    jsonl_file_path = os.path.splitext(output_json_file_path)[0] + ".jsonl"
+    with StreamingOutputWriter(jsonl_file_path, create_output_structure(configuration_data)["metadata"]) as output_writer, \
+            CollectionArchives() as collection_archives:
+        for document_item in configuration_data["documents"]:
+            document_output = create_output_structure(configuration_data)
+            process_single_document(document_item, collection_directory, document_output, collection_archives)
+            output_writer.write_document(document_output)
+    print(colored_terminal_text(f"Records streamed to {jsonl_file_path}", "32"))
+
+    finalize_output(jsonl_file_path, output_json_file_path)
+    print(colored_terminal_text(f"Output written to {output_json_file_path}", "32"))
+
+def process_all_collections(collection_names, stream_output=False):
     """Process all collections listed."""
     for collection_name in collection_names:
         input_json_path = os.path.join(collection_name, "challenge1b_input.json")
         if os.path.exists(input_json_path):
             print(colored_terminal_text(f"\nProcessing {collection_name}", "34"))
             config = load_json_config(input_json_path)
-            process_collection_documents(config, collection_name)
+            process_collection_documents(config, collection_name, stream_output)
         else:
             print(colored_terminal_text(f"Skipping {collection_name}: No input JSON found.", "33"))
 
+def collect_query_documents(configuration_data, collection_directory, document_pool, memory_monitor,
+                            collection_archives=None):
+    """Fetch the pooled analyses of one query's documents, checking the memory budget after each."""
+    document_names = []
+    content_hashes = []
+    document_analyses = []
+
+    for document_item in configuration_data["documents"]:
+        pdf_filename = document_item["filename"]
+        pdf_filepath, pdf_archive, member_name = locate_pdf_document(collection_directory, pdf_filename,
+                                                                     collection_archives)
+        if pdf_filepath is None:
+            print(colored_terminal_text(f"File not found: {get_pdf_file_path(collection_directory, pdf_filename)}", "31"))
+            continue
+
+        document_names.append(pdf_filename)
+        if pdf_archive is not None:
+            content_hash, document_analysis = document_pool.get_member_analysis(pdf_archive, member_name)
+        else:
+            content_hash, document_analysis = document_pool.content_hash(pdf_filepath), document_pool.get_analysis(pdf_filepath)
+        content_hashes.append(content_hash)
+        document_analyses.append(document_analysis)
+        memory_monitor.check_budget()
+
+    return document_names, tuple(content_hashes), document_analyses
+
+def iter_persona_sections(configuration_data, document_names, document_analyses, persona_processor, memory_monitor,
+                          pruned_analyses=None):
+    """
+    Yield each document's sections scored through the persona lens, one document at a time.
+
+    With pruned_analyses (page prefilter views of document_analyses), only their sections are
+    persona-scored. Pruned sections are still yielded, as bare records: ranking scores never read
+    persona fields, so the top-K and the corpus index positions are the same as without pruning.
+    """
+    scored_analyses = pruned_analyses if pruned_analyses is not None else document_analyses
+    for pdf_filename, document_analysis, scored_analysis in zip(document_names, document_analyses, scored_analyses):
+        # persona_records returns SectionRecords layered over the pooled sections, which stay untouched
+        with memory_monitor.stage("persona_augmentation", pdf_filename):
+            persona_view = persona_processor.persona_records(
+                scored_analysis, configuration_data["persona"], configuration_data["job_to_be_done"]
+            )
+        for section in persona_view["sections"]:
+            section["document"] = pdf_filename
+        if scored_analysis is document_analysis:
+            yield persona_view["sections"]
+            continue
+        # Views keep the surviving sections in order, so records line up with the full list by identity
+        scored_records = iter(persona_view["sections"])
+        next_record = next(scored_records, None)
+        aligned_sections = []
+        for section in document_analysis.get("sections", []):
+            if next_record is not None and next_record.section is section:
+                aligned_sections.append(next_record)
+                next_record = next(scored_records, None)
+            else:
+                pruned_record = SectionRecord(section)
+                pruned_record.document = pdf_filename
+                aligned_sections.append(pruned_record)
+        yield aligned_sections
+
+def collect_indexed_sections(configuration_data, collection_directory, section_store, persona_processor):
+    """Retrieve one query's candidate sections from the on-disk index and score them."""
+    persona_info = configuration_data["persona"]
+    task_info = configuration_data["job_to_be_done"]
+    document_names = []
+    pdf_filepaths = []
+
+    for document_item in configuration_data["documents"]:
+        pdf_filename = document_item["filename"]
+        pdf_filepath = get_pdf_file_path(collection_directory, pdf_filename)
+        if not os.path.exists(pdf_filepath):
+            print(colored_terminal_text(f"File not found: {pdf_filepath}", "31"))
+            continue
+        document_names.append(pdf_filename)
+        pdf_filepaths.append(pdf_filepath)
+
+    # Only new or changed documents are analyzed; the rest come straight from the index
+    section_store.sync_documents(pdf_filepaths)
+    candidate_sections = section_store.search(persona_info, task_info, pdf_filepaths, limit=INDEX_CANDIDATE_LIMIT)
+    persona_view = persona_processor.persona_records({"sections": candidate_sections}, persona_info, task_info)
+    return document_names, persona_view["sections"]
+
+def build_query_output(configuration_data, document_names, ranked_sections, sentence_refiner=None):
+    """Build the schema output for one query from its ranked sections, refining their text if a refiner is given."""
+    output_data_structure = {
+        "metadata": {
+            "input_documents": document_names,
+            "persona": configuration_data["persona"]["role"],
+            "job_to_be_done": configuration_data["job_to_be_done"]["task"],
+            "processing_timestamp": datetime.now().isoformat()
+        },
+        "extracted_sections": [],
+        "subsection_analysis": []
+    }
+
+    top_sections = ranked_sections[:TOP_SECTION_COUNT]
+    if sentence_refiner is not None:
+        refined_texts = sentence_refiner.refine_sections(
+            top_sections, configuration_data["persona"], configuration_data["job_to_be_done"]
+        )
+    else:
+        refined_texts = [section.get("content", "") for section in top_sections]
+
+    for rank_value, (section, refined_text) in enumerate(zip(top_sections, refined_texts), start=1):
+        add_extracted_section(
+            output_data_structure["extracted_sections"],
+            section["document"],
+            section["section_title"],
+            rank_value,
+            section["page_number"]
+        )
+        add_subsection_analysis(
+            output_data_structure["subsection_analysis"],
+            section["document"],
+            refined_text,
+            section["page_number"]
+        )
+
+    return output_data_structure
+
+def get_query_output_path(configuration_data, query_path, output_directory, used_names):
+    """Name a query's output file after its challenge id, keeping names unique."""
+    query_name = configuration_data.get("challenge_info", {}).get("challenge_id")
+    if not query_name:
+        query_name = os.path.splitext(os.path.basename(query_path))[0]
+    output_name = f"challenge1b_output_{query_name}"
+    if output_name in used_names:
+        output_name = f"{output_name}_{len(used_names) + 1}"
+    used_names.add(output_name)
+    return os.path.join(output_directory, output_name + ".json")
+
+def iter_pipeline_jobs(query_paths, output_directory, used_names, collection_archives=None):
+    """Yield one job per document of every query; a query without documents yields one empty job."""
+    for query_path in query_paths:
+        configuration_data = load_json_config(query_path)
+        collection_directory = os.path.dirname(query_path)
+        query_documents = []
+        for document_item in configuration_data["documents"]:
+            pdf_filepath, pdf_archive, member_name = locate_pdf_document(
+                collection_directory, document_item["filename"], collection_archives
+            )
+            if pdf_filepath is None:
+                print(colored_terminal_text(
+                    f"File not found: {get_pdf_file_path(collection_directory, document_item['filename'])}", "31"
+                ))
+                continue
+            query_documents.append((document_item["filename"], pdf_filepath, pdf_archive, member_name))
+
+        query_state = {
+            "configuration": configuration_data,
+            "document_names": [pdf_filename for pdf_filename, _, _, _ in query_documents],
+            "output_path": get_query_output_path(configuration_data, query_path, output_directory, used_names),
+            "content_hashes": [None] * len(query_documents),
+            "document_sections": [None] * len(query_documents),
+            "pending_documents": len(query_documents),
+            "scoring_failed": False
+        }
+        if not query_documents:
+            yield {"query": query_state, "document_index": None}
+        for document_index, (pdf_filename, pdf_filepath, pdf_archive, member_name) in enumerate(query_documents):
+            yield {"query": query_state, "document_index": document_index,
+                   "filename": pdf_filename, "path": pdf_filepath, "archive": pdf_archive, "member": member_name}
+
+def run_query_pipeline(query_paths, output_directory, used_names, document_pool, persona_processor,
+                       section_ranker, corpus_indexes, memory_monitor, stage_workers=None, queue_size=4,
+                       sentence_refiner=None, collection_archives=None):
+    """
+    Answer queries with overlapping load, extract, detect, persona, rank and write stages.
+
+    Each stage passes through jobs it has nothing to do for: pooled documents skip
+    extraction and detection, and empty queries go straight to ranking.
+    """
+    document_analyzer = document_pool.analyzer
+
+    def load_document(job):
+        if job["document_index"] is None:
+            return job
+        if job["archive"] is not None:
+            pdf_bytes = job["archive"].read_member(job["member"])
+        else:
+            with open(job["path"], "rb") as pdf_file:
+                pdf_bytes = pdf_file.read()
+        job["content_hash"] = hashlib.sha256(pdf_bytes).hexdigest()
+        job["analysis"] = document_pool.find_analysis(job["content_hash"])
+        if job["analysis"] is None:
+            job["pdf_bytes"] = pdf_bytes
+        return job
+
+    def extract_document(job):
+        if "pdf_bytes" in job:
+            try:
+                job["text"], job["pages"] = document_analyzer.extract_text(job["path"], job.pop("pdf_bytes"))
+            except Exception as error:
+                job["analysis"] = document_analyzer._create_error_response(job["path"], error, lightweight=True)
+                document_pool.add_analysis(job["content_hash"], job["analysis"])
+        return job
+
+    def detect_document(job):
+        if "text" in job:
+            try:
+                job["analysis"] = document_analyzer.build_analysis(
+                    job["path"], job.pop("text"), job.pop("pages"), lightweight=True
+                )
+            except Exception as error:
+                job["analysis"] = document_analyzer._create_error_response(job["path"], error, lightweight=True)
+            document_pool.add_analysis(job["content_hash"], job["analysis"])
+            memory_monitor.check_budget()
+        return job
+
+    def score_document(job):
+        if job["document_index"] is None:
+            return job
+        configuration_data = job["query"]["configuration"]
+        try:
+            with memory_monitor.stage("persona_augmentation", job["filename"]):
+                persona_view = persona_processor.persona_records(
+                    job.pop("analysis"), configuration_data["persona"], configuration_data["job_to_be_done"]
+                )
+        except Exception as error:
+            # Like a document that fails extraction: it adds no sections, and its query is still answered
+            print(colored_terminal_text(f"Error scoring document {job['filename']}: {error}", "31"))
+            job["query"]["scoring_failed"] = True
+            job["sections"] = []
+            return job
+        for section in persona_view["sections"]:
+            section["document"] = job["filename"]
+        job["sections"] = persona_view["sections"]
+        return job
+
+    def rank_query(job):
+        query_state = job["query"]
+        if job["document_index"] is not None:
+            query_state["document_sections"][job["document_index"]] = job["sections"]
+            query_state["content_hashes"][job["document_index"]] = job["content_hash"]
+            query_state["pending_documents"] -= 1
+            if query_state["pending_documents"]:
+                return None  # wait for the rest of the query's documents
+
+        configuration_data = query_state["configuration"]
+        document_sections = query_state.pop("document_sections")
+        content_hashes = tuple(query_state["content_hashes"])
+        # A failed document has no sections, so the cached index of its content would not line up
+        scoring_failed = query_state["scoring_failed"]
+        try:
+            corpus_index = None if scoring_failed else corpus_indexes.get(content_hashes)
+            if corpus_index is None:
+                corpus_index = section_ranker.build_corpus_index(
+                    section for sections in document_sections for section in sections
+                )
+                if not (memory_monitor.degraded or scoring_failed):
+                    corpus_indexes[content_hashes] = corpus_index
+            with memory_monitor.stage("ranking"):
+                ranked_sections = section_ranker.rank_documents_top_k(
+                    (iter(sections) for sections in document_sections),
+                    configuration_data["persona"], configuration_data["job_to_be_done"],
+                    TOP_SECTION_COUNT, corpus_index
+                )
+        except Exception as error:
+            # The query still gets its (empty) output file
+            print(colored_terminal_text(f"Error ranking {query_state['output_path']}: {error}", "31"))
+            ranked_sections = []
+        return {"query": query_state, "ranked_sections": ranked_sections}
+
+    def write_output(ranking):
+        query_state = ranking["query"]
+        output_data = build_query_output(
+            query_state["configuration"], query_state["document_names"], ranking["ranked_sections"], sentence_refiner
+        )
+        with open(query_state["output_path"], "w", encoding="utf-8") as output_file:
+            json.dump(output_data, output_file, indent=2)
+        print(colored_terminal_text(f"Output written to {query_state['output_path']}", "32"))
+        memory_monitor.check_budget()
+        return query_state["output_path"]
+
+    stage_handlers = (load_document, extract_document, detect_document, score_document, rank_query, write_output)
+    stage_workers = stage_workers or {}
+    staged_pipeline = StagedPipeline([
+        PipelineStage(stage_name, stage_handler, stage_workers.get(stage_name, 1), queue_size)
+        for stage_name, stage_handler in zip(PIPELINE_STAGE_NAMES, stage_handlers)
+    ])
+    staged_pipeline.run(iter_pipeline_jobs(query_paths, output_directory, used_names, collection_archives))
+    return staged_pipeline.stats()
+
+def report_pipeline_stats(pipeline_stats):
+    """Print per-stage utilization, naming the bottleneck."""
+    print(colored_terminal_text(
+        f"Pipeline wall time {pipeline_stats['wall_seconds']} s, bottleneck: {pipeline_stats['bottleneck']}", "34"
+    ))
+    for stage_name, stage_entry in pipeline_stats["stages"].items():
+        print(f"  {stage_name}: {stage_entry['workers']} worker(s), {stage_entry['items']} items, "
+              f"busy {stage_entry['busy_seconds']} s ({stage_entry['utilization']:.0%}), "
+              f"blocked {stage_entry['blocked_seconds']} s, max queue {stage_entry['max_queue_depth']}")
+
+def process_query_batch(query_paths, output_directory, index_path=None, memory_budget_mb=None, memory_report_path=None,
+                        stage_workers=None, queue_size=4, use_pipeline=False, page_cache_path=None, profiler=None,
+                        section_boundaries="text", prefilter_fp_rate=None, refine_text=False):
+    """Answer many persona/job queries, parsing each unique PDF only once."""
+    memory_monitor = MemoryMonitor(memory_budget_mb, trace_allocations=bool(memory_report_path), profiler=profiler)
+    page_cache = PageCache.load(page_cache_path) if page_cache_path else None
+    document_pool = DocumentPool(DocumentAnalyzer(memory_monitor=memory_monitor, page_cache=page_cache,
+                                                  section_boundaries=section_boundaries,
+                                                  term_filter_fp_rate=prefilter_fp_rate))
+    page_prefilter = PagePrefilter() if prefilter_fp_rate is not None else None
+    sentence_refiner = SentenceRefiner() if refine_text else None
+    section_store = SectionStore(index_path, document_pool) if index_path else None
+    # Collections may ship their PDFs as PDFs.zip or PDFs.tar; members are read in memory (not with --index-db)
+    collection_archives = CollectionArchives()
+    persona_processor = PersonaProcessor()
+    section_ranker = SectionRanker()
+    corpus_indexes = {}  # content hashes of a query's documents -> CorpusIndex
+    used_names = set()
+    os.makedirs(output_directory, exist_ok=True)
+
+    def release_corpus_indexes():
+        released_count = len(corpus_indexes)
+        corpus_indexes.clear()
+        return f"released {released_count} cached corpus indexes and stopped caching"
+
+    def close_batch():
+        collection_archives.close()
+        if section_store is not None:
+            section_store.close()
+        if page_cache is not None:
+            page_cache.save(page_cache_path)
+            print(colored_terminal_text(
+                f"\nPages reused from cache: {page_cache.stats['pages_reused']}, "
+                f"extracted: {page_cache.stats['pages_recomputed']}", "34"
+            ))
+
+    # Over budget, trade repeated work for memory: nothing is kept between queries
+    memory_monitor.on_budget_exceeded(document_pool.release_analyses)
+    memory_monitor.on_budget_exceeded(release_corpus_indexes)
+
+    if use_pipeline:
+        try:
+            pipeline_stats = run_query_pipeline(
+                query_paths, output_directory, used_names, document_pool, persona_processor,
+                section_ranker, corpus_indexes, memory_monitor, stage_workers, queue_size, sentence_refiner,
+                collection_archives
+            )
+        except Exception:
+            # The pipeline stopped at its first error; keep the pages extracted so far and the memory report
+            close_batch()
+            report_memory_usage(memory_monitor, memory_report_path)
+            raise
+        report_pipeline_stats(pipeline_stats)
+        query_paths = []  # every query was answered by the pipeline
+
+    for query_path in query_paths:
+        print(colored_terminal_text(f"\nProcessing query {query_path}", "34"))
+        configuration_data = load_json_config(query_path)
+        collection_directory = os.path.dirname(query_path)
+
+        persona_info = configuration_data["persona"]
+        task_info = configuration_data["job_to_be_done"]
+        if section_store is not None:
+            # Indexed candidates differ per query, so each query gets its own corpus index
+            with memory_monitor.stage("index_retrieval"):
+                document_names, query_sections = collect_indexed_sections(
+                    configuration_data, collection_directory, section_store, persona_processor
+                )
+            with memory_monitor.stage("ranking"):
+                ranked_sections = section_ranker.rank_top_k(
+                    query_sections, persona_info, task_info, TOP_SECTION_COUNT,
+                    section_ranker.build_corpus_index(query_sections)
+                )
+        else:
+            document_names, content_hashes, document_analyses = collect_query_documents(
+                configuration_data, collection_directory, document_pool, memory_monitor, collection_archives
+            )
+            pruned_analyses = None
+            if page_prefilter is not None:
+                # Sections of pages without any persona or job term skip persona scoring
+                pruned_analyses, _ = page_prefilter.prune(
+                    document_analyses, persona_processor.query_terms(persona_info, task_info), TOP_SECTION_COUNT
+                )
+            # The index always covers every section, so pruning never changes the IDF weights
+            corpus_index = corpus_indexes.get(content_hashes)
+            if corpus_index is None:
+                with memory_monitor.stage("corpus_index"):
+                    corpus_index = section_ranker.build_corpus_index(
+                        section for document_analysis in document_analyses
+                        for section in document_analysis.get("sections", [])
+                    )
+                if not memory_monitor.degraded:
+                    corpus_indexes[content_hashes] = corpus_index
+            # Per-document top-K lists are merged into a running top-K; losing sections are never copied.
+            # Persona augmentation runs lazily inside this stage and is also reported on its own.
+            with memory_monitor.stage("ranking"):
+                ranked_sections = section_ranker.rank_documents_top_k(
+                    iter_persona_sections(configuration_data, document_names, document_analyses,
+                                          persona_processor, memory_monitor, pruned_analyses),
+                    persona_info, task_info, TOP_SECTION_COUNT, corpus_index
+                )
+
+        output_json_file_path = get_query_output_path(configuration_data, query_path, output_directory, used_names)
+        with memory_monitor.stage("build_output"):
+            output_data = build_query_output(configuration_data, document_names, ranked_sections, sentence_refiner)
+        with open(output_json_file_path, "w", encoding="utf-8") as output_file:
+            json.dump(output_data, output_file, indent=2)
+        print(colored_terminal_text(f"Output written to {output_json_file_path}", "32"))
+        memory_monitor.check_budget()
+
+    close_batch()
+
+    if page_prefilter is not None:
+        prefilter_stats = page_prefilter.stats
+        print(colored_terminal_text(
+            f"\nPages pruned by term filters: {prefilter_stats['pages_pruned']} of {prefilter_stats['pages_checked']}, "
+            f"sections skipped: {prefilter_stats['sections_pruned']}, "
+            f"queries left unpruned: {prefilter_stats['queries_unpruned']}", "34"
+        ))
+
+    pool_stats = document_pool.stats
+    print(colored_terminal_text(
+        f"\nDocuments analyzed: {pool_stats['documents_analyzed']}, "
+        f"reused from pool: {pool_stats['documents_reused']}", "34"
+    ))
+    print(colored_terminal_text(
+        f"Overlapping sections collapsed: {pool_stats['sections_collapsed']}, "
+        f"persona and ranking scorings avoided: {pool_stats['section_scorings_avoided']}", "34"
+    ))
+    report_memory_usage(memory_monitor, memory_report_path)
+    return pool_stats
+
+def process_queries_with_deadline(query_paths, deadline_seconds, output_directory=None, page_cache_path=None,
+                                  refine_text=False):
+    """
+    Answer each query within its own deadline, covering the most promising pages first.
+
+    The output file is rewritten atomically at every checkpoint, so a valid result
+    exists from the start and always reflects the best ranking found so far.
+    """
+    page_cache = PageCache.load(page_cache_path) if page_cache_path else None
+    anytime_processor = AnytimeProcessor(TOP_SECTION_COUNT, page_cache)
+    sentence_refiner = SentenceRefiner() if refine_text else None
+    used_names = set()
+    if output_directory:
+        os.makedirs(output_directory, exist_ok=True)
+
+    for query_path in query_paths:
+        print(colored_terminal_text(f"\nProcessing {query_path} with a {deadline_seconds} s deadline", "34"))
+        configuration_data = load_json_config(query_path)
+        collection_directory = os.path.dirname(query_path)
+        if output_directory:
+            output_json_file_path = get_query_output_path(configuration_data, query_path, output_directory, used_names)
+        else:
+            output_json_file_path = os.path.join(collection_directory, "challenge1b_output.json")
+
+        document_names = []
+        pdf_filepaths = []
+        document_titles = []
+        for document_item in configuration_data["documents"]:
+            pdf_filepath = get_pdf_file_path(collection_directory, document_item["filename"])
+            if not os.path.exists(pdf_filepath):
+                print(colored_terminal_text(f"File not found: {pdf_filepath}", "31"))
+                continue
+            document_names.append(document_item["filename"])
+            pdf_filepaths.append(pdf_filepath)
+            document_titles.append(document_item.get("title", document_item["filename"]))
+
+        def write_checkpoint(ranked_sections, coverage):
+            output_data = build_query_output(configuration_data, document_names, ranked_sections, sentence_refiner)
+            output_data["metadata"]["coverage"] = coverage
+            temporary_path = f"{output_json_file_path}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as output_file:
+                json.dump(output_data, output_file, indent=2)
+            os.replace(temporary_path, output_json_file_path)
+
+        coverage = anytime_processor.run(
+            pdf_filepaths, configuration_data["persona"], configuration_data["job_to_be_done"],
+            deadline_seconds, write_checkpoint, document_titles
+        )
+        print(colored_terminal_text(
+            f"Output written to {output_json_file_path}: {coverage['pages_processed']}/{coverage['pages_total']} pages, "
+            f"{coverage['documents_complete']}/{coverage['documents_total']} documents complete "
+            f"in {coverage['elapsed_seconds']} s", "32"
+        ))
+
+    if page_cache is not None:
+        page_cache.save(page_cache_path)
+
+def report_memory_usage(memory_monitor, memory_report_path=None):
+    """Print the memory run summary and optionally write it as JSON."""
+    memory_summary = memory_monitor.summary()
+    memory_monitor.close()
+    print(colored_terminal_text(f"Peak RSS: {memory_summary['peak_rss_mb']} MiB", "34"))
+    for stage_name, stage_entry in memory_summary["stages"].items():
+        traced_text = f", traced peak {stage_entry['traced_peak_mb']} MiB" if stage_entry["traced_peak_mb"] is not None else ""
+        print(f"  {stage_name}: {stage_entry['calls']} calls, RSS growth {stage_entry['rss_growth_mb']} MiB{traced_text}")
+    for degradation_event in memory_summary["degradation_events"]:
+        print(colored_terminal_text(
+            f"Memory budget of {degradation_event['budget_mb']} MiB exceeded at {degradation_event['rss_mb']} MiB: "
+            + "; ".join(degradation_event["actions"]), "33"
+        ))
+    if memory_report_path:
+        with open(memory_report_path, "w", encoding="utf-8") as report_file:
+            json.dump(memory_summary, report_file, indent=2)
+        print(colored_terminal_text(f"Memory report written to {memory_report_path}", "32"))
+    return memory_summary
+
+def report_profile(profiler, profile_directory, top_count=20):
+    """Write per-stage pstats and collapsed stacks and print the hottest functions."""
+    written_paths = profiler.write_reports(profile_directory)
+    print(colored_terminal_text(f"\nProfile written to {profile_directory} ({len(written_paths)} files)", "32"))
+    print(colored_terminal_text(f"Top {top_count} functions by own time:", "34"))
+    print(f"  {'own s':>8} {'cum s':>8} {'calls':>9}  function")
+    for function_entry in profiler.top_functions(top_count):
+        print(f"  {function_entry['own_seconds']:>8.3f} {function_entry['cumulative_seconds']:>8.3f} "
+              f"{function_entry['calls']:>9}  {function_entry['function']}")
+
+def parse_arguments(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Challenge 1B persona-driven document processing")
+    parser.add_argument("--batch", nargs="+", metavar="INPUT_JSON",
+                        help="answer many challenge1b_input.json queries over a shared document pool")
+    parser.add_argument("--output-dir", default="output",
+                        help="directory for batch outputs (default: output)")
+    parser.add_argument("--index-db", metavar="PATH",
+                        help="SQLite section index reused across batch runs; only new or changed PDFs are analyzed")
+    parser.add_argument("--page-cache", metavar="PATH",
+                        help="per-page text and section cache reused across batch runs; only changed pages are re-analyzed")
+    parser.add_argument("--outline-sections", action="store_true",
+                        help="cut batch-mode sections between font-aware outline headings instead of regex-detected headers")
+    parser.add_argument("--page-prefilter", type=float, nargs="?", const=0.01, metavar="FP_RATE",
+                        help="skip batch-mode persona scoring of pages whose term filter has no persona or job term; "
+                             "FP_RATE is the filters' false-positive rate (default: 0.01)")
+    parser.add_argument("--refine-text", action="store_true",
+                        help="in --batch and --deadline modes, build refined_text from each section's sentences "
+                             "most similar to the persona and job instead of its first 300 characters")
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help="per-collection time limit: cover title and early pages first and always write the best ranking so far")
+    parser.add_argument("--stream-output", action="store_true",
+                        help="write challenge1b_output.jsonl as documents finish, then assemble the JSON from it")
+    parser.add_argument("--finalize", nargs="+", metavar="JSONL",
+                        help="assemble challenge1b_output.json files from streamed JSONL output and exit")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="profile the run and write per-stage .pstats and .collapsed flamegraph stacks to DIR; "
+                             "stages are only broken out with --batch, other modes write a single 'run' stage")
+    parser.add_argument("--profile-top", type=int, default=20, metavar="N",
+                        help="number of hot functions to print with --profile (default: 20)")
+    parser.add_argument("--memory-budget", type=float, metavar="MB",
+                        help="degrade batch mode (stop pooling analyses and indexes) once RSS exceeds this many MiB")
+    parser.add_argument("--memory-report", metavar="PATH",
+                        help="trace allocations per stage and document and write the memory summary as JSON")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="run batch mode as overlapping stages joined by bounded queues")
+    parser.add_argument("--stage-workers", nargs="+", default=[], metavar="STAGE=N",
+                        help=f"pipeline worker counts, stages: {', '.join(PIPELINE_STAGE_NAMES)} (default 1 each)")
+    parser.add_argument("--queue-size", type=int, default=4,
+                        help="capacity of each pipeline stage's input queue (default: 4)")
+    arguments = parser.parse_args(argv)
+
+    arguments.stage_workers = parse_stage_workers(parser, arguments.stage_workers)
+    if arguments.stage_workers:
+        arguments.pipeline = True
+    if arguments.pipeline and arguments.index_db:
+        parser.error("--pipeline cannot be combined with --index-db")
+    if arguments.deadline is not None:
+        if arguments.deadline <= 0:
+            parser.error("--deadline must be positive")
+        if arguments.pipeline or arguments.index_db:
+            parser.error("--deadline cannot be combined with --pipeline or --index-db")
+    if arguments.outline_sections and (arguments.index_db or arguments.deadline is not None):
+        parser.error("--outline-sections cannot be combined with --index-db or --deadline")
+    if arguments.page_prefilter is not None:
+        if not 0 < arguments.page_prefilter < 1:
+            parser.error("--page-prefilter FP_RATE must be between 0 and 1")
+        if arguments.pipeline or arguments.index_db or arguments.deadline is not None:
+            parser.error("--page-prefilter cannot be combined with --pipeline, --index-db or --deadline")
+    if arguments.queue_size < 1:
+        parser.error("--queue-size must be at least 1")
+    return arguments
+
+def parse_stage_workers(parser, stage_worker_options):
+    """Turn STAGE=N options into a worker count per pipeline stage."""
+    stage_workers = {}
+    for stage_worker_option in stage_worker_options:
+        stage_name, _, worker_text = stage_worker_option.partition("=")
+        if stage_name not in PIPELINE_STAGE_NAMES or not worker_text.isdigit() or int(worker_text) < 1:
+            parser.error(f"invalid --stage-workers entry: {stage_worker_option}")
+        if stage_name in SINGLE_WORKER_STAGES and int(worker_text) != 1:
+            parser.error(f"the {stage_name} stage runs with a single worker")
+        stage_workers[stage_name] = int(worker_text)
+    return stage_workers
+
 def main():
+    arguments = parse_arguments()
+    if not arguments.profile:
+        run(arguments)
+        return
+
+    profiler = PipelineProfiler()
+    profiler.start()
+    try:
+        with profiler.stage("run"):
+            run(arguments, profiler)
+    finally:
+        profiler.stop()
+    report_profile(profiler, arguments.profile, arguments.profile_top)
+
+def run(arguments, profiler=None):
+    """Dispatch to the processing mode selected on the command line."""
     collections = ["Collection 1", "Collection 2", "Collection 3"]
-    process_all_collections(collections)
+    if arguments.finalize:
+        for jsonl_file_path in arguments.finalize:
+            print(colored_terminal_text(f"Output written to {finalize_output(jsonl_file_path)}", "32"))
+        return
+    if arguments.deadline is not None:
+        if arguments.batch:
+            process_queries_with_deadline(arguments.batch, arguments.deadline, arguments.output_dir, arguments.page_cache,
+                                          arguments.refine_text)
+        else:
+            query_paths = [os.path.join(collection_name, "challenge1b_input.json") for collection_name in collections]
+            process_queries_with_deadline([query_path for query_path in query_paths if os.path.exists(query_path)],
+                                          arguments.deadline, page_cache_path=arguments.page_cache,
+                                          refine_text=arguments.refine_text)
+        return
+    if arguments.batch:
+        process_query_batch(arguments.batch, arguments.output_dir, arguments.index_db,
+                            arguments.memory_budget, arguments.memory_report,
+                            arguments.stage_workers, arguments.queue_size, arguments.pipeline,
+                            arguments.page_cache, profiler,
+                            "outline" if arguments.outline_sections else "text", arguments.page_prefilter,
+                            arguments.refine_text)
+        return
+
+    process_all_collections(collections, arguments.stream_output)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,193 @@
+"""
+Anytime Processor for Challenge 1B - Persona-Driven Document Intelligence
+Deadline-aware processing that covers the most promising pages first and checkpoints the best ranking so far.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional
+
+import fitz  # PyMuPDF
+
+from document_analyzer import DocumentAnalyzer
+from keyword_matcher import WORD_PATTERN
+from page_cache import PageCache
+from persona_processor import PersonaProcessor
+from section_ranker import SectionRanker
+
+
+class AnytimeProcessor:
+    """Analyzes a query's documents in growing page prefixes until a deadline, ranking as it goes"""
+
+    def __init__(self, top_k: int = 15, page_cache: PageCache = None, first_pass_pages: int = 2):
+        """
+        Args:
+            top_k: Number of ranked sections per checkpoint
+            page_cache: Cache shared with other runs; a private one is used if None
+            first_pass_pages: Pages of every document covered before any document gets more
+        """
+        # Each round re-analyzes a longer prefix; the page cache makes earlier pages nearly free
+        self.document_analyzer = DocumentAnalyzer(page_cache=page_cache or PageCache())
+        self.persona_processor = PersonaProcessor()
+        self.section_ranker = SectionRanker()
+        self.top_k = top_k
+        self.first_pass_pages = first_pass_pages
+        # Fraction of the deadline after which a checkpoint is taken even mid-round
+        self.checkpoint_fraction = 0.1
+        # Headroom over the last ranking time kept for the final checkpoint
+        self.ranking_reserve_factor = 2.0
+
+    def run(self, pdf_paths: List[str], persona_info: Dict[str, str], task_info: Dict[str, str],
+            deadline_seconds: float, checkpoint: Callable[[List[Any], Dict[str, Any]], None],
+            document_titles: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Process documents until they are fully covered or the deadline would be missed.
+
+        Args:
+            pdf_paths: The query's documents, in output order
+            persona_info: Persona configuration with role description
+            task_info: Job-to-be-done specification
+            deadline_seconds: Time budget measured from this call
+            checkpoint: Called with (ranked sections, coverage) whenever the best ranking improves
+            document_titles: Titles used to prioritize documents (file names if None)
+
+        Returns:
+            Coverage of the last checkpoint, noting whether the deadline stopped processing
+        """
+        start = time.perf_counter()
+        deadline_at = start + deadline_seconds
+        checkpoint_interval = deadline_seconds * self.checkpoint_fraction
+        page_totals = [self._count_pages(pdf_path) for pdf_path in pdf_paths]
+        page_limits = [0] * len(pdf_paths)
+        analyses = [None] * len(pdf_paths)
+        persona_views = [None] * len(pdf_paths)  # persona sections of each document's current analysis
+        document_order = self._prioritize_documents(pdf_paths, persona_info, task_info, document_titles)
+
+        analysis_seconds = 0.0
+        pages_analyzed = 0
+        ranking_seconds = 0.0
+        last_checkpoint = start
+        changed = False
+        timed_out = False
+        coverage = self._coverage(page_totals, page_limits, start, deadline_seconds, timed_out)
+
+        def take_checkpoint() -> None:
+            nonlocal ranking_seconds, last_checkpoint, changed, coverage
+            ranking_start = time.perf_counter()
+            ranked_sections = self._rank(pdf_paths, analyses, persona_views, persona_info, task_info)
+            ranking_seconds = time.perf_counter() - ranking_start
+            coverage = self._coverage(page_totals, page_limits, start, deadline_seconds, timed_out)
+            checkpoint(ranked_sections, coverage)
+            last_checkpoint = time.perf_counter()
+            changed = False
+
+        def analyze_pages(document_index: int, new_limit: int) -> None:
+            nonlocal analysis_seconds, pages_analyzed, changed
+            analysis_start = time.perf_counter()
+            analyses[document_index] = self.document_analyzer.analyze_document(
+                pdf_paths[document_index], lightweight=True, page_limit=new_limit
+            )
+            analysis_seconds += time.perf_counter() - analysis_start
+            pages_analyzed += new_limit - page_limits[document_index]
+            page_limits[document_index] = new_limit
+            persona_views[document_index] = None
+            changed = True
+
+        checkpoint([], coverage)  # a valid, empty result exists before any work starts
+        # Until a page has been timed every unit looks free, so the estimate is seeded with
+        # the first page of the most promising document
+        first_document = next((document_index for document_index in document_order if page_totals[document_index]), None)
+        if first_document is not None:
+            analyze_pages(first_document, 1)
+
+        round_pages = self.first_pass_pages
+        while any(limit < total for limit, total in zip(page_limits, page_totals)):
+            round_progress = False
+            for document_index in document_order:
+                new_limit = min(round_pages, page_totals[document_index])
+                new_pages = new_limit - page_limits[document_index]
+                if new_pages <= 0:
+                    continue
+                seconds_per_page = analysis_seconds / pages_analyzed
+                estimate = new_pages * seconds_per_page + ranking_seconds * self.ranking_reserve_factor
+                if time.perf_counter() + estimate > deadline_at:
+                    # Skip what does not fit: smaller units of other documents still might
+                    timed_out = True
+                    continue
+
+                analyze_pages(document_index, new_limit)
+                round_progress = True
+
+                if time.perf_counter() - last_checkpoint >= checkpoint_interval:
+                    take_checkpoint()
+
+            # Round complete: every document that fit is covered to the same depth
+            if changed and time.perf_counter() + ranking_seconds * self.ranking_reserve_factor <= deadline_at:
+                take_checkpoint()
+            if timed_out and not round_progress:
+                break
+            round_pages *= 2
+
+        # Keep the last checkpoint if there is no time left to rank the newest pages
+        if changed and time.perf_counter() + ranking_seconds * self.ranking_reserve_factor <= deadline_at:
+            take_checkpoint()
+        return dict(coverage, deadline_reached=timed_out)
+
+    def _rank(self, pdf_paths: List[str], analyses: List[Optional[Dict[str, Any]]],
+              persona_views: List[Optional[List[Any]]], persona_info: Dict[str, str],
+              task_info: Dict[str, str]) -> List[Any]:
+        """Rank the sections analyzed so far, in document order so full coverage matches batch mode."""
+        document_sections = []
+        for document_index, analysis in enumerate(analyses):
+            if analysis is None:
+                continue
+            if persona_views[document_index] is None:
+                sections = self.persona_processor.persona_records(analysis, persona_info, task_info)["sections"]
+                for section in sections:
+                    section["document"] = Path(pdf_paths[document_index]).name
+                persona_views[document_index] = sections
+            document_sections.append(persona_views[document_index])
+
+        corpus_index = self.section_ranker.build_corpus_index(
+            section for sections in document_sections for section in sections
+        )
+        return self.section_ranker.rank_documents_top_k(
+            (iter(sections) for sections in document_sections), persona_info, task_info, self.top_k, corpus_index
+        )
+
+    def _prioritize_documents(self, pdf_paths: List[str], persona_info: Dict[str, str], task_info: Dict[str, str],
+                              document_titles: Optional[List[str]]) -> List[int]:
+        """Order documents by how many persona and job words their titles share, keeping input order on ties."""
+        query_words = {
+            word for word in WORD_PATTERN.findall(f"{persona_info.get('role', '')} {task_info.get('task', '')}".lower())
+            if len(word) > 3
+        }
+        titles = document_titles or [Path(pdf_path).stem for pdf_path in pdf_paths]
+        title_matches = [len(query_words.intersection(WORD_PATTERN.findall(title.lower()))) for title in titles]
+        return sorted(range(len(pdf_paths)), key=lambda document_index: -title_matches[document_index])
+
+    def _count_pages(self, pdf_path: str) -> int:
+        """Page count of a PDF, or 0 if it cannot be opened."""
+        try:
+            with fitz.open(pdf_path) as pdf_doc:
+                return pdf_doc.page_count
+        except Exception:
+            return 0
+
+    def _coverage(self, page_totals: List[int], page_limits: List[int], start: float,
+                  deadline_seconds: float, timed_out: bool) -> Dict[str, Any]:
+        """Describe how much of the corpus the current ranking is based on."""
+        pages_total = sum(page_totals)
+        pages_processed = sum(page_limits)
+        return {
+            "deadline_seconds": deadline_seconds,
+            "elapsed_seconds": round(time.perf_counter() - start, 3),
+            "documents_total": len(page_totals),
+            "documents_started": sum(1 for limit in page_limits if limit > 0),
+            "documents_complete": sum(1 for limit, total in zip(page_limits, page_totals) if limit >= total),
+            "pages_total": pages_total,
+            "pages_processed": pages_processed,
+            "page_coverage": round(pages_processed / pages_total, 4) if pages_total else 1.0,
+            "complete": pages_processed >= pages_total,
+            "deadline_reached": timed_out
+        }
@@ -0,0 +1,172 @@
+"""
+Archive Reader for Challenge 1B - Persona-Driven Document Intelligence
+PDF members of zip and tar bundles read into memory for fitz.open(stream=...), without extracting them to disk.
+"""
+
+import hashlib
+import mmap
+import os
+import posixpath
+import struct
+import tarfile
+import threading
+import zipfile
+from typing import List, Iterator, Optional, Tuple
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+# Fixed part of a zip local file header, ending with the file name and extra field lengths
+ZIP_LOCAL_HEADER = struct.Struct("<4s22xHH")
+ZIP_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+
+
+def find_archive(base_path: str) -> Optional[str]:
+    """Return base_path plus the first archive suffix that exists, e.g. PDFs -> PDFs.zip."""
+    for suffix in ARCHIVE_SUFFIXES:
+        if os.path.isfile(base_path + suffix):
+            return base_path + suffix
+    return None
+
+
+class PdfArchive:
+    """Reads the PDF members of a zip or tar archive as in-memory buffers"""
+
+    def __init__(self, archive_path: str):
+        """
+        Args:
+            archive_path: Zip file or plain, gzip, bzip2 or xz compressed tar file
+        """
+        self.archive_path = archive_path
+        self._file = open(archive_path, "rb")
+        # Members stored without compression are sliced straight out of the mapped file
+        self._map = None
+        if os.fstat(self._file.fileno()).st_size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._zip = None
+        self._tar = None
+        self._lock = threading.Lock()  # compressed tar reads seek a shared stream
+        self._content_hashes = {}  # member name -> SHA-256 of its bytes
+        self._members_by_basename = {}
+        if zipfile.is_zipfile(self._file):
+            self._zip = zipfile.ZipFile(self._file)
+            self._members = {info.filename: info for info in self._zip.infolist()
+                             if not info.is_dir() and info.filename.lower().endswith(".pdf")}
+        else:
+            self._file.seek(0)
+            try:
+                self._tar = tarfile.open(fileobj=self._file, mode="r:")
+                self._tar_compressed = False
+            except tarfile.ReadError:
+                self._file.seek(0)
+                self._tar = tarfile.open(fileobj=self._file, mode="r:*")
+                self._tar_compressed = True
+            self._members = {info.name: info for info in self._tar.getmembers()
+                             if info.isfile() and info.name.lower().endswith(".pdf")}
+        for member_name in self._members:
+            self._members_by_basename.setdefault(posixpath.basename(member_name), member_name)
+
+    def __enter__(self) -> "PdfArchive":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the archive file and its mapping."""
+        if self._zip is not None:
+            self._zip.close()
+        if self._tar is not None:
+            self._tar.close()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def member_names(self) -> List[str]:
+        """Names of the archive's PDF members, in archive order."""
+        return list(self._members)
+
+    def find_member(self, file_name: str) -> Optional[str]:
+        """Member stored under file_name, or else the first member with that base name."""
+        if file_name in self._members:
+            return file_name
+        return self._members_by_basename.get(posixpath.basename(file_name))
+
+    def member_path(self, member_name: str) -> str:
+        """Path-like name of a member for messages and document metadata."""
+        return os.path.join(self.archive_path, member_name)
+
+    def read_member(self, member_name: str) -> bytes:
+        """
+        Read one PDF member into memory, remembering its content hash.
+
+        Uncompressed members are one slice of the memory-mapped archive; compressed
+        members are inflated in memory. Nothing is written to disk.
+        """
+        pdf_bytes = self._mapped_member(member_name)
+        if pdf_bytes is None:
+            if self._zip is not None:
+                pdf_bytes = self._zip.read(member_name)
+            else:
+                with self._lock:
+                    pdf_bytes = self._tar.extractfile(self._members[member_name]).read()
+        self._content_hashes[member_name] = hashlib.sha256(pdf_bytes).hexdigest()
+        return pdf_bytes
+
+    def known_hash(self, member_name: str) -> Optional[str]:
+        """Content hash of a member that has already been read, if any."""
+        return self._content_hashes.get(member_name)
+
+    def iter_pdfs(self) -> Iterator[Tuple[str, bytes]]:
+        """Yield (member name, PDF bytes) for every PDF member, one buffer at a time."""
+        for member_name in self._members:
+            yield member_name, self.read_member(member_name)
+
+    def _mapped_member(self, member_name: str) -> Optional[bytes]:
+        """Bytes of an uncompressed member sliced from the mapping, or None if it must be decompressed."""
+        if self._map is None:
+            return None
+        info = self._members[member_name]
+        if self._zip is not None:
+            if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:  # compressed or encrypted
+                return None
+            signature, name_length, extra_length = ZIP_LOCAL_HEADER.unpack_from(self._map, info.header_offset)
+            if signature != ZIP_LOCAL_HEADER_SIGNATURE:
+                return None
+            data_offset = info.header_offset + ZIP_LOCAL_HEADER.size + name_length + extra_length
+            return self._map[data_offset:data_offset + info.compress_size]
+        if self._tar_compressed or info.issparse():
+            return None
+        return self._map[info.offset_data:info.offset_data + info.size]
+
+
+class CollectionArchives:
+    """Opens each collection's PDFs archive once, for collections shipped without a PDFs directory"""
+
+    def __init__(self):
+        self._archives = {}  # PDF directory -> PdfArchive, or None if it has no archive
+
+    def __enter__(self) -> "CollectionArchives":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def locate(self, pdf_directory: str, file_name: str) -> Tuple[Optional[PdfArchive], Optional[str]]:
+        """
+        Find a document in the archive packed next to a PDF directory (PDFs.zip for PDFs/).
+
+        Returns:
+            Tuple of (archive, member name), or (None, None) if no archive holds the document
+        """
+        if pdf_directory not in self._archives:
+            archive_path = find_archive(pdf_directory)
+            self._archives[pdf_directory] = PdfArchive(archive_path) if archive_path else None
+        pdf_archive = self._archives[pdf_directory]
+        member_name = pdf_archive.find_member(file_name) if pdf_archive is not None else None
+        return (pdf_archive, member_name) if member_name is not None else (None, None)
+
+    def close(self) -> None:
+        """Close every opened archive."""
+        for pdf_archive in self._archives.values():
+            if pdf_archive is not None:
+                pdf_archive.close()
+        self._archives.clear()
@@ -0,0 +1,87 @@
+"""
+Corpus Index for Challenge 1B - Persona-Driven Document Intelligence
+Inverted index with corpus-level document frequencies for section scoring.
+"""
+
+import math
+from array import array
+from collections import Counter
+from typing import Dict, List, Any, Iterable
+
+
+class CorpusIndex:
+    """Vocabulary, document frequencies and sparse term vectors for a section collection"""
+    
+    def __init__(self):
+        self.vocabulary = {}  # term -> term id
+        self.document_frequency = array('I')  # term id -> sections containing the term
+        # Postings are the columns of a sparse section x term matrix: for each
+        # term id, the sections it occurs in and its normalized term frequency
+        self.postings_sections = []
+        self.postings_weights = []
+        self.section_lengths = array('I')  # token count per section
+    
+    @classmethod
+    def from_sections(cls, section_list: Iterable[Dict[str, Any]], text_key: str = "content") -> "CorpusIndex":
+        """Build an index over the given sections, in order."""
+        corpus_index = cls()
+        for section_item in section_list:
+            corpus_index.add_text(section_item.get(text_key, ""))
+        return corpus_index
+    
+    @property
+    def section_count(self) -> int:
+        """Number of indexed sections."""
+        return len(self.section_lengths)
+    
+    def add_text(self, text: str) -> int:
+        """Index one section's text and return its section index."""
+        tokens = self._tokenize(text)
+        section_index = len(self.section_lengths)
+        self.section_lengths.append(len(tokens))
+        
+        if tokens:
+            token_total = len(tokens)
+            for term, count in Counter(tokens).items():
+                term_id = self._get_term_id(term)
+                self.document_frequency[term_id] += 1
+                self.postings_sections[term_id].append(section_index)
+                self.postings_weights[term_id].append(count / token_total)
+        
+        return section_index
+    
+    def inverse_document_frequency(self, term: str) -> float:
+        """Smoothed IDF of a term across the indexed sections."""
+        term_id = self.vocabulary.get(term)
+        doc_freq = self.document_frequency[term_id] if term_id is not None else 0
+        return math.log((1 + self.section_count) / (1 + doc_freq)) + 1.0
+    
+    def score_query(self, query_terms: Iterable[str]) -> array:
+        """Score every section against a query in one sparse matrix-vector product."""
+        section_scores = array('d', bytes(8 * self.section_count))
+        
+        for term in set(query_terms):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            term_weight = self.inverse_document_frequency(term)
+            for section_index, term_frequency in zip(self.postings_sections[term_id],
+                                                     self.postings_weights[term_id]):
+                section_scores[section_index] += term_frequency * term_weight
+        
+        return section_scores
+    
+    def _tokenize(self, text: str) -> List[str]:
+        """Split text into lowercase whitespace tokens."""
+        return text.lower().split()
+    
+    def _get_term_id(self, term: str) -> int:
+        """Return the id for a term, adding it to the vocabulary if new."""
+        term_id = self.vocabulary.get(term)
+        if term_id is None:
+            term_id = len(self.vocabulary)
+            self.vocabulary[term] = term_id
+            self.document_frequency.append(0)
+            self.postings_sections.append(array('I'))
+            self.postings_weights.append(array('d'))
+        return term_id
@@ -4,68 +4,298 @@ Handles PDF text extraction and basic document structure analysis.
 """
 
 import fitz  # PyMuPDF
+import heapq
 import re
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Tuple, Iterator, Iterable
 from datetime import datetime
 
+from outline_extractor import OutlineExtractor
+from page_cache import PageCache, compute_page_hash
+from page_filter import PageTermFilter, page_terms
+
+
+# Header patterns in priority order; the first one yielding a usable title wins
+HEADER_PATTERNS = (
+    re.compile(r'^([A-Z][A-Z\s]{5,40})$', re.MULTILINE),  # ALL CAPS headers
+    re.compile(r'^(\d+\.?\s+[A-Z][^.!?]*?)(?:\n|$)', re.MULTILINE),  # Numbered headers
+    re.compile(r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*):', re.MULTILINE),  # Title Case with colon
+    re.compile(r'(?:Chapter|Section)\s+\d+[:\-\s]*(.+)', re.MULTILINE),  # Chapter/Section titles
+)
+
+# Combined prefilter: a line can only match HEADER_PATTERNS if it starts with
+# an uppercase letter or digit, or mentions Chapter/Section somewhere
+HEADER_CANDIDATE_PATTERN = re.compile(r'[A-Z\d]|.*(?:Chapter|Section)')
+
+# Bullet ("•", "-", "*") or numbered ("1." / "1)") list items
+LIST_ITEM_PATTERN = re.compile(r'(?:[\•\-\*]|\d+[\.\)])\s+.+')
+
+# Lines that end a header's content: ALL CAPS or numbered headings
+CONTENT_STOP_PATTERN = re.compile(r'[A-Z][A-Z\s]{5,}$|\d+\.?\s+[A-Z]')
+
+UPPERCASE_START_PATTERN = re.compile(r'[A-Z]')
+
+
+class PageText:
+    """Page entry that views its text as a slice of the shared document buffer"""
+    
+    __slots__ = ("buffer", "page_number", "start", "end", "char_count", "content_hash", "from_cache", "headings",
+                 "term_filter")
+    
+    def __init__(self, buffer: str, page_number: int, start: int, end: int, char_count: int,
+                 content_hash: str = None, from_cache: bool = False, headings: List[List[Any]] = None,
+                 term_filter: PageTermFilter = None):
+        self.buffer = buffer
+        self.page_number = page_number
+        self.start = start
+        self.end = end
+        self.char_count = char_count
+        self.content_hash = content_hash  # set when a page cache is in use
+        self.from_cache = from_cache
+        self.headings = headings  # [line index, level] of outline headings, set in outline mode
+        self.term_filter = term_filter  # set when term filters are enabled
+    
+    @property
+    def text(self) -> str:
+        """Stripped page text, sliced from the buffer on demand."""
+        return self.buffer[self.start:self.end]
+    
+    def __getitem__(self, key: str) -> Any:
+        """Allow dict-style access so callers can keep using page["text"]."""
+        if key not in ("page_number", "text", "char_count", "start", "end", "content_hash", "headings", "term_filter"):
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style get with a default."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def to_dict(self, include_text: bool = True) -> Dict[str, Any]:
+        """Return a plain dictionary, optionally without the page text."""
+        page_dict = {
+            "page_number": self.page_number,
+            "start": self.start,
+            "end": self.end,
+            "char_count": self.char_count
+        }
+        if include_text:
+            page_dict["text"] = self.text
+        if self.term_filter is not None:
+            page_dict["term_filter"] = self.term_filter
+        return page_dict
+
 
 class DocumentAnalyzer:
     """Analyzes PDF documents and extracts structured content"""
     
-    def __init__(self):
+    def __init__(self, section_selection: str = "first", memory_monitor=None, page_cache: PageCache = None,
+                 section_boundaries: str = "text", term_filter_fp_rate: float = None):
         self.min_section_length = 30
         self.max_section_length = 2000
         self.max_sections = 50
         self.max_lookahead_lines = 5
-    
-    def analyze_document(self, pdf_path: str) -> Dict[str, Any]:
+        # A candidate is collapsed into a kept section that covers this share of its page span
+        self.max_span_overlap = 0.8
+        # "first": keep the first max_sections unique sections and stop early
+        # "best": keep the max_sections highest-confidence sections in a bounded heap
+        self.section_selection = section_selection
+        # Optional MemoryMonitor measuring the extraction and detection stages
+        self.memory_monitor = memory_monitor
+        # Optional PageCache: unchanged pages reuse their text and section candidates
+        self.page_cache = page_cache
+        # "text": regex-detected headers in get_text() output
+        # "outline": font-aware headings from the same get_text("dict") parse that yields the page text
+        self.outline_extractor = OutlineExtractor() if section_boundaries == "outline" else None
+        # Optional false-positive rate of per-page term filters used by query prefiltering
+        self.term_filter_fp_rate = term_filter_fp_rate
+    
+    def analyze_document(self, pdf_path: str, lightweight: bool = False, page_limit: int = None,
+                         pdf_bytes: bytes = None) -> Dict[str, Any]:
         """
         Extract and analyze content from a PDF document.
         
         Args:
             pdf_path: Path to the PDF file
+            lightweight: Omit full_text and return pages as offset ranges only,
+                so the text buffer can be released once sections are built
+            page_limit: Analyze only the first page_limit pages
+            pdf_bytes: Document contents already in memory, e.g. an archive member named by pdf_path
             
         Returns:
             Dictionary containing document analysis results
         """
         try:
-            pdf_doc = fitz.open(pdf_path)
-            text_content, page_data = self._extract_pdf_content(pdf_doc)
-            pdf_doc.close()
+            text_content, page_data = self.extract_text(pdf_path, pdf_bytes, page_limit)
+            return self.build_analysis(pdf_path, text_content, page_data, lightweight)
+        except Exception as error:
+            return self._create_error_response(pdf_path, error, lightweight)
+    
+    def extract_text(self, pdf_path: str, pdf_bytes: bytes = None, page_limit: int = None) -> Tuple[str, List[PageText]]:
+        """
+        Open a PDF and extract its text buffer and page views.
+        
+        Args:
+            pdf_path: Path to the PDF file
+            pdf_bytes: File contents already read from pdf_path, parsed from memory if given
+            page_limit: Extract only the first page_limit pages
             
-            document_sections = self._detect_sections(text_content, Path(pdf_path).name, page_data)
-            doc_metadata = self._generate_metadata(pdf_path, page_data, text_content, document_sections)
+        Returns:
+            Tuple of (text buffer, page views)
+        """
+        with self._memory_stage("extract_pdf_content", Path(pdf_path).name):
+            if pdf_bytes is not None:
+                pdf_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+            else:
+                pdf_doc = fitz.open(pdf_path)
+            try:
+                return self._extract_pdf_content(pdf_doc, page_limit)
+            finally:
+                pdf_doc.close()
+    
+    def build_analysis(self, pdf_path: str, text_content: str, page_data: List[PageText],
+                       lightweight: bool = False) -> Dict[str, Any]:
+        """
+        Detect sections in extracted text and assemble the analysis result.
+        
+        Args:
+            pdf_path: Path to the PDF file the text came from
+            text_content: Text buffer from extract_text
+            page_data: Page views from extract_text
+            lightweight: Omit full_text and return pages as offset ranges only
             
-            return {
+        Returns:
+            Dictionary containing document analysis results
+        """
+        filename = Path(pdf_path).name
+        detection_stats = {}
+        with self._memory_stage("detect_sections", filename):
+            document_sections = self._detect_sections(text_content, filename, page_data, detection_stats)
+        doc_metadata = self._generate_metadata(pdf_path, page_data, text_content, document_sections)
+        doc_metadata["detection_stats"] = detection_stats
+        outline = None
+        if self.outline_extractor is not None:
+            outline = self.outline_extractor.build_outline(
+                [page.text for page in page_data], [page.headings for page in page_data]
+            )
+        if self.page_cache is not None:
+            pages_reused = sum(page.from_cache for page in page_data)
+            doc_metadata["page_hashes"] = [page.content_hash for page in page_data]
+            doc_metadata["incremental_stats"] = {
+                "pages_reused": pages_reused,
+                "pages_recomputed": len(page_data) - pages_reused,
+                "page_scans_reused": detection_stats.get("page_scans_reused", 0)
+            }
+        
+        if lightweight:
+            analysis = {
+                "metadata": doc_metadata,
+                "pages": [page.to_dict(include_text=False) for page in page_data],
+                "sections": document_sections
+            }
+        else:
+            analysis = {
                 "metadata": doc_metadata,
                 "full_text": text_content,
                 "pages": page_data,
                 "sections": document_sections
             }
-            
-        except Exception as error:
-            return self._create_error_response(pdf_path, error)
-    
-    def _extract_pdf_content(self, pdf_doc) -> Tuple[str, List[Dict]]:
-        """Extract text content from PDF document."""
-        complete_text = ""
-        page_list = []
+        if outline is not None:
+            analysis["outline"] = outline  # Challenge 1A title and outline
+        return analysis
+    
+    def _memory_stage(self, stage_name: str, filename: str):
+        """Measure a stage when a memory monitor is attached."""
+        if self.memory_monitor is None:
+            return nullcontext()
+        return self.memory_monitor.stage(stage_name, filename)
+    
+    def _extract_pdf_content(self, pdf_doc, page_limit: int = None) -> Tuple[str, List[PageText]]:
+        """Extract text into one buffer with per-page offset ranges."""
+        page_count = len(pdf_doc) if page_limit is None else min(page_limit, len(pdf_doc))
+        page_headings = [None] * page_count
+        if self.outline_extractor is not None:
+            page_texts, page_styles, page_hashes, cached_flags = self._extract_page_layouts(pdf_doc, page_count)
+            page_headings = self.outline_extractor.find_headings(page_styles, page_texts)
+        elif self.page_cache is not None:
+            page_texts, page_hashes, cached_flags = self._extract_page_texts_incremental(pdf_doc, page_count)
+        else:
+            page_texts = [pdf_doc[page_index].get_text() for page_index in range(page_count)]
+            page_hashes = [None] * len(page_texts)
+            cached_flags = [False] * len(page_texts)
+        term_filters = [None] * len(page_texts)
+        if self.term_filter_fp_rate is not None:
+            term_filters = [self._page_term_filter(text_content, page_hash)
+                            for text_content, page_hash in zip(page_texts, page_hashes)]
+        complete_text = "".join(text_content + "\n" for text_content in page_texts)
         
-        for page_index in range(len(pdf_doc)):
-            current_page = pdf_doc[page_index]
-            text_content = current_page.get_text()
-            complete_text += text_content + "\n"
-            
-            page_list.append({
-                "page_number": page_index + 1,
-                "text": text_content.strip(),
-                "char_count": len(text_content)
-            })
+        page_list = []
+        offset = 0
+        for page_index, text_content in enumerate(page_texts):
+            leading = len(text_content) - len(text_content.lstrip())
+            trailing = len(text_content) - len(text_content.rstrip())
+            start = offset + leading
+            end = max(start, offset + len(text_content) - trailing)
+            page_list.append(PageText(complete_text, page_index + 1, start, end, len(text_content),
+                                      page_hashes[page_index], cached_flags[page_index], page_headings[page_index],
+                                      term_filters[page_index]))
+            offset += len(text_content) + 1
         
         return complete_text, page_list
     
-    def _generate_metadata(self, pdf_path: str, page_list: List[Dict], 
+    def _extract_page_texts_incremental(self, pdf_doc, page_count: int) -> Tuple[List[str], List[str], List[bool]]:
+        """Extract only pages whose content hash is not in the page cache."""
+        page_texts = []
+        page_hashes = []
+        cached_flags = []
+        for page_index in range(page_count):
+            page = pdf_doc[page_index]
+            page_hash = compute_page_hash(pdf_doc, page)
+            text_content = self.page_cache.get_text(page_hash)
+            cached_flags.append(text_content is not None)
+            if text_content is None:
+                text_content = page.get_text()
+                self.page_cache.put_text(page_hash, text_content)
+            page_texts.append(text_content)
+            page_hashes.append(page_hash)
+        return page_texts, page_hashes, cached_flags
+    
+    def _page_term_filter(self, text_content: str, page_hash: str = None) -> PageTermFilter:
+        """Build a page's term filter, or reuse the cached one built at the same false-positive rate."""
+        filter_data = self.page_cache.get_term_filter(page_hash) if page_hash is not None else None
+        if filter_data is not None:
+            term_filter = PageTermFilter.from_list(filter_data)
+            if term_filter.false_positive_rate == self.term_filter_fp_rate:
+                return term_filter
+        term_filter = PageTermFilter.from_terms(page_terms(text_content), self.term_filter_fp_rate)
+        if page_hash is not None:
+            self.page_cache.put_term_filter(page_hash, term_filter.to_list())
+        return term_filter
+    
+    def _extract_page_layouts(self, pdf_doc, page_count: int) -> Tuple[List[str], List[List], List[str], List[bool]]:
+        """Parse each page once into outline text and line styles, reusing cached layouts of unchanged pages."""
+        page_texts = []
+        page_styles = []
+        page_hashes = []
+        cached_flags = []
+        for page_index in range(page_count):
+            page = pdf_doc[page_index]
+            page_hash = compute_page_hash(pdf_doc, page) if self.page_cache is not None else None
+            page_layout = self.page_cache.get_layout(page_hash) if page_hash is not None else None
+            cached_flags.append(page_layout is not None)
+            if page_layout is None:
+                page_layout = self.outline_extractor.parse_page(page)
+                if page_hash is not None:
+                    self.page_cache.put_layout(page_hash, *page_layout)
+            page_texts.append(page_layout[0])
+            page_styles.append(page_layout[1])
+            page_hashes.append(page_hash)
+        return page_texts, page_styles, page_hashes, cached_flags
+    
+    def _generate_metadata(self, pdf_path: str, page_list: List[PageText], 
                           complete_text: str, document_sections: List[Dict]) -> Dict[str, Any]:
         """Generate document metadata."""
         return {
@@ -76,107 +306,298 @@ class DocumentAnalyzer:
             "processing_timestamp": datetime.now().isoformat()
         }
     
-    def _create_error_response(self, pdf_path: str, processing_error: Exception) -> Dict[str, Any]:
+    def _create_error_response(self, pdf_path: str, processing_error: Exception,
+                               lightweight: bool = False) -> Dict[str, Any]:
         """Create error response for failed document processing."""
         print(f"Error analyzing document {pdf_path}: {str(processing_error)}")
-        return {
+        error_response = {
             "metadata": {"filename": Path(pdf_path).name, "error": str(processing_error)},
             "full_text": "",
             "pages": [],
             "sections": []
         }
+        if lightweight:
+            del error_response["full_text"]
+        return error_response
     
-    def _detect_sections(self, text: str, filename: str, pages: List[Dict]) -> List[Dict[str, Any]]:
+    def _detect_sections(self, text: str, filename: str, pages: List[Dict],
+                         stats: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Detect logical sections within the document text."""
-        sections = []
+        if stats is None:
+            stats = {}
+        stats.update({
+            "section_selection": self.section_selection,
+            "pages_total": len(pages),
+            "pages_scanned": 0,
+            "candidates_detected": 0,
+            "candidates_examined": 0,
+            "candidates_scored": 0,
+            "candidates_overlapping": 0,
+            "overlapping_chars": 0,
+            "sections_dropped_by_overlap": 0,
+            "early_stopped": False
+        })
         
-        # Apply different detection strategies
-        sections.extend(self._detect_by_headers(text, pages))
-        sections.extend(self._detect_by_paragraphs(text, pages))
-        sections.extend(self._detect_by_lines(text, pages))
+        candidates = self._iter_candidates(pages, stats)
+        if self.section_selection == "best":
+            sections = self._select_best_sections(candidates, filename, stats)
+        else:
+            sections = self._process_detected_sections(candidates, filename, stats)
+        candidates.close()
         
-        # Process and deduplicate sections
-        return self._process_detected_sections(sections, filename)
+        stats["pages_skipped"] = stats["pages_total"] - stats["pages_scanned"]
+        stats["candidates_skipped"] = stats["candidates_detected"] - stats["candidates_examined"]
+        return sections
     
-    def _process_detected_sections(self, sections: List[Dict], filename: str) -> List[Dict[str, Any]]:
-        """Remove duplicates and add metadata to detected sections."""
-        unique_sections = []
-        seen_titles = set()
+    def _iter_candidates(self, pages: List[Dict], stats: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Lazily yield candidate sections in detector order (headers, paragraphs, lists)."""
+        paragraph_sections = []
+        list_sections = []
         
-        for i, section in enumerate(sections):
-            if self._is_valid_section(section, seen_titles):
-                section.update({
-                    "section_id": f"{filename}_section_{i+1}",
-                    "word_count": len(section.get("content", "").split()),
-                    "confidence_score": self._calculate_confidence(section)
-                })
-                unique_sections.append(section)
-                seen_titles.add(section["section_title"])
+        for page_info in pages:
+            header_sections, page_paragraphs, page_lists = self._page_candidates(page_info, stats)
+            paragraph_sections.extend(page_paragraphs)
+            list_sections.extend(page_lists)
+            stats["pages_scanned"] += 1
+            stats["candidates_detected"] += len(header_sections) + len(page_paragraphs) + len(page_lists)
+            yield from header_sections
         
-        return unique_sections[:self.max_sections]
-    
-    def _is_valid_section(self, section: Dict[str, Any], seen_titles: set) -> bool:
-        """Check if a section is valid and not a duplicate."""
-        title = section.get("section_title", "")
-        return title and title not in seen_titles and len(title) > 3
-    
-    def _detect_by_headers(self, text: str, pages: List[Dict]) -> List[Dict[str, Any]]:
-        """Detect heading-style sections."""
-        sections = []
-        patterns = self._get_header_patterns()
+        yield from paragraph_sections
+        yield from list_sections
+    
+    def _page_candidates(self, page_info: Dict, stats: Dict[str, Any]) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """Scan one page, or reuse its cached candidates when the page is unchanged."""
+        # Outline headings depend on the whole document's body size, so outline
+        # mode rescans pages from their cached layouts instead
+        page_hash = None
+        if self.page_cache is not None and self.outline_extractor is None:
+            page_hash = page_info.get("content_hash")
+        if page_hash is not None:
+            cached_candidates = self.page_cache.get_candidates(page_hash, page_info["page_number"])
+            if cached_candidates is not None:
+                stats["page_scans_reused"] = stats.get("page_scans_reused", 0) + 1
+                return cached_candidates
+        
+        page_candidates = ([], [], [])
+        self._scan_page(page_info, *page_candidates)
+        if page_hash is not None:
+            self.page_cache.put_candidates(page_hash, page_candidates)
+        return page_candidates
+    
+    def _scan_pages(self, pages: List[Dict]) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """Run the header, paragraph and list detectors over all pages in one pass."""
+        header_sections = []
+        paragraph_sections = []
+        list_sections = []
         
         for page_info in pages:
-            page_sections = self._find_headers_in_page(page_info, patterns)
-            sections.extend(page_sections)
+            self._scan_page(page_info, header_sections, paragraph_sections, list_sections)
         
-        return sections
+        return header_sections, paragraph_sections, list_sections
     
-    def _get_header_patterns(self) -> List[str]:
-        """Get regex patterns for header detection."""
-        return [
-            r'^([A-Z][A-Z\s]{5,40})$',  # ALL CAPS headers
-            r'^(\d+\.?\s+[A-Z][^.!?]*?)(?:\n|$)',  # Numbered headers
-            r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*):',  # Title Case with colon
-            r'(?:Chapter|Section)\s+\d+[:\-\s]*(.+)',  # Chapter/Section titles
-        ]
-    
-    def _find_headers_in_page(self, page_info: Dict, patterns: List[str]) -> List[Dict[str, Any]]:
-        """Find headers in a single page."""
-        sections = []
+    def _scan_page(self, page_info: Dict, header_sections: List[Dict],
+                   paragraph_sections: List[Dict], list_sections: List[Dict]) -> None:
+        """Tokenize a page's lines once and feed every detector from the same scan."""
         page_num = page_info["page_number"]
         page_text = page_info["text"]
+        outline_headings = page_info.get("headings")
         lines = page_text.split('\n')
-        
+        stripped_lines = [line.strip() for line in lines]
+        line_starts = []  # page character offset of each line
+        line_offset = 0
         for line in lines:
-            line = line.strip()
-            if not self._is_valid_line(line):
-                continue
+            line_starts.append(line_offset)
+            line_offset += len(line) + 1
+        boundary_flags = []
+        header_positions = []
+        paragraph_start = 0
+        
+        if outline_headings is not None:
+            # Outline headings replace the regex header pass and cut content between them
+            heading_lines = {line_index for line_index, _ in outline_headings}
+            boundary_flags = [i in heading_lines for i in range(len(lines))]
+            header_positions = [(line_index, stripped_lines[line_index]) for line_index, _ in outline_headings]
+        
+        for i, line in enumerate(stripped_lines):
+            if outline_headings is None:
+                boundary_flags.append(self._is_content_boundary(line))
+                if self._is_valid_line(line):
+                    header_match = self._match_header_patterns(line)
+                    if header_match:
+                        header_positions.append((i, header_match))
             
-            header_match = self._match_header_patterns(line, patterns)
-            if header_match:
-                section = self._create_header_section(header_match, page_text, page_num)
+            if self._is_list_item(line):
+                content, last_line = self._gather_list_content(stripped_lines, i)
+                section = self._create_list_section(line, content, page_num)
                 if section:
-                    sections.append(section)
+                    self._set_page_span(section, lines, line_starts, i, last_line)
+                    list_sections.append(section)
+            
+            # An empty line is a "\n\n" paragraph break in the page text
+            if not lines[i]:
+                self._add_paragraph_section(lines, line_starts, paragraph_start, i, page_num, paragraph_sections)
+                paragraph_start = i + 1
         
-        return sections
+        self._add_paragraph_section(lines, line_starts, paragraph_start, len(lines), page_num, paragraph_sections)
+        
+        for header_index, title in header_positions:
+            content, last_line = self._collect_header_content(stripped_lines, boundary_flags, header_index, title)
+            section = self._create_header_section(title, content, page_num)
+            if section:
+                self._set_page_span(section, lines, line_starts, header_index, last_line)
+                header_sections.append(section)
+    
+    def _set_page_span(self, section: Dict[str, Any], lines: List[str], line_starts: List[int],
+                       first_line: int, last_line: int) -> None:
+        """Record the page character offsets of the lines a section was cut from."""
+        section["char_start"] = line_starts[first_line]
+        section["char_end"] = line_starts[last_line] + len(lines[last_line])
+    
+    def _process_detected_sections(self, sections: Iterable[Dict], filename: str,
+                                   stats: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Remove duplicates and add metadata, stopping once max_sections are kept."""
+        unique_sections = []
+        seen_titles = set()
+        collapsed_titles = set()
+        kept_spans = {}
+        
+        for i, section in enumerate(sections):
+            if stats is not None:
+                stats["candidates_examined"] += 1
+            if not self._is_valid_section(section, seen_titles):
+                continue
+            if self._overlaps_kept_section(section, kept_spans, stats):
+                collapsed_titles.add(section["section_title"])
+                continue
+            self._annotate_section(section, filename, i)
+            if stats is not None:
+                stats["candidates_scored"] += 1
+            unique_sections.append(section)
+            seen_titles.add(section["section_title"])
+            self._add_kept_span(section, kept_spans)
+            
+            # Stop pulling candidates so later pages are never scanned
+            if len(unique_sections) >= self.max_sections:
+                if stats is not None:
+                    stats["early_stopped"] = True
+                break
+        
+        if stats is not None:
+            self._record_overlap_drop(stats, seen_titles, collapsed_titles, len(unique_sections))
+        return unique_sections
+    
+    def _select_best_sections(self, sections: Iterable[Dict], filename: str,
+                              stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Keep the max_sections highest-confidence unique sections, in document order."""
+        best_heap = []  # (confidence, -index, section); the root is the weakest kept
+        seen_titles = set()
+        collapsed_titles = set()
+        kept_spans = {}  # spans of the sections currently in the heap
+        
+        for i, section in enumerate(sections):
+            # Candidates arrive headers, paragraphs, lists, whose best possible
+            # confidence only decreases, so nothing later can beat a full heap
+            if (len(best_heap) >= self.max_sections and
+                    best_heap[0][0] >= self._get_max_confidence(section.get("detection_method", ""))):
+                stats["early_stopped"] = True
+                break
+            stats["candidates_examined"] += 1
+            if not self._is_valid_section(section, seen_titles):
+                continue
+            if self._overlaps_kept_section(section, kept_spans, stats):
+                collapsed_titles.add(section["section_title"])
+                continue
+            
+            seen_titles.add(section["section_title"])
+            self._annotate_section(section, filename, i)
+            stats["candidates_scored"] += 1
+            
+            # Only sections the heap keeps claim their span, and an evicted one gives it back
+            heap_entry = (section["confidence_score"], -i, section)
+            if len(best_heap) < self.max_sections:
+                heapq.heappush(best_heap, heap_entry)
+                self._add_kept_span(section, kept_spans)
+            elif heap_entry[:2] > best_heap[0][:2]:
+                evicted_entry = heapq.heapreplace(best_heap, heap_entry)
+                self._remove_kept_span(evicted_entry[2], kept_spans)
+                self._add_kept_span(section, kept_spans)
+        
+        self._record_overlap_drop(stats, seen_titles, collapsed_titles, len(best_heap))
+        best_heap.sort(key=lambda heap_entry: -heap_entry[1])
+        return [heap_entry[2] for heap_entry in best_heap]
+    
+    def _annotate_section(self, section: Dict[str, Any], filename: str, index: int) -> None:
+        """Add id, word count and confidence to a kept section."""
+        section.update({
+            "section_id": f"{filename}_section_{index+1}",
+            "word_count": len(section.get("content", "").split()),
+            "confidence_score": self._calculate_confidence(section)
+        })
+    
+    def _is_valid_section(self, section: Dict[str, Any], seen_titles: set) -> bool:
+        """Check if a section is valid and not a duplicate."""
+        title = section.get("section_title", "")
+        return title and title not in seen_titles and len(title) > 3
+    
+    def _overlaps_kept_section(self, section: Dict[str, Any], kept_spans: Dict[int, List[Tuple[int, int]]],
+                               stats: Dict[str, Any] = None) -> bool:
+        """
+        Check whether an earlier kept section on the same page already covers most of this one.
+        
+        Candidates arrive headers, paragraphs, lists, so the stronger detection is the one kept.
+        Callers add the spans of the sections they keep with _add_kept_span.
+        """
+        span_start = section.get("char_start")
+        if span_start is None:
+            return False
+        span_end = section["char_end"]
+        min_overlap = self.max_span_overlap * max(span_end - span_start, 1)
+        for kept_start, kept_end in kept_spans.get(section.get("page_number"), ()):
+            if min(span_end, kept_end) - max(span_start, kept_start) >= min_overlap:
+                if stats is not None:
+                    stats["candidates_overlapping"] += 1
+                    stats["overlapping_chars"] += len(section.get("content", ""))
+                return True
+        return False
+    
+    def _add_kept_span(self, section: Dict[str, Any], kept_spans: Dict[int, List[Tuple[int, int]]]) -> None:
+        """Record the page span of a kept section, if it has one."""
+        if section.get("char_start") is not None:
+            kept_spans.setdefault(section.get("page_number"), []).append((section["char_start"], section["char_end"]))
+    
+    def _remove_kept_span(self, section: Dict[str, Any], kept_spans: Dict[int, List[Tuple[int, int]]]) -> None:
+        """Forget the page span of a section that is no longer kept."""
+        if section.get("char_start") is not None:
+            kept_spans[section.get("page_number")].remove((section["char_start"], section["char_end"]))
+    
+    def _record_overlap_drop(self, stats: Dict[str, Any], seen_titles: set, collapsed_titles: set,
+                             kept_count: int) -> None:
+        """
+        Record how many fewer sections were kept because overlapping candidates were collapsed.
+        
+        Without collapsing, every distinct valid title would have been kept up to max_sections,
+        so a collapsed candidate that a later one simply replaced saves nothing downstream.
+        """
+        stats["sections_dropped_by_overlap"] = min(self.max_sections, len(seen_titles | collapsed_titles)) - kept_count
     
     def _is_valid_line(self, line: str) -> bool:
         """Check if a line is valid for header detection."""
         return bool(line and len(line) >= 5)
     
-    def _match_header_patterns(self, line: str, patterns: List[str]) -> str:
+    def _match_header_patterns(self, line: str) -> str:
         """Try to match line against header patterns."""
-        for pattern in patterns:
-            match = re.search(pattern, line, re.MULTILINE)
+        if not HEADER_CANDIDATE_PATTERN.match(line):
+            return None
+        for pattern in HEADER_PATTERNS:
+            match = pattern.search(line)
             if match:
                 title = match.group(1).strip().rstrip(':')
                 if 5 < len(title) < 80:
                     return title
         return None
     
-    def _create_header_section(self, title: str, page_text: str, page_num: int) -> Dict[str, Any]:
+    def _create_header_section(self, title: str, content: str, page_num: int) -> Dict[str, Any]:
         """Create a section from detected header."""
-        content = self._extract_content_after_header(page_text, title)
         if content:
             return {
                 "section_title": title,
@@ -186,30 +607,16 @@ class DocumentAnalyzer:
             }
         return None
     
-    def _detect_by_paragraphs(self, text: str, pages: List[Dict]) -> List[Dict[str, Any]]:
-        """Detect paragraph-based sections."""
-        sections = []
-        
-        for page_info in pages:
-            page_sections = self._extract_paragraph_sections(page_info)
-            sections.extend(page_sections)
-        
-        return sections
-    
-    def _extract_paragraph_sections(self, page_info: Dict) -> List[Dict[str, Any]]:
-        """Extract sections from paragraphs in a page."""
-        sections = []
-        page_num = page_info["page_number"]
-        page_text = page_info["text"]
-        
-        paragraphs = [p.strip() for p in page_text.split('\n\n') if p.strip()]
-        
-        for paragraph in paragraphs:
-            if self._is_valid_paragraph_length(paragraph):
-                section = self._create_paragraph_section(paragraph, page_num)
-                sections.append(section)
-        
-        return sections
+    def _add_paragraph_section(self, lines: List[str], line_starts: List[int], start_index: int, end_index: int,
+                               page_num: int, sections: List[Dict[str, Any]]) -> None:
+        """Add the paragraph spanning lines[start_index:end_index] if its length is valid."""
+        if start_index >= end_index:
+            return
+        paragraph = '\n'.join(lines[start_index:end_index]).strip()
+        if paragraph and self._is_valid_paragraph_length(paragraph):
+            section = self._create_paragraph_section(paragraph, page_num)
+            self._set_page_span(section, lines, line_starts, start_index, end_index - 1)
+            sections.append(section)
     
     def _is_valid_paragraph_length(self, paragraph: str) -> bool:
         """Check if paragraph length is within valid range."""
@@ -231,41 +638,13 @@ class DocumentAnalyzer:
         first_sentence = sentences[0]
         return first_sentence[:50] + "..." if len(first_sentence) > 50 else first_sentence
     
-    def _detect_by_lines(self, text: str, pages: List[Dict]) -> List[Dict[str, Any]]:
-        """Detect line-based structured content."""
-        sections = []
-        
-        for page_info in pages:
-            page_sections = self._extract_list_sections(page_info)
-            sections.extend(page_sections)
-        
-        return sections
-    
-    def _extract_list_sections(self, page_info: Dict) -> List[Dict[str, Any]]:
-        """Extract list-based sections from a page."""
-        sections = []
-        page_num = page_info["page_number"]
-        page_text = page_info["text"]
-        lines = page_text.split('\n')
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if self._is_list_item(line):
-                section = self._create_list_section(lines, i, page_num)
-                if section:
-                    sections.append(section)
-        
-        return sections
-    
     def _is_list_item(self, line: str) -> bool:
         """Check if line is a list item."""
-        return bool(re.match(r'^[\•\-\*]\s+.+', line) or re.match(r'^\d+[\.\)]\s+.+', line))
+        return bool(LIST_ITEM_PATTERN.match(line))
     
-    def _create_list_section(self, lines: List[str], start_index: int, page_num: int) -> Dict[str, Any]:
-        """Create a section from list items."""
-        line = lines[start_index].strip()
+    def _create_list_section(self, line: str, content: str, page_num: int) -> Dict[str, Any]:
+        """Create a section from list items gathered from a stripped list line."""
         title = line[:50] + "..." if len(line) > 50 else line
-        content = self._gather_list_content(lines, start_index)
         
         if len(content) > self.min_section_length:
             return {
@@ -276,62 +655,53 @@ class DocumentAnalyzer:
             }
         return None
     
-    def _gather_list_content(self, lines: List[str], start_index: int) -> str:
-        """Gather related list content starting from given index."""
-        content = lines[start_index].strip()
+    def _gather_list_content(self, lines: List[str], start_index: int) -> Tuple[str, int]:
+        """Gather related list content starting from given index, returning it and its last line index."""
+        content = lines[start_index]
+        last_line = start_index
         
         for j in range(start_index + 1, min(len(lines), start_index + self.max_lookahead_lines + 1)):
-            next_line = lines[j].strip()
+            next_line = lines[j]
             if not next_line:
                 continue
             
             if self._is_continuation_line(next_line):
                 content += "\n" + next_line if self._is_list_item(next_line) else " " + next_line
+                last_line = j
             else:
                 break
         
-        return content
+        return content, last_line
     
     def _is_continuation_line(self, line: str) -> bool:
         """Check if line continues the current list section."""
         return (self._is_list_item(line) or 
-                (line and not re.match(r'^[A-Z]', line)))
+                (line and not UPPERCASE_START_PATTERN.match(line)))
     
-    def _extract_content_after_header(self, page_text: str, header_line: str) -> str:
-        """Extract content that follows a detected header."""
-        lines = page_text.split('\n')
+    def _collect_header_content(self, lines: List[str], boundary_flags: List[bool],
+                                header_index: int, title: str) -> Tuple[str, int]:
+        """Cut the content between a header line and the next boundary line, returning it and its last line index."""
         content_lines = []
-        found_header = False
+        content_length = 0  # running len(' '.join(content_lines))
+        last_line = header_index
         
-        for line in lines:
-            if self._is_header_line(line, header_line):
-                found_header = True
+        for j in range(header_index + 1, len(lines)):
+            line = lines[j]
+            if title in line:
                 continue
             
-            if found_header:
-                if self._should_stop_content_extraction(line, content_lines):
-                    break
-                content_lines.append(line.strip())
+            if line and (boundary_flags[j] or content_length > self.max_section_length):
+                break
+            
+            content_length += len(line) + (1 if content_lines else 0)
+            content_lines.append(line)
+            last_line = j
         
-        return ' '.join(content_lines)
+        return ' '.join(content_lines), last_line
     
-    def _is_header_line(self, line: str, header_line: str) -> bool:
-        """Check if current line matches the header."""
-        return header_line.strip() in line.strip()
-    
-    def _should_stop_content_extraction(self, line: str, content_lines: List[str]) -> bool:
-        """Determine if content extraction should stop."""
-        line = line.strip()
-        if not line:
-            return False
-        
-        # Stop if we hit another header
-        if (re.match(r'^[A-Z][A-Z\s]{5,}$', line) or 
-            re.match(r'^\d+\.?\s+[A-Z]', line)):
-            return True
-        
-        # Stop if content is too long
-        return len(' '.join(content_lines)) > self.max_section_length
+    def _is_content_boundary(self, line: str) -> bool:
+        """Check if a stripped line is a heading that ends header content."""
+        return bool(line and CONTENT_STOP_PATTERN.match(line))
     
     def _calculate_confidence(self, section: Dict[str, Any]) -> float:
         """Calculate confidence score for a detected section."""
@@ -358,6 +728,11 @@ class DocumentAnalyzer:
         }
         return method_scores.get(method, 0.0)
     
+    def _get_max_confidence(self, method: str) -> float:
+        """Get the highest confidence a section from this detection method can reach."""
+        max_quality_score = 0.2  # both _get_content_quality_score bonuses
+        return min(self._get_base_confidence_score() + self._get_method_score(method) + max_quality_score, 1.0)
+    
     def _get_content_quality_score(self, content: str, title: str) -> float:
         """Get confidence score based on content quality."""
         score = 0.0
@@ -0,0 +1,116 @@
+"""
+Document Pool for Challenge 1B - Persona-Driven Document Intelligence
+Shares document analyses across queries so each unique PDF is parsed once.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Dict, Any, Tuple, Optional
+
+from document_analyzer import DocumentAnalyzer
+
+
+class DocumentPool:
+    """Caches DocumentAnalyzer results by PDF content hash"""
+    
+    def __init__(self, analyzer: DocumentAnalyzer = None, lightweight: bool = True):
+        self.analyzer = analyzer or DocumentAnalyzer()
+        self.lightweight = lightweight
+        # Cleared under memory pressure: analyses are then recomputed instead of kept
+        self.retain_analyses = True
+        self.hash_chunk_size = 1 << 20
+        self._analyses_by_hash = {}
+        self._hashes_by_file = {}  # (path, size, mtime) -> content hash
+        self._lock = threading.Lock()  # pipeline stages share the pool across threads
+        self.stats = {
+            "documents_requested": 0,
+            "documents_analyzed": 0,
+            "documents_reused": 0,
+            # Overlapping detections collapsed before confidence scoring, and the drop in
+            # kept sections, i.e. the per-query persona and ranking scorings collapse avoided
+            "sections_collapsed": 0,
+            "section_scorings_avoided": 0
+        }
+    
+    def get_analysis(self, pdf_path: str) -> Dict[str, Any]:
+        """
+        Return the analysis of a PDF, analyzing it only the first time its content is seen.
+        
+        The returned analysis is shared between callers and must not be modified.
+        """
+        content_hash = self.content_hash(pdf_path)
+        analysis = self.find_analysis(content_hash)
+        if analysis is None:
+            analysis = self.analyzer.analyze_document(pdf_path, lightweight=self.lightweight)
+            self.add_analysis(content_hash, analysis)
+        return analysis
+    
+    def get_member_analysis(self, pdf_archive, member_name: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Return the content hash and analysis of a PDF archive member, read in memory as get_analysis reads files.
+        
+        A member seen before is only read again if its analysis is no longer pooled.
+        """
+        content_hash = pdf_archive.known_hash(member_name)
+        pdf_bytes = None
+        if content_hash is None:
+            pdf_bytes = pdf_archive.read_member(member_name)
+            content_hash = pdf_archive.known_hash(member_name)
+        analysis = self.find_analysis(content_hash)
+        if analysis is None:
+            if pdf_bytes is None:
+                pdf_bytes = pdf_archive.read_member(member_name)
+            analysis = self.analyzer.analyze_document(pdf_archive.member_path(member_name),
+                                                      lightweight=self.lightweight, pdf_bytes=pdf_bytes)
+            self.add_analysis(content_hash, analysis)
+        return content_hash, analysis
+    
+    def find_analysis(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Return the pooled analysis for a content hash, if any, counting the request."""
+        with self._lock:
+            self.stats["documents_requested"] += 1
+            analysis = self._analyses_by_hash.get(content_hash)
+            if analysis is not None:
+                self.stats["documents_reused"] += 1
+                self.stats["section_scorings_avoided"] += self._detection_stat(analysis, "sections_dropped_by_overlap")
+            return analysis
+    
+    def add_analysis(self, content_hash: str, analysis: Dict[str, Any]) -> None:
+        """Pool an analysis produced for a content hash."""
+        with self._lock:
+            self.stats["documents_analyzed"] += 1
+            self.stats["sections_collapsed"] += self._detection_stat(analysis, "candidates_overlapping")
+            self.stats["section_scorings_avoided"] += self._detection_stat(analysis, "sections_dropped_by_overlap")
+            if self.retain_analyses:
+                self._analyses_by_hash[content_hash] = analysis
+    
+    def release_analyses(self) -> str:
+        """Drop every pooled analysis and stop pooling new ones."""
+        with self._lock:
+            released_count = len(self._analyses_by_hash)
+            self._analyses_by_hash.clear()
+            self.retain_analyses = False
+        return f"released {released_count} pooled analyses and stopped pooling"
+    
+    def content_hash(self, pdf_path: str) -> str:
+        """SHA-256 of the file contents, memoized per path, size and modification time."""
+        file_key = self._file_key(pdf_path)
+        content_hash = self._hashes_by_file.get(file_key)
+        if content_hash is None:
+            digest = hashlib.sha256()
+            with open(pdf_path, "rb") as pdf_file:
+                for chunk in iter(lambda: pdf_file.read(self.hash_chunk_size), b""):
+                    digest.update(chunk)
+            content_hash = digest.hexdigest()
+            self._hashes_by_file[file_key] = content_hash
+        return content_hash
+    
+    def _detection_stat(self, analysis: Dict[str, Any], stat_name: str) -> int:
+        """A section detection counter of an analysis; 0 for error responses."""
+        return analysis.get("metadata", {}).get("detection_stats", {}).get(stat_name, 0)
+    
+    def _file_key(self, pdf_path: str) -> Tuple[str, int, int]:
+        """Identify a file on disk by resolved path, size and modification time."""
+        file_stat = os.stat(pdf_path)
+        return os.path.realpath(pdf_path), file_stat.st_size, file_stat.st_mtime_ns
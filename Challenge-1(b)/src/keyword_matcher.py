@@ -0,0 +1,113 @@
+"""
+Keyword Matcher for Challenge 1B - Persona-Driven Document Intelligence
+Aho-Corasick multi-pattern matching of persona, task and insight vocabularies.
+"""
+
+import re
+from collections import deque
+from typing import List, Tuple, Iterable
+
+
+WORD_PATTERN = re.compile(r'\b\w+\b')
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton reporting every keyword occurrence in a text"""
+    
+    def __init__(self, keywords: Iterable[str]):
+        self.transitions = [{}]  # state -> {character: next state}
+        self.failure = [0]
+        self.outputs = [()]  # state -> keywords ending at this state
+        for keyword in keywords:
+            if keyword:
+                self._add_keyword(keyword)
+        self._build_failure_links()
+    
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        """Return (start, keyword) for every occurrence, overlapping ones included."""
+        transitions = self.transitions
+        failure = self.failure
+        outputs = self.outputs
+        occurrences = []
+        state = 0
+        
+        for position, character in enumerate(text):
+            while state and character not in transitions[state]:
+                state = failure[state]
+            state = transitions[state].get(character, 0)
+            for keyword in outputs[state]:
+                occurrences.append((position - len(keyword) + 1, keyword))
+        
+        return occurrences
+    
+    def _add_keyword(self, keyword: str) -> None:
+        """Extend the trie with one keyword."""
+        state = 0
+        for character in keyword:
+            next_state = self.transitions[state].get(character)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][character] = next_state
+                self.transitions.append({})
+                self.failure.append(0)
+                self.outputs.append(())
+            state = next_state
+        if keyword not in self.outputs[state]:
+            self.outputs[state] = self.outputs[state] + (keyword,)
+    
+    def _build_failure_links(self) -> None:
+        """Breadth-first pass linking each state to its longest proper suffix state."""
+        pending_states = deque(self.transitions[0].values())
+        
+        while pending_states:
+            state = pending_states.popleft()
+            for character, next_state in self.transitions[state].items():
+                pending_states.append(next_state)
+                fallback = self.failure[state]
+                while fallback and character not in self.transitions[fallback]:
+                    fallback = self.failure[fallback]
+                self.failure[next_state] = self.transitions[fallback].get(character, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.failure[next_state]]
+
+
+class KeywordMatcher:
+    """Finds every keyword hit in a text with a single tokenization pass"""
+    
+    def __init__(self, keywords: Iterable[str], max_cached_tokens: int = 200000):
+        keyword_set = set(keywords)
+        for keyword in keyword_set:
+            # A keyword made only of word characters can never span two tokens
+            if not WORD_PATTERN.fullmatch(keyword):
+                raise ValueError(f"Keyword must be a single word: {keyword!r}")
+        self.automaton = KeywordAutomaton(sorted(keyword_set))
+        self.max_cached_tokens = max_cached_tokens
+        self._token_hits = {}  # token -> ((keyword, whole_word), ...)
+    
+    def scan(self, text: str) -> Tuple[int, List[Tuple[int, str, bool]]]:
+        """
+        Scan lowercase text once.
+        
+        Returns:
+            Token count and a list of (token_index, keyword, whole_word) hits,
+            where whole_word means the keyword is the entire token
+        """
+        tokens = WORD_PATTERN.findall(text)
+        token_hit_cache = self._token_hits
+        hits = []
+        
+        for token_index, token in enumerate(tokens):
+            token_hits = token_hit_cache.get(token)
+            if token_hits is None:
+                token_hits = self._match_token(token)
+            for keyword, whole_word in token_hits:
+                hits.append((token_index, keyword, whole_word))
+        
+        return len(tokens), hits
+    
+    def _match_token(self, token: str) -> Tuple[Tuple[str, bool], ...]:
+        """Run the automaton over one distinct token and cache its hits."""
+        token_hits = tuple((keyword, keyword == token) for _, keyword in self.automaton.find_all(token))
+        if len(self._token_hits) >= self.max_cached_tokens:
+            self._token_hits.clear()
+        self._token_hits[token] = token_hits
+        return token_hits
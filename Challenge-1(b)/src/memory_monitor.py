@@ -0,0 +1,180 @@
+"""
+Memory Monitor for Challenge 1B - Persona-Driven Document Intelligence
+Per-stage and per-document memory accounting with a degradation budget.
+"""
+
+import os
+import resource
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Any, Callable, Iterator, Optional
+
+
+MEBIBYTE = 1 << 20
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm_file:
+            resident_pages = int(statm_file.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes() -> int:
+    """High-water resident set size of this process."""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class MemoryMonitor:
+    """Records peak memory per pipeline stage and per document, and enforces a budget"""
+
+    def __init__(self, budget_mb: float = None, trace_allocations: bool = False, profiler=None):
+        self.budget_bytes = int(budget_mb * MEBIBYTE) if budget_mb else None
+        # tracemalloc slows Python code down noticeably, so it is opt-in
+        self.trace_allocations = trace_allocations
+        # Optional PipelineProfiler; every measured stage is also profiled
+        self.profiler = profiler
+        self.stage_stats = {}  # stage name -> aggregated stats
+        self.document_stats = {}  # document name -> aggregated stats
+        self.degradation_events = []
+        self._budget_callbacks = []
+        # Per thread: [baseline traced bytes, highest traced bytes seen in children] per open stage.
+        # Traced peaks are process-wide, so stages running concurrently share them.
+        self._thread_state = threading.local()
+        self._lock = threading.Lock()
+        self._owns_tracing = False
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+
+    @property
+    def degraded(self) -> bool:
+        """Whether the budget has been exceeded and degradation triggered."""
+        return bool(self.degradation_events)
+
+    def on_budget_exceeded(self, callback: Callable[[], str]) -> None:
+        """Register a degradation step; it returns a short description of what it changed."""
+        self._budget_callbacks.append(callback)
+
+    @contextmanager
+    def stage(self, stage_name: str, document: str = None) -> Iterator[None]:
+        """Measure the memory a block of work needs, attributed to a stage and optionally a document."""
+        tracing = self.trace_allocations and tracemalloc.is_tracing()
+        rss_before = peak_rss_bytes()
+        open_stages = self._open_stages()
+        if tracing:
+            traced_now = tracemalloc.get_traced_memory()[0]
+            open_stages.append([traced_now, 0])
+            tracemalloc.reset_peak()
+        try:
+            with self.profiler.stage(stage_name) if self.profiler is not None else nullcontext():
+                yield
+        finally:
+            traced_peak = None
+            if tracing:
+                # reset_peak is global, so nested stages hand their peak up to the parent
+                baseline, child_peak = open_stages.pop()
+                absolute_peak = max(child_peak, tracemalloc.get_traced_memory()[1])
+                traced_peak = max(absolute_peak - baseline, 0)
+                if open_stages:
+                    open_stages[-1][1] = max(open_stages[-1][1], absolute_peak)
+                tracemalloc.reset_peak()
+            rss_after = peak_rss_bytes()
+            with self._lock:
+                self._record(self.stage_stats, stage_name, traced_peak, rss_after, rss_after - rss_before)
+                if document is not None:
+                    self._record(self.document_stats, document, traced_peak, rss_after, rss_after - rss_before)
+
+    def check_budget(self) -> bool:
+        """
+        Compare current memory use with the budget, degrading once when it is exceeded.
+
+        Returns:
+            True if the pipeline is running degraded
+        """
+        if self.budget_bytes is None or self.degraded:
+            return self.degraded
+
+        memory_in_use = current_rss_bytes()
+        if memory_in_use is None:
+            memory_in_use = peak_rss_bytes()
+        if memory_in_use > self.budget_bytes:
+            with self._lock:
+                if not self.degraded:
+                    actions = [callback() for callback in self._budget_callbacks]
+                    self.degradation_events.append({
+                        "rss_mb": round(memory_in_use / MEBIBYTE, 1),
+                        "budget_mb": round(self.budget_bytes / MEBIBYTE, 1),
+                        "actions": actions
+                    })
+        return self.degraded
+
+    def top_allocations(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Largest live allocation sites by source line, when tracing."""
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        return [
+            {"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+             "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+            for stat in snapshot.statistics("lineno")[:limit]
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        """Run summary with per-stage and per-document peaks in MiB."""
+        current_rss = current_rss_bytes()
+        return {
+            "peak_rss_mb": round(peak_rss_bytes() / MEBIBYTE, 1),
+            "current_rss_mb": round(current_rss / MEBIBYTE, 1) if current_rss is not None else None,
+            "budget_mb": round(self.budget_bytes / MEBIBYTE, 1) if self.budget_bytes else None,
+            "allocation_tracing": self.trace_allocations,
+            "degraded": self.degraded,
+            "degradation_events": self.degradation_events,
+            "stages": self._format_stats(self.stage_stats),
+            "documents": self._format_stats(self.document_stats),
+            "top_allocations": self.top_allocations()
+        }
+
+    def close(self) -> None:
+        """Stop allocation tracing if this monitor started it."""
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def _open_stages(self) -> List[List[int]]:
+        """Stack of stages open in the calling thread."""
+        if not hasattr(self._thread_state, "open_stages"):
+            self._thread_state.open_stages = []
+        return self._thread_state.open_stages
+
+    def _record(self, stats_table: Dict[str, Dict[str, Any]], key: str,
+                traced_peak: Optional[int], peak_rss: int, rss_growth: int) -> None:
+        """Fold one measurement into a stage or document entry."""
+        entry = stats_table.setdefault(key, {"calls": 0, "traced_peak": 0, "peak_rss": 0, "rss_growth": 0})
+        entry["calls"] += 1
+        if traced_peak is not None:
+            entry["traced_peak"] = max(entry["traced_peak"], traced_peak)
+        entry["peak_rss"] = max(entry["peak_rss"], peak_rss)
+        entry["rss_growth"] += rss_growth
+
+    def _format_stats(self, stats_table: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Convert byte counts to MiB for reporting."""
+        formatted = {}
+        for key, entry in stats_table.items():
+            formatted[key] = {
+                "calls": entry["calls"],
+                "traced_peak_mb": round(entry["traced_peak"] / MEBIBYTE, 2) if self.trace_allocations else None,
+                "peak_rss_mb": round(entry["peak_rss"] / MEBIBYTE, 1),
+                "rss_growth_mb": round(entry["rss_growth"] / MEBIBYTE, 1)
+            }
+        return formatted
@@ -0,0 +1,138 @@
+"""
+Outline Extractor for Challenge 1B - Persona-Driven Document Intelligence
+Page text and font-aware headings from one get_text("dict") parse per page, in the Challenge 1A outline format.
+"""
+
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Any, Tuple
+
+import fitz  # PyMuPDF
+
+BOLD_FLAG = 1 << 4
+# The default "dict" flags also embed every image's bytes, which headings never need
+TEXT_DICT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+HEADING_LEVELS = ("H1", "H2", "H3")
+SENTENCE_END_PATTERN = re.compile(r'[.!?;,]$')
+LETTER_PATTERN = re.compile(r'[^\W\d_]')
+
+# Font style of each reconstructed line: [rounded font size, whole line bold]
+LineStyles = List[List[Any]]
+
+
+def reconstruct_lines(page_dict: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Join a page's spans into lines by baseline, as the Challenge 1A engine does.
+
+    Args:
+        page_dict: Output of page.get_text("dict")
+
+    Returns:
+        Lines in top-to-bottom order with their text, font size and whole-line bold flag
+    """
+    lines_by_baseline = defaultdict(list)
+    for block in page_dict["blocks"]:
+        if block["type"] != 0:
+            continue
+        for line in block["lines"]:
+            for span in line["spans"]:
+                lines_by_baseline[round(span["bbox"][1])].append(span)
+
+    reconstructed = []
+    for baseline in sorted(lines_by_baseline):
+        line_spans = sorted(lines_by_baseline[baseline], key=lambda span: span["bbox"][0])
+        text_spans = [span for span in line_spans if span["text"].strip()]
+        full_text = " ".join(span["text"].strip() for span in text_spans)
+        if full_text:
+            reconstructed.append({
+                "text": full_text,
+                "size": round(line_spans[0]["size"]),
+                "bold": all(span["flags"] & BOLD_FLAG for span in text_spans)
+            })
+    return reconstructed
+
+
+class OutlineExtractor:
+    """Finds headings from font size and weight relative to the document's body text"""
+
+    def __init__(self, min_size_gain: int = 2, max_heading_words: int = 12, max_heading_length: int = 80):
+        """
+        Args:
+            min_size_gain: Points above the body size that make a line a heading without bold
+            max_heading_words: Longer lines are never headings
+            max_heading_length: Longer lines are never headings
+        """
+        self.min_size_gain = min_size_gain
+        self.max_heading_words = max_heading_words
+        self.max_heading_length = max_heading_length
+
+    def parse_page(self, page) -> Tuple[str, LineStyles]:
+        """
+        Parse a page once into its line text and line styles.
+
+        Returns:
+            Tuple of (lines joined with newlines, style of each line)
+        """
+        lines = reconstruct_lines(page.get_text("dict", flags=TEXT_DICT_FLAGS))
+        return "\n".join(line["text"] for line in lines), [[line["size"], line["bold"]] for line in lines]
+
+    def body_size(self, page_styles: List[LineStyles], page_texts: List[str]) -> int:
+        """Font size carrying the most characters in the document."""
+        size_counts = Counter()
+        for line_styles, page_text in zip(page_styles, page_texts):
+            for (font_size, _), line in zip(line_styles, page_text.split("\n")):
+                size_counts[font_size] += len(line)
+        if not size_counts:
+            return 10
+        return max(size_counts.items(), key=lambda item: (item[1], -item[0]))[0]
+
+    def find_headings(self, page_styles: List[LineStyles], page_texts: List[str]) -> List[List[List[Any]]]:
+        """
+        Classify every line of a document as heading or body text.
+
+        Args:
+            page_styles: Line styles of each page, from parse_page
+            page_texts: Line text of each page, from parse_page
+
+        Returns:
+            Per page, [line index, level] of each heading line; larger heading sizes get higher levels
+        """
+        body_size = self.body_size(page_styles, page_texts)
+        heading_lines = []
+        for line_styles, page_text in zip(page_styles, page_texts):
+            heading_lines.append([
+                (line_index, font_size)
+                for line_index, ((font_size, is_bold), line) in enumerate(zip(line_styles, page_text.split("\n")))
+                if self._is_heading(line, font_size - body_size, is_bold)
+            ])
+
+        heading_sizes = sorted({font_size for page_headings in heading_lines for _, font_size in page_headings},
+                               reverse=True)
+        size_levels = {font_size: HEADING_LEVELS[min(rank, len(HEADING_LEVELS) - 1)]
+                       for rank, font_size in enumerate(heading_sizes)}
+        return [[[line_index, size_levels[font_size]] for line_index, font_size in page_headings]
+                for page_headings in heading_lines]
+
+    def build_outline(self, page_texts: List[str], page_headings: List[List[List[Any]]]) -> Dict[str, Any]:
+        """
+        Assemble the Challenge 1A title and outline from classified headings.
+
+        The title is the first heading on page 1 and, as in 1A, is left out of the outline.
+        """
+        title_line = page_headings[0][0][0] if page_headings and page_headings[0] else None
+        outline = []
+        for page_index, headings in enumerate(page_headings):
+            page_lines = page_texts[page_index].split("\n")
+            for line_index, level in headings:
+                if page_index == 0 and line_index == title_line:
+                    continue
+                outline.append({"level": level, "text": page_lines[line_index], "page": page_index + 1})
+        title = page_texts[0].split("\n")[title_line] if title_line is not None else "Untitled Document"
+        return {"title": title, "outline": outline}
+
+    def _is_heading(self, line: str, size_gain: int, is_bold: bool) -> bool:
+        """Check a line's text shape and font against the heading rules."""
+        if (len(line) > self.max_heading_length or len(line.split()) > self.max_heading_words
+                or SENTENCE_END_PATTERN.search(line) or not LETTER_PATTERN.search(line)):
+            return False
+        return size_gain >= self.min_size_gain or (is_bold and size_gain >= 0)
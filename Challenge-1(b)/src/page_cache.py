@@ -0,0 +1,169 @@
+"""
+Page Cache for Challenge 1B - Persona-Driven Document Intelligence
+Per-page text and section candidates keyed by page content hash, for incremental re-analysis.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+# Candidate sections found on one page: (headers, paragraphs, lists)
+PageCandidates = Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]
+# Bumped when cached candidates change shape; version 2 candidates carry char_start/char_end page spans
+CACHE_FORMAT_VERSION = 2
+
+
+def compute_page_hash(pdf_doc, page) -> str:
+    """
+    Hash what a page's text is drawn from without extracting the text.
+
+    Covers the page content streams, the form XObjects they draw and the fonts they use.
+    """
+    digest = hashlib.sha256(page.read_contents())
+    for xobject in page.get_xobjects():
+        digest.update(pdf_doc.xref_stream(xobject[0]) or b"")
+    for font in page.get_fonts():
+        digest.update(repr(font[1:6]).encode())  # extension, type, base font, name, encoding
+    return digest.hexdigest()
+
+
+class PageCache:
+    """LRU cache of page text and section candidates shared by every analyzed document"""
+
+    def __init__(self, max_pages: int = 100000):
+        self.max_pages = max_pages
+        # page hash -> {"text": str, "candidates": PageCandidates, "layout": (str, line styles),
+        #               "term_filter": PageTermFilter.to_list() data}, each possibly None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "pages_reused": 0,
+            "pages_recomputed": 0,
+            "page_scans_reused": 0,
+            "page_scans_recomputed": 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_text(self, page_hash: str) -> Optional[str]:
+        """Return the cached text of a page, counting the page as reused or to be recomputed."""
+        with self._lock:
+            entry = self._entries.get(page_hash)
+            if entry is None or entry["text"] is None:
+                self.stats["pages_recomputed"] += 1
+                return None
+            self._entries.move_to_end(page_hash)
+            self.stats["pages_reused"] += 1
+            return entry["text"]
+
+    def put_text(self, page_hash: str, text: str) -> None:
+        """Store the extracted text of a page."""
+        with self._lock:
+            self._entry_for_update(page_hash)["text"] = text
+    
+    def get_layout(self, page_hash: str) -> Optional[Tuple[str, List[List[Any]]]]:
+        """Return the cached outline text and line styles of a page, counting the page as reused or to be recomputed."""
+        with self._lock:
+            entry = self._entries.get(page_hash)
+            if entry is None or entry["layout"] is None:
+                self.stats["pages_recomputed"] += 1
+                return None
+            self._entries.move_to_end(page_hash)
+            self.stats["pages_reused"] += 1
+            return entry["layout"]
+    
+    def put_layout(self, page_hash: str, text: str, line_styles: List[List[Any]]) -> None:
+        """Store the outline text and line styles parsed from a page's get_text("dict") output."""
+        with self._lock:
+            self._entry_for_update(page_hash)["layout"] = (text, line_styles)
+
+    def get_candidates(self, page_hash: str, page_number: int) -> Optional[PageCandidates]:
+        """Return fresh copies of a page's cached candidates, renumbered to the page's current position."""
+        with self._lock:
+            entry = self._entries.get(page_hash)
+            cached_candidates = entry["candidates"] if entry is not None else None
+            if cached_candidates is None:
+                self.stats["page_scans_recomputed"] += 1
+                return None
+            self.stats["page_scans_reused"] += 1
+        return tuple(
+            [dict(candidate, page_number=page_number) for candidate in candidate_list]
+            for candidate_list in cached_candidates
+        )
+
+    def put_candidates(self, page_hash: str, candidates: PageCandidates) -> None:
+        """Store copies of a page's candidates; kept sections are annotated in place later."""
+        with self._lock:
+            entry = self._entries.get(page_hash)
+            if entry is not None:
+                entry["candidates"] = tuple(
+                    [dict(candidate) for candidate in candidate_list] for candidate_list in candidates
+                )
+
+    def get_term_filter(self, page_hash: str) -> Optional[List[Any]]:
+        """Return the cached term filter data of a page, if any."""
+        with self._lock:
+            entry = self._entries.get(page_hash)
+            return entry["term_filter"] if entry is not None else None
+    
+    def put_term_filter(self, page_hash: str, filter_data: List[Any]) -> None:
+        """Store a page's term filter data next to its cached text."""
+        with self._lock:
+            entry = self._entries.get(page_hash)
+            if entry is not None:
+                entry["term_filter"] = filter_data
+    
+    def _entry_for_update(self, page_hash: str) -> Dict[str, Any]:
+        """Return a page's entry as most recently used, creating it and evicting the oldest if needed."""
+        entry = self._entries.get(page_hash)
+        if entry is None:
+            entry = self._entries[page_hash] = {"text": None, "candidates": None, "layout": None, "term_filter": None}
+            while len(self._entries) > self.max_pages:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(page_hash)
+        return entry
+    
+    def save(self, cache_path: str) -> None:
+        """Write the cache as JSON, replacing the file atomically."""
+        with self._lock:
+            cache_data = {
+                "format_version": CACHE_FORMAT_VERSION,
+                "max_pages": self.max_pages,
+                "pages": [[page_hash, entry["text"], entry["candidates"], entry["layout"], entry["term_filter"]]
+                          for page_hash, entry in self._entries.items()]
+            }
+        temporary_path = f"{cache_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as cache_file:
+            json.dump(cache_data, cache_file)
+        os.replace(temporary_path, cache_path)
+
+    @classmethod
+    def load(cls, cache_path: str) -> "PageCache":
+        """
+        Read a cache written by save(), or start an empty one if the file does not exist.
+
+        Candidates saved by another format version are dropped and recomputed; page text is kept.
+        """
+        if not os.path.exists(cache_path):
+            return cls()
+        with open(cache_path, "r", encoding="utf-8") as cache_file:
+            cache_data = json.load(cache_file)
+        page_cache = cls(cache_data.get("max_pages", 100000))
+        # Caches written before versioning have no page spans, which would disable overlap collapse
+        candidates_current = cache_data.get("format_version", 1) == CACHE_FORMAT_VERSION
+        for page_hash, text, candidates, *page_extras in cache_data["pages"]:
+            if not candidates_current:
+                candidates = None
+            # Caches written before layouts or term filters existed have fewer fields
+            layout, term_filter = (page_extras + [None, None])[:2]
+            page_cache._entries[page_hash] = {
+                "text": text,
+                "candidates": tuple(candidates) if candidates is not None else None,
+                "layout": tuple(layout) if layout is not None else None,
+                "term_filter": term_filter
+            }
+        return page_cache
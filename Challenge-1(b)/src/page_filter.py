@@ -0,0 +1,140 @@
+"""
+Page Filter for Challenge 1B - Persona-Driven Document Intelligence
+Per-page bloom filters of normalized tokens that let a query skip pages without any of its terms.
+"""
+
+import hashlib
+import math
+from typing import Dict, List, Any, Iterable, Iterator, Tuple
+
+from keyword_matcher import WORD_PATTERN
+
+# (first hash, second hash) of a term, combined into the filter's bit positions
+TermHash = Tuple[int, int]
+
+
+def page_terms(page_text: str) -> set:
+    """Normalized tokens of a page: lowercase words, as the persona matcher tokenizes text."""
+    return set(WORD_PATTERN.findall(page_text.lower()))
+
+
+class PageTermFilter:
+    """Bloom filter over one page's terms: no false negatives, configurable false positives"""
+
+    __slots__ = ("bit_count", "hash_count", "false_positive_rate", "bits")
+
+    def __init__(self, bit_count: int, hash_count: int, false_positive_rate: float, bits: bytearray = None):
+        self.bit_count = bit_count
+        self.hash_count = hash_count
+        self.false_positive_rate = false_positive_rate
+        self.bits = bits if bits is not None else bytearray((bit_count + 7) // 8)
+
+    @classmethod
+    def from_terms(cls, terms: Iterable[str], false_positive_rate: float) -> "PageTermFilter":
+        """Build a filter sized for the terms at the requested false-positive rate."""
+        terms = set(terms)
+        term_count = max(len(terms), 1)
+        bit_count = max(8, math.ceil(-term_count * math.log(false_positive_rate) / math.log(2) ** 2))
+        hash_count = max(1, round(bit_count / term_count * math.log(2)))
+        term_filter = cls(bit_count, hash_count, false_positive_rate)
+        for term in terms:
+            term_filter.add_hash(cls.hash_term(term))
+        return term_filter
+
+    @staticmethod
+    def hash_term(term: str) -> TermHash:
+        """Stable hash pair of a term, so filters stay valid across runs."""
+        digest = hashlib.blake2b(term.encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+
+    def add_hash(self, term_hash: TermHash) -> None:
+        """Set the bits of a hashed term."""
+        for position in self._bit_positions(term_hash):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain_hash(self, term_hash: TermHash) -> bool:
+        """False only if the hashed term is certainly not on the page."""
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._bit_positions(term_hash))
+
+    def might_contain_any(self, term_hashes: Iterable[TermHash]) -> bool:
+        """False only if none of the hashed terms is on the page."""
+        return any(self.might_contain_hash(term_hash) for term_hash in term_hashes)
+
+    def _bit_positions(self, term_hash: TermHash) -> Iterator[int]:
+        """Enhanced double hashing: plain double hashing repeats positions when the step shares factors with bit_count."""
+        first_hash, second_hash = term_hash
+        position = first_hash % self.bit_count
+        step = second_hash % self.bit_count
+        for hash_index in range(self.hash_count):
+            yield position
+            position = (position + step) % self.bit_count
+            step = (step + hash_index + 1) % self.bit_count
+
+    def to_list(self) -> List[Any]:
+        """JSON-serializable form, read back by from_list()."""
+        return [self.bit_count, self.hash_count, self.false_positive_rate, self.bits.hex()]
+
+    @classmethod
+    def from_list(cls, filter_data: List[Any]) -> "PageTermFilter":
+        """Rebuild a filter written by to_list()."""
+        bit_count, hash_count, false_positive_rate, bits_hex = filter_data
+        return cls(bit_count, hash_count, false_positive_rate, bytearray.fromhex(bits_hex))
+
+
+class PagePrefilter:
+    """Removes a query's sections on pages whose term filters rule out every query term"""
+
+    def __init__(self):
+        self.stats = {
+            "pages_checked": 0,
+            "pages_pruned": 0,
+            "sections_pruned": 0,
+            "queries_unpruned": 0  # too few sections would have survived, so nothing was pruned
+        }
+
+    def prune(self, document_analyses: List[Dict[str, Any]], query_terms: Iterable[str],
+              min_sections: int) -> Tuple[List[Dict[str, Any]], Tuple[Tuple[int, ...], ...]]:
+        """
+        Drop the sections of pages that cannot contain any query term.
+
+        Args:
+            document_analyses: Pooled analyses whose pages carry term filters; never modified
+            query_terms: Normalized terms a section needs one of to score for the query
+            min_sections: Keep everything if fewer sections would survive
+
+        Returns:
+            Analysis views holding only the surviving sections, and the pruned page numbers per document
+        """
+        term_hashes = [PageTermFilter.hash_term(term) for term in set(query_terms)]
+        pruned_pages = []
+        for analysis in document_analyses:
+            document_pruned = []
+            for page in analysis.get("pages", []):
+                term_filter = page.get("term_filter")
+                if term_filter is None:
+                    continue
+                self.stats["pages_checked"] += 1
+                if not term_filter.might_contain_any(term_hashes):
+                    document_pruned.append(page["page_number"])
+            pruned_pages.append(tuple(document_pruned))
+
+        pruned_views = []
+        surviving_count = 0
+        for analysis, document_pruned in zip(document_analyses, pruned_pages):
+            pruned_set = set(document_pruned)
+            surviving_sections = [section for section in analysis.get("sections", [])
+                                  if section.get("page_number") not in pruned_set]
+            surviving_count += len(surviving_sections)
+            pruned_views.append(dict(analysis, sections=surviving_sections))
+
+        if surviving_count < min_sections:
+            self.stats["queries_unpruned"] += 1
+            return document_analyses, tuple(() for _ in document_analyses)
+
+        self.stats["pages_pruned"] += sum(len(document_pruned) for document_pruned in pruned_pages)
+        self.stats["sections_pruned"] += sum(
+            len(analysis.get("sections", [])) - len(view["sections"])
+            for analysis, view in zip(document_analyses, pruned_views)
+        )
+        return pruned_views, tuple(pruned_pages)
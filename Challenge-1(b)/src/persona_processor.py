@@ -3,11 +3,62 @@ Persona Processor for Challenge 1B - Persona-Driven Document Intelligence
 Applies persona-specific context and perspective to document analysis.
 """
 
-import re
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 from collections import Counter
 import math
 
+from keyword_matcher import KeywordMatcher, WORD_PATTERN
+from section_record import SectionRecord
+
+
+class PersonaQuery:
+    """Persona, job and insight vocabularies compiled once per query into one matcher"""
+    
+    __slots__ = ("role_category", "task_category", "role_term_set", "task_term_set",
+                 "task_word_set", "insight_rules", "matcher")
+    
+    def __init__(self, role_category: str, task_category: str, task_description: str,
+                 role_terms: Dict[str, List[str]], task_terms: Dict[str, List[str]],
+                 insight_rules: List[Tuple[Tuple[str, ...], str]]):
+        self.role_category = role_category
+        self.task_category = task_category
+        self.role_term_set = frozenset(role_terms.get(role_category, []))
+        self.task_term_set = frozenset(task_terms.get(task_category, []))
+        # Direct task matches and job alignment both use task words of 4+ characters
+        self.task_word_set = frozenset(
+            word for word in WORD_PATTERN.findall(task_description.lower()) if len(word) > 3
+        )
+        self.insight_rules = insight_rules
+        
+        insight_keywords = [keyword for keywords, _ in insight_rules for keyword in keywords]
+        self.matcher = KeywordMatcher(
+            list(self.role_term_set) + list(self.task_term_set) + list(self.task_word_set) + insight_keywords
+        )
+
+
+class TokenizedSection:
+    """Token counts and keyword hits of one section, from a single scan of its text"""
+    
+    __slots__ = ("content_token_count", "title_token_count", "content_hits", "title_hits")
+    
+    def __init__(self, content: str, title: str, matcher: KeywordMatcher):
+        self.content_token_count, self.content_hits = matcher.scan(content.lower())
+        self.title_token_count, self.title_hits = matcher.scan(title.lower())
+    
+    @property
+    def token_count(self) -> int:
+        """Number of tokens in content and title together."""
+        return self.content_token_count + self.title_token_count
+    
+    def whole_word_hits(self, include_title: bool = True) -> List[str]:
+        """Keywords that matched entire tokens, in text order."""
+        hits = self.content_hits + self.title_hits if include_title else self.content_hits
+        return [keyword for _, keyword, whole_word in hits if whole_word]
+    
+    def content_keywords(self) -> set:
+        """Every keyword occurring anywhere in the content, including inside longer words."""
+        return {keyword for _, keyword, _ in self.content_hits}
+
 
 class PersonaProcessor:
     """Processes documents through a specific persona lens"""
@@ -31,64 +82,52 @@ class PersonaProcessor:
             "prepare": ["prepare", "plan", "organize", "design", "develop", "create"],
             "summarize": ["summarize", "condense", "extract", "highlight", "synthesize", "distill"]
         }
+        
+        # Insights reported when any of the keywords occurs in a section's content
+        self.role_insight_rules = {
+            "researcher": [
+                (("methodology", "method", "approach"), "Research methodology identified"),
+                (("data", "dataset", "sample"), "Data sources and datasets mentioned"),
+                (("result", "finding", "conclusion"), "Research findings and results presented")
+            ],
+            "student": [
+                (("concept", "principle", "theory"), "Key concepts for learning identified"),
+                (("example", "illustration", "case"), "Examples and illustrations available"),
+                (("exercise", "problem", "practice"), "Practice materials and exercises found")
+            ],
+            "analyst": [
+                (("trend", "pattern", "analysis"), "Analytical insights and trends identified"),
+                (("metric", "kpi", "performance"), "Performance metrics and KPIs mentioned"),
+                (("forecast", "prediction", "projection"), "Forecasting and predictive information")
+            ]
+        }
+        self.task_insight_rules = {
+            "review": [(("summary", "overview", "abstract"), "Summary content suitable for review")],
+            "analyze": [(("comparison", "contrast", "versus"), "Comparative analysis opportunities")]
+        }
 
-    def _compute_task_alignment_score(self, content_text: str, job_description: str) -> float:
+    def _compute_task_alignment_score(self, section_tokens: TokenizedSection, persona_query: PersonaQuery) -> float:
         """Calculate how well content aligns with the specific job task"""
-        lower_content = content_text.lower()
-        lower_job = job_description.lower()
-        
-        # Extract key terms from job task
-        job_keywords = set(re.findall(r'\b\w{4,}\b', lower_job))  # Words with 4+ characters
-        content_words = set(re.findall(r'\b\w{4,}\b', lower_content))
+        job_keywords = persona_query.task_word_set
         
         if not job_keywords:
             return 0.0
         
         # Calculate overlap
-        common_terms = len(job_keywords.intersection(content_words))
+        common_terms = len(job_keywords.intersection(section_tokens.whole_word_hits()))
         alignment_score = common_terms / len(job_keywords)
         
         return min(alignment_score, 1.0)
 
-    def _extract_role_specific_observations(self, content_text: str, persona_type: str, job_type: str) -> List[str]:
+    def _extract_role_specific_observations(self, section_tokens: TokenizedSection, persona_query: PersonaQuery) -> List[str]:
         """Extract insights specific to the persona's perspective"""
-        insights = []
-        lower_text = content_text.lower()
-        
-        # Persona-specific insights
-        if persona_type == "researcher":
-            if any(keyword in lower_text for keyword in ["methodology", "method", "approach"]):
-                insights.append("Research methodology identified")
-            if any(keyword in lower_text for keyword in ["data", "dataset", "sample"]):
-                insights.append("Data sources and datasets mentioned")
-            if any(keyword in lower_text for keyword in ["result", "finding", "conclusion"]):
-                insights.append("Research findings and results presented")
-        
-        elif persona_type == "student":
-            if any(keyword in lower_text for keyword in ["concept", "principle", "theory"]):
-                insights.append("Key concepts for learning identified")
-            if any(keyword in lower_text for keyword in ["example", "illustration", "case"]):
-                insights.append("Examples and illustrations available")
-            if any(keyword in lower_text for keyword in ["exercise", "problem", "practice"]):
-                insights.append("Practice materials and exercises found")
-        
-        elif persona_type == "analyst":
-            if any(keyword in lower_text for keyword in ["trend", "pattern", "analysis"]):
-                insights.append("Analytical insights and trends identified")
-            if any(keyword in lower_text for keyword in ["metric", "kpi", "performance"]):
-                insights.append("Performance metrics and KPIs mentioned")
-            if any(keyword in lower_text for keyword in ["forecast", "prediction", "projection"]):
-                insights.append("Forecasting and predictive information")
-        
-        # Job-specific insights
-        if job_type == "review":
-            if any(keyword in lower_text for keyword in ["summary", "overview", "abstract"]):
-                insights.append("Summary content suitable for review")
-        elif job_type == "analyze":
-            if any(keyword in lower_text for keyword in ["comparison", "contrast", "versus"]):
-                insights.append("Comparative analysis opportunities")
-        
-        return insights
+        matched_keywords = section_tokens.content_keywords()
+        
+        # Persona-specific insights first, then job-specific ones
+        return [
+            insight for keywords, insight in persona_query.insight_rules
+            if any(keyword in matched_keywords for keyword in keywords)
+        ]
 
     def _determine_importance_level(self, relevance_metric: float, observation_list: List[str], concept_list: List[str]) -> str:
         """Determine section priority based on persona analysis"""
@@ -99,27 +138,21 @@ class PersonaProcessor:
         else:
             return "low"
 
-    def _find_relevant_concepts(self, text_content: str, role_category: str) -> List[str]:
+    def _find_relevant_concepts(self, section_tokens: TokenizedSection, persona_query: PersonaQuery) -> List[str]:
         """Identify key concepts relevant to the persona"""
-        normalized_content = text_content.lower()
-        word_tokens = re.findall(r'\b\w+\b', normalized_content)
-        
-        # Filter for relevant keywords based on persona
-        applicable_terms = self.role_terms.get(role_category, [])
-        
-        # Count frequency of relevant words
-        token_frequency = Counter(word_tokens)
+        applicable_terms = persona_query.role_term_set
         
-        # Extract most common relevant concepts
+        # Extract relevant concepts in order of first appearance
         important_concepts = []
-        for token in word_tokens:
-            if (token in applicable_terms and 
-                token_frequency[token] >= 1 and 
-                len(token) > 3 and 
-                token not in important_concepts):
-                important_concepts.append(token)
-        
-        return important_concepts[:10]  # Return top 10 concepts
+        for keyword in section_tokens.whole_word_hits(include_title=False):
+            if (keyword in applicable_terms and 
+                len(keyword) > 3 and 
+                keyword not in important_concepts):
+                important_concepts.append(keyword)
+                if len(important_concepts) == 10:
+                    break
+        
+        return important_concepts  # Return top 10 concepts
 
     def process_with_persona(self, doc_analysis: Dict[str, Any], user_persona: Dict[str, str], user_job: Dict[str, str]) -> Dict[str, Any]:
         """
@@ -131,7 +164,18 @@ class PersonaProcessor:
             user_job: Job-to-be-done specification
             
         Returns:
-            Enhanced analysis with persona-specific insights
+            Enhanced analysis with persona-specific insights; sections are new plain dicts
+        """
+        persona_view = self.persona_records(doc_analysis, user_persona, user_job)
+        persona_view["sections"] = [section.to_dict() for section in persona_view["sections"]]
+        return persona_view
+    
+    def persona_records(self, doc_analysis: Dict[str, Any], user_persona: Dict[str, str], user_job: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Same as process_with_persona, with sections as SectionRecords over the input sections instead of copies.
+        
+        For the ranking paths only: records are read through dict-style access and the
+        rankers return plain dicts, so records never reach the output.
         """
         role_description = user_persona.get("role", "").lower()
         task_description = user_job.get("task", "").lower()
@@ -139,13 +183,12 @@ class PersonaProcessor:
         # Identify persona type
         detected_role = self._classify_user_role(role_description)
         detected_task = self._classify_user_task(task_description)
+        persona_query = self.compile_query(detected_role, detected_task, task_description)
         
         # Process sections with persona context
         processed_sections = []
         for section_data in doc_analysis.get("sections", []):
-            enhanced_data = self._augment_section_with_role_context(
-                section_data, detected_role, detected_task, role_description, task_description
-            )
+            enhanced_data = self._augment_section_with_role_context(section_data, persona_query)
             processed_sections.append(enhanced_data)
         
         # Generate persona-specific metadata
@@ -161,28 +204,41 @@ class PersonaProcessor:
             "sections": processed_sections
         }
 
-    def _compute_relevance_score(self, text_content: str, role_category: str, task_category: str, task_description: str) -> float:
+    def query_terms(self, user_persona: Dict[str, str], user_job: Dict[str, str]) -> frozenset:
+        """Whole-word persona and job terms; a section with none of them gets zero relevance and job alignment"""
+        task_description = user_job.get("task", "").lower()
+        persona_query = self.compile_query(
+            self._classify_user_role(user_persona.get("role", "").lower()),
+            self._classify_user_task(task_description),
+            task_description
+        )
+        return persona_query.role_term_set | persona_query.task_term_set | persona_query.task_word_set
+
+    def compile_query(self, role_category: str, task_category: str, task_description: str) -> PersonaQuery:
+        """Compile the persona, job and insight vocabularies used to score every section"""
+        insight_rules = self.role_insight_rules.get(role_category, []) + self.task_insight_rules.get(task_category, [])
+        return PersonaQuery(role_category, task_category, task_description,
+                            self.role_terms, self.task_terms, insight_rules)
+
+    def _compute_relevance_score(self, section_tokens: TokenizedSection, persona_query: PersonaQuery) -> float:
         """Calculate how relevant content is to the persona"""
-        normalized_content = text_content.lower()
-        word_tokens = re.findall(r'\b\w+\b', normalized_content)
-        token_count = len(word_tokens)
+        token_count = section_tokens.token_count
         
         if token_count == 0:
             return 0.0
         
-        # Score based on persona keywords
-        role_specific_terms = self.role_terms.get(role_category, [])
-        role_matches = sum(1 for token in word_tokens if token in role_specific_terms)
-        role_relevance = role_matches / token_count
+        # Count persona, job and specific task keyword matches from the hit list
+        role_matches = task_matches = direct_matches = 0
+        for keyword in section_tokens.whole_word_hits():
+            if keyword in persona_query.role_term_set:
+                role_matches += 1
+            if keyword in persona_query.task_term_set:
+                task_matches += 1
+            if keyword in persona_query.task_word_set:
+                direct_matches += 1
         
-        # Score based on job keywords
-        task_specific_terms = self.task_terms.get(task_category, [])
-        task_matches = sum(1 for token in word_tokens if token in task_specific_terms)
+        role_relevance = role_matches / token_count
         task_relevance = task_matches / token_count
-        
-        # Score based on specific job task terms
-        task_word_set = set(re.findall(r'\b\w+\b', task_description.lower()))
-        direct_matches = sum(1 for token in word_tokens if token in task_word_set and len(token) > 3)
         direct_relevance = direct_matches / token_count
         
         # Weighted combination
@@ -230,29 +286,30 @@ class PersonaProcessor:
             "top_insights": key_observations
         }
 
-    def _augment_section_with_role_context(self, section_data: Dict[str, Any], role_category: str, task_category: str, role_description: str, task_description: str) -> Dict[str, Any]:
+    def _augment_section_with_role_context(self, section_data: Dict[str, Any], persona_query: PersonaQuery) -> SectionRecord:
         """Enhance a section with persona-specific analysis"""
         section_content = section_data.get("content", "")
         section_header = section_data.get("section_title", "")
         
+        # Find every vocabulary hit in one scan; all scorers below read the hit list
+        section_tokens = TokenizedSection(section_content, section_header, persona_query.matcher)
+        
         # Calculate persona relevance score
-        relevance_metric = self._compute_relevance_score(section_content + " " + section_header, role_category, task_category, task_description)
+        relevance_metric = self._compute_relevance_score(section_tokens, persona_query)
         
         # Extract persona-specific insights
-        role_observations = self._extract_role_specific_observations(section_content, role_category, task_category)
+        role_observations = self._extract_role_specific_observations(section_tokens, persona_query)
         
         # Identify key concepts
-        important_concepts = self._find_relevant_concepts(section_content, role_category)
-        
-        # Enhanced section with persona context
-        augmented_section = section_data.copy()
-        augmented_section.update({
-            "persona_relevance_score": relevance_metric,
-            "persona_insights": role_observations,
-            "key_concepts": important_concepts,
-            "persona_priority": self._determine_importance_level(relevance_metric, role_observations, important_concepts),
-            "job_alignment_score": self._compute_task_alignment_score(section_content + " " + section_header, task_description)
-        })
+        important_concepts = self._find_relevant_concepts(section_tokens, persona_query)
+        
+        # Persona context goes in a compact record; the section dict itself is shared, not copied
+        augmented_section = SectionRecord(section_data)
+        augmented_section.persona_relevance_score = relevance_metric
+        augmented_section.persona_insights = role_observations
+        augmented_section.key_concepts = important_concepts
+        augmented_section.persona_priority = self._determine_importance_level(relevance_metric, role_observations, important_concepts)
+        augmented_section.job_alignment_score = self._compute_task_alignment_score(section_tokens, persona_query)
         
         return augmented_section
 
@@ -0,0 +1,162 @@
+"""
+Pipeline Profiler for Challenge 1B - Persona-Driven Document Intelligence
+Per-stage cProfile statistics and sampled collapsed stacks for flamegraph tools.
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterator
+
+
+class PipelineProfiler:
+    """Profiles named pipeline stages with cProfile and samples their call stacks"""
+
+    def __init__(self, sample_interval: float = 0.005, max_stack_depth: int = 128):
+        """
+        Args:
+            sample_interval: Seconds between call stack samples
+            max_stack_depth: Innermost frames kept per sample
+        """
+        self.sample_interval = sample_interval
+        self.max_stack_depth = max_stack_depth
+        self._profiles = {}  # (stage name, thread id) -> cProfile.Profile
+        self._collapsed_stacks = {}  # stage name -> Counter of "frame;frame;..." -> samples
+        # Per thread: open (stage name, profile) pairs. cProfile profiles one thread and
+        # cannot nest, so entering a stage pauses the enclosing stage's profile.
+        self._thread_state = threading.local()
+        self._stage_paths = {}  # thread id -> open stage names, read by the sampler
+        self._lock = threading.Lock()
+        self._stop_sampling = threading.Event()
+        self._sampler_thread = None
+
+    def start(self) -> None:
+        """Start sampling call stacks in a background thread."""
+        self._stop_sampling.clear()
+        self._sampler_thread = threading.Thread(target=self._sample_stacks, name="profile-sampler", daemon=True)
+        self._sampler_thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        if self._sampler_thread is not None:
+            self._stop_sampling.set()
+            self._sampler_thread.join()
+            self._sampler_thread = None
+
+    @contextmanager
+    def stage(self, stage_name: str) -> Iterator[None]:
+        """Attribute the calling thread's work in this block to a stage."""
+        thread_id = threading.get_ident()
+        open_stages = self._open_stages()
+        with self._lock:
+            profile = self._profiles.setdefault((stage_name, thread_id), cProfile.Profile())
+        if open_stages:
+            open_stages[-1][1].disable()
+        open_stages.append((stage_name, profile))
+        self._stage_paths[thread_id] = tuple(name for name, _ in open_stages)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            open_stages.pop()
+            self._stage_paths[thread_id] = tuple(name for name, _ in open_stages)
+            if open_stages:
+                open_stages[-1][1].enable()
+
+    def stage_stats(self) -> Dict[str, pstats.Stats]:
+        """cProfile statistics per stage, merged across threads; stages without calls are left out."""
+        stats_by_stage = {}
+        with self._lock:
+            profiles = list(self._profiles.items())
+        for (stage_name, _), profile in profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if stage_name in stats_by_stage:
+                stats_by_stage[stage_name].add(profile)
+            else:
+                stats_by_stage[stage_name] = pstats.Stats(profile)
+        return stats_by_stage
+
+    def top_functions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Functions with the most time spent in their own code, across all stages."""
+        function_totals = {}
+        for stage_stats in self.stage_stats().values():
+            for function_key, (_, call_count, own_seconds, total_seconds, _) in stage_stats.stats.items():
+                totals = function_totals.setdefault(function_key, [0, 0.0, 0.0])
+                totals[0] += call_count
+                totals[1] += own_seconds
+                totals[2] += total_seconds
+        hottest = sorted(function_totals.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {"function": self._function_label(function_key), "calls": call_count,
+             "own_seconds": round(own_seconds, 4), "cumulative_seconds": round(total_seconds, 4)}
+            for function_key, (call_count, own_seconds, total_seconds) in hottest
+        ]
+
+    def write_reports(self, output_directory: str) -> List[str]:
+        """
+        Write <stage>.pstats and <stage>.collapsed per stage, plus all.collapsed.
+
+        Returns:
+            Paths of the written files
+        """
+        os.makedirs(output_directory, exist_ok=True)
+        written_paths = []
+        for stage_name, stage_stats in self.stage_stats().items():
+            stats_path = os.path.join(output_directory, f"{stage_name}.pstats")
+            stage_stats.dump_stats(stats_path)
+            written_paths.append(stats_path)
+
+        with self._lock:
+            collapsed_stacks = {stage_name: Counter(stacks) for stage_name, stacks in self._collapsed_stacks.items()}
+        all_stacks = Counter()
+        for stage_name, stacks in collapsed_stacks.items():
+            written_paths.append(self._write_collapsed(os.path.join(output_directory, f"{stage_name}.collapsed"), stacks))
+            all_stacks.update(stacks)
+        written_paths.append(self._write_collapsed(os.path.join(output_directory, "all.collapsed"), all_stacks))
+        return written_paths
+
+    def _open_stages(self) -> List[Any]:
+        """Stack of stages open in the calling thread."""
+        if not hasattr(self._thread_state, "open_stages"):
+            self._thread_state.open_stages = []
+        return self._thread_state.open_stages
+
+    def _sample_stacks(self) -> None:
+        """Record the call stack of every thread inside a stage, keyed by its innermost stage."""
+        while not self._stop_sampling.wait(self.sample_interval):
+            current_frames = sys._current_frames()
+            for thread_id, stage_path in list(self._stage_paths.items()):
+                frame = current_frames.get(thread_id)
+                if not stage_path or frame is None:
+                    continue
+                frame_labels = []
+                while frame is not None and len(frame_labels) < self.max_stack_depth:
+                    code = frame.f_code
+                    # co_qualname is Python 3.11+; the containers run 3.10
+                    code_name = getattr(code, "co_qualname", code.co_name)
+                    frame_labels.append(f"{os.path.basename(code.co_filename)}:{code_name}")
+                    frame = frame.f_back
+                collapsed_stack = ";".join([f"[{stage_name}]" for stage_name in stage_path] + frame_labels[::-1])
+                with self._lock:
+                    self._collapsed_stacks.setdefault(stage_path[-1], Counter())[collapsed_stack] += 1
+
+    def _write_collapsed(self, collapsed_path: str, stacks: Counter) -> str:
+        """Write stacks in the collapsed format read by flamegraph.pl and speedscope."""
+        with open(collapsed_path, "w", encoding="utf-8") as collapsed_file:
+            for collapsed_stack, sample_count in stacks.most_common():
+                collapsed_file.write(f"{collapsed_stack} {sample_count}\n")
+        return collapsed_path
+
+    def _function_label(self, function_key) -> str:
+        """Readable name for a pstats (file, line, function) key."""
+        filename, line_number, function_name = function_key
+        if filename == "~":
+            return function_name  # built-in
+        return f"{os.path.basename(filename)}:{line_number}({function_name})"
@@ -2,9 +2,13 @@
 Section Ranker for Challenge 1B - Persona-Driven Document Intelligence
 """
 
-import math
-from typing import Dict, List, Any
-from collections import Counter
+import heapq
+from array import array
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+
+from corpus_index import CorpusIndex
 
 
 class SectionRanker:
@@ -30,32 +34,133 @@ class SectionRanker:
         keyword_collection = set(word for word in text_combined.split() if len(word) > 2)
         return keyword_collection
 
-    def rank_sections(self, section_list: List[Dict[str, Any]], persona_info: Dict[str, str], task_info: Dict[str, str]) -> List[Dict[str, Any]]:
-        """Rank sections by relevance to persona and job context"""
+    def build_corpus_index(self, section_list: Iterable[Dict[str, Any]]) -> CorpusIndex:
+        """Build the collection-wide inverted index used for relevance scoring"""
+        return CorpusIndex.from_sections(section_list)
+
+    def rank_sections(self, section_list: List[Dict[str, Any]], persona_info: Dict[str, str], task_info: Dict[str, str],
+                      corpus_index: CorpusIndex = None) -> List[Dict[str, Any]]:
+        """Rank sections by relevance to persona and job context, returning scored copies"""
         if not section_list:
             return []
         
+        # One index per collection; callers ranking several queries can pass it in
+        if corpus_index is None:
+            corpus_index = self.build_corpus_index(section_list)
+        elif corpus_index.section_count != len(section_list):
+            raise ValueError("corpus_index was not built from this section list")
+        
         # Create persona context from persona and job
         context_info = self._build_persona_context(persona_info, task_info)
         
+        # Score all sections against the context in one batched pass
+        semantic_scores = self._compute_tfidf_relevance(corpus_index, context_info)
+        
         # Calculate scores for each section
         sorted_sections = []
-        for section_item in section_list:
-            score_value = self._compute_final_score(section_item, context_info)
+        for section_index, section_item in enumerate(section_list):
+            score_value = self._compute_final_score(
+                section_item, semantic_scores[section_index], corpus_index.section_lengths[section_index]
+            )
             modified_section = section_item.copy()
             modified_section['relevance_score'] = score_value
             modified_section['final_relevance_score'] = score_value
             sorted_sections.append(modified_section)
         
         # Sort by score descending
-        sorted_sections.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+        sorted_sections.sort(key=itemgetter('relevance_score'), reverse=True)
         
         return sorted_sections
 
-    def _calculate_word_frequencies(self, content_text: str) -> Counter:
-        """Calculate word frequency distribution"""
-        word_tokens = content_text.lower().split()
-        return Counter(word_tokens)
+    def rank_top_k(self, section_stream: Iterable[Dict[str, Any]], persona_info: Dict[str, str],
+                   task_info: Dict[str, str], top_k: int, corpus_index: CorpusIndex,
+                   section_offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Rank a stream of sections keeping only the best top_k.
+        
+        Args:
+            section_stream: Sections in the same order they were added to corpus_index
+            persona_info: Persona configuration with role description
+            task_info: Job-to-be-done specification
+            top_k: Number of sections to keep
+            corpus_index: Index built over the whole collection, supplying IDF weights
+            section_offset: Index position of the first streamed section
+            
+        Returns:
+            Scored copies of the top_k sections, best first, in the same order
+            rank_sections would give them
+        """
+        if top_k <= 0:
+            return []
+        
+        context_info = self._build_persona_context(persona_info, task_info)
+        semantic_scores = self._compute_raw_tfidf_relevance(corpus_index, context_info)
+        return self._select_top_k(section_stream, semantic_scores, top_k, corpus_index, section_offset)
+
+    def rank_documents_top_k(self, document_streams: Iterable[Iterable[Dict[str, Any]]], persona_info: Dict[str, str],
+                             task_info: Dict[str, str], top_k: int, corpus_index: CorpusIndex) -> List[Dict[str, Any]]:
+        """Rank each document's section stream to its own top_k, then fold the lists into one running top_k"""
+        if top_k <= 0:
+            return []
+        
+        # Query scoring is corpus-wide, so it runs once for all documents
+        context_info = self._build_persona_context(persona_info, task_info)
+        semantic_scores = self._compute_raw_tfidf_relevance(corpus_index, context_info)
+        return self.merge_ranked(
+            self._iter_document_rankings(document_streams, semantic_scores, top_k, corpus_index),
+            top_k
+        )
+
+    def merge_ranked(self, ranked_lists: Iterable[List[Dict[str, Any]]], top_k: int) -> List[Dict[str, Any]]:
+        """Fold best-first ranked lists into a running top_k; ties keep the order of the lists"""
+        merged_sections = []
+        # Lists are pulled one at a time, so only the running top_k and the current list are alive
+        for ranked_sections in ranked_lists:
+            merged_sections = list(islice(
+                heapq.merge(merged_sections, ranked_sections, key=itemgetter('relevance_score'), reverse=True),
+                top_k
+            ))
+        return merged_sections
+
+    def _iter_document_rankings(self, document_streams: Iterable[Iterable[Dict[str, Any]]],
+                                semantic_scores: Optional[array], top_k: int,
+                                corpus_index: CorpusIndex) -> Iterator[List[Dict[str, Any]]]:
+        """Yield per-document top_k lists, tracking each document's position in the index"""
+        section_offset = 0
+        for document_stream in document_streams:
+            counted_stream = _CountingIterator(document_stream)
+            yield self._select_top_k(counted_stream, semantic_scores, top_k, corpus_index, section_offset)
+            section_offset += counted_stream.count
+
+    def _select_top_k(self, section_stream: Iterable[Dict[str, Any]], semantic_scores: Optional[array],
+                      top_k: int, corpus_index: CorpusIndex, section_offset: int) -> List[Dict[str, Any]]:
+        """Keep the top_k scored sections of a stream in a bounded heap and copy only those"""
+        section_lengths = corpus_index.section_lengths
+        
+        # Min-heap of (score, -index, section): the root is the weakest kept section,
+        # and on equal scores the later section loses, as in the stable full sort
+        top_heap = []
+        for section_index, section_item in enumerate(section_stream, start=section_offset):
+            if section_index >= corpus_index.section_count:
+                raise ValueError("corpus_index does not cover every streamed section")
+            # Same capping and no-context default as _compute_tfidf_relevance
+            semantic_score = min(semantic_scores[section_index], 1.0) if semantic_scores is not None else 0.5
+            score_value = self._compute_final_score(section_item, semantic_score, section_lengths[section_index])
+            heap_entry = (score_value, -section_index, section_item)
+            if len(top_heap) < top_k:
+                heapq.heappush(top_heap, heap_entry)
+            elif heap_entry[:2] > top_heap[0][:2]:
+                heapq.heapreplace(top_heap, heap_entry)
+        
+        # Only the winners are copied; SectionRecord inputs become plain dicts here
+        ranked_sections = []
+        for score_value, _, section_item in sorted(top_heap, key=itemgetter(0, 1), reverse=True):
+            modified_section = section_item.copy()
+            modified_section['relevance_score'] = score_value
+            modified_section['final_relevance_score'] = score_value
+            ranked_sections.append(modified_section)
+        
+        return ranked_sections
 
     def _build_persona_context(self, persona_info: Dict[str, str], task_info: Dict[str, str]) -> Dict[str, Any]:
         """Build context dictionary from persona and job information"""
@@ -64,10 +169,8 @@ class SectionRanker:
             "job_context": task_info.get("task", "")
         }
 
-    def _assess_content_length(self, content_text: str) -> float:
+    def _assess_content_length(self, token_count: int) -> float:
         """Calculate score based on content length"""
-        token_count = len(content_text.split())
-        
         if token_count < 10:
             return 0.3  # Too short
         elif token_count < 50:
@@ -79,46 +182,38 @@ class SectionRanker:
         else:
             return 0.4  # Too long
 
-    def _compute_tfidf_relevance(self, content_text: str, context_info: Dict[str, Any]) -> float:
-        """Calculate TF-IDF based relevance score"""
+    def _compute_tfidf_relevance(self, corpus_index: CorpusIndex, context_info: Dict[str, Any]) -> List[float]:
+        """Calculate TF-IDF relevance of every indexed section to the context"""
         context_keywords = self._extract_context_keywords(
             context_info.get("persona_role", ""),
             context_info.get("job_context", "")
         )
         
         if not context_keywords:
-            return 0.5  # Default score if no context
-        
-        term_frequencies = self._calculate_word_frequencies(content_text)
-        word_total = len(content_text.lower().split())
+            return [0.5] * corpus_index.section_count  # Default score if no context
         
-        score_total = self._sum_keyword_scores(context_keywords, term_frequencies, word_total)
-        
-        return min(score_total, 1.0)
+        return [min(score, 1.0) for score in corpus_index.score_query(context_keywords)]
 
-    def _sum_keyword_scores(self, keywords: set, word_freq: Counter, total_count: int) -> float:
-        """Sum TF-IDF scores for all keywords"""
-        total_score = 0.0
-        for keyword in keywords:
-            if keyword in word_freq:
-                term_frequency = word_freq[keyword] / total_count
-                # Simple IDF approximation
-                inverse_doc_freq = math.log(1 + 1 / max(1, word_freq[keyword]))
-                total_score += term_frequency * inverse_doc_freq
+    def _compute_raw_tfidf_relevance(self, corpus_index: CorpusIndex, context_info: Dict[str, Any]) -> Optional[array]:
+        """Uncapped TF-IDF relevance of every section as a compact float array, or None without context"""
+        context_keywords = self._extract_context_keywords(
+            context_info.get("persona_role", ""),
+            context_info.get("job_context", "")
+        )
+        
+        if not context_keywords:
+            return None
         
-        return total_score
+        return corpus_index.score_query(context_keywords)
 
-    def _compute_final_score(self, doc_section: Dict[str, Any], context_data: Dict[str, Any]) -> float:
+    def _compute_final_score(self, doc_section: Dict[str, Any], semantic_score: float, token_count: int) -> float:
         """Calculate composite relevance score"""
         section_content = doc_section.get("content", "")
         if not section_content:
             return 0.0
         
-        # TF-IDF based scoring
-        semantic_score = self._compute_tfidf_relevance(section_content, context_data)
-        
         # Length penalty (very short or very long sections get lower scores)
-        length_weight = self._assess_content_length(section_content)
+        length_weight = self._assess_content_length(token_count)
         
         # Position bonus (earlier sections might be more important)
         position_weight = self._compute_position_weight(doc_section)
@@ -127,3 +222,19 @@ class SectionRanker:
         final_score = (0.6 * semantic_score + 0.3 * length_weight + 0.1 * position_weight)
         
         return min(final_score, 1.0)
+
+
+class _CountingIterator:
+    """Iterator wrapper counting how many items were consumed"""
+    
+    def __init__(self, iterable: Iterable[Any]):
+        self._iterator = iter(iterable)
+        self.count = 0
+    
+    def __iter__(self) -> "_CountingIterator":
+        return self
+    
+    def __next__(self) -> Any:
+        item = next(self._iterator)
+        self.count += 1
+        return item
@@ -0,0 +1,75 @@
+"""
+Section Record for Challenge 1B - Persona-Driven Document Intelligence
+Compact per-query view of a detected section that later stages fill in place.
+"""
+
+from typing import Dict, Any
+
+
+class SectionRecord:
+    """Persona and ranking fields of one section, layered over the shared detected-section dict"""
+
+    __slots__ = ("section", "document", "persona_relevance_score", "persona_insights", "key_concepts",
+                 "persona_priority", "job_alignment_score", "relevance_score")
+
+    # Keys served from the record's own slots; anything else is read from the section dict
+    FIELDS = __slots__[1:]
+
+    def __init__(self, section: Dict[str, Any]):
+        self.section = section  # never modified: it may be a pooled analysis shared by other queries
+
+    def __getitem__(self, key: str) -> Any:
+        """Allow dict-style access so callers can keep using section["section_title"]."""
+        # Both score names have always carried the same value
+        field_name = "relevance_score" if key == "final_relevance_score" else key
+        if field_name in self.FIELDS:
+            try:
+                return getattr(self, field_name)
+            except AttributeError:
+                pass  # unset: fall back to the section dict
+        return self.section[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Set a record field; the underlying section dict is read-only."""
+        if key == "final_relevance_score":
+            key = "relevance_score"
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, SectionRecord):
+            other = other.to_dict()
+        return isinstance(other, dict) and self.to_dict() == other
+
+    __hash__ = None  # mutable, like the dicts it replaces
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style get with a default."""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def copy(self) -> Dict[str, Any]:
+        """Plain dict copy, as dict.copy() gives for the sections records stand in for."""
+        return self.to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a plain dictionary merging the section with the record fields."""
+        section_dict = dict(self.section)
+        for field_name in self.FIELDS:
+            try:
+                section_dict[field_name] = getattr(self, field_name)
+            except AttributeError:
+                continue
+        if "relevance_score" in section_dict:
+            section_dict["final_relevance_score"] = section_dict["relevance_score"]
+        return section_dict
@@ -0,0 +1,201 @@
+"""
+Section Store for Challenge 1B - Persona-Driven Document Intelligence
+Persistent SQLite FTS5 index of detected sections for candidate retrieval.
+"""
+
+import os
+import sqlite3
+from typing import Dict, List, Any, Iterable, Optional
+
+from document_pool import DocumentPool
+from keyword_matcher import WORD_PATTERN
+
+
+SCHEMA_STATEMENTS = (
+    """CREATE TABLE IF NOT EXISTS documents (
+        document_id INTEGER PRIMARY KEY,
+        path TEXT UNIQUE NOT NULL,
+        filename TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        total_pages INTEGER NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS sections (
+        section_rowid INTEGER PRIMARY KEY,
+        document_id INTEGER NOT NULL REFERENCES documents(document_id) ON DELETE CASCADE,
+        section_id TEXT,
+        section_title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        page_number INTEGER NOT NULL,
+        detection_method TEXT,
+        confidence_score REAL,
+        word_count INTEGER
+    )""",
+    "CREATE INDEX IF NOT EXISTS sections_by_document ON sections(document_id)",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5(
+        section_title, content, content='sections', content_rowid='section_rowid'
+    )""",
+    # Keep the external-content FTS table in step with the sections table
+    """CREATE TRIGGER IF NOT EXISTS sections_after_insert AFTER INSERT ON sections BEGIN
+        INSERT INTO sections_fts(rowid, section_title, content)
+        VALUES (new.section_rowid, new.section_title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS sections_after_delete AFTER DELETE ON sections BEGIN
+        INSERT INTO sections_fts(sections_fts, rowid, section_title, content)
+        VALUES ('delete', old.section_rowid, old.section_title, old.content);
+    END""",
+)
+
+SECTION_COLUMNS = ("section_id", "section_title", "content", "page_number",
+                   "detection_method", "confidence_score", "word_count")
+
+
+class SectionStore:
+    """On-disk section index with incremental document add/remove and full-text retrieval"""
+
+    def __init__(self, database_path: str, document_pool: DocumentPool = None):
+        self.database_path = database_path
+        self.document_pool = document_pool or DocumentPool()
+        self.min_term_length = 3
+        self.connection = sqlite3.connect(database_path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        with self.connection:
+            for statement in SCHEMA_STATEMENTS:
+                self.connection.execute(statement)
+
+    def __enter__(self) -> "SectionStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def add_document(self, pdf_path: str) -> bool:
+        """
+        Index a PDF's sections, replacing any older version stored under the same path.
+
+        A document whose analysis failed is left out of the index, so the next sync retries it.
+
+        Returns:
+            True if the document was (re)indexed, False if it was already up to date or failed
+        """
+        document_path = os.path.realpath(pdf_path)
+        content_hash = self.document_pool.content_hash(pdf_path)
+        if self._stored_hash(document_path) == content_hash:
+            return False
+
+        document_analysis = self.document_pool.get_analysis(pdf_path)
+        with self.connection:
+            self.connection.execute("DELETE FROM documents WHERE path = ?", (document_path,))
+            if document_analysis["metadata"].get("error"):
+                return False  # storing the hash would mark a possibly transient failure as up to date
+            cursor = self.connection.execute(
+                "INSERT INTO documents (path, filename, content_hash, total_pages) VALUES (?, ?, ?, ?)",
+                (document_path, os.path.basename(pdf_path), content_hash,
+                 document_analysis["metadata"].get("total_pages", 0))
+            )
+            self.connection.executemany(
+                f"INSERT INTO sections (document_id, {', '.join(SECTION_COLUMNS)}) "
+                f"VALUES (?{', ?' * len(SECTION_COLUMNS)})",
+                (
+                    (cursor.lastrowid,) + tuple(section.get(column) for column in SECTION_COLUMNS)
+                    for section in document_analysis.get("sections", [])
+                )
+            )
+        return True
+
+    def remove_document(self, pdf_path: str) -> bool:
+        """Drop a document and its sections from the index; returns whether it was present."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM documents WHERE path = ?", (os.path.realpath(pdf_path),)
+            )
+        return cursor.rowcount > 0
+
+    def sync_documents(self, pdf_paths: Iterable[str]) -> Dict[str, int]:
+        """Index new or changed documents and report how many were added, unchanged and failed."""
+        sync_stats = {"documents_indexed": 0, "documents_unchanged": 0, "documents_failed": 0}
+        for pdf_path in pdf_paths:
+            if self.add_document(pdf_path):
+                sync_stats["documents_indexed"] += 1
+            elif self._stored_hash(os.path.realpath(pdf_path)) is None:
+                sync_stats["documents_failed"] += 1
+            else:
+                sync_stats["documents_unchanged"] += 1
+        return sync_stats
+
+    def _stored_hash(self, document_path: str) -> Optional[str]:
+        """Content hash recorded for an indexed path, or None if it is not indexed."""
+        stored_row = self.connection.execute(
+            "SELECT content_hash FROM documents WHERE path = ?", (document_path,)
+        ).fetchone()
+        return stored_row[0] if stored_row is not None else None
+
+    def list_documents(self) -> List[Dict[str, Any]]:
+        """Return the indexed documents with their section counts."""
+        rows = self.connection.execute(
+            """SELECT d.path, d.filename, d.content_hash, d.total_pages, COUNT(s.section_rowid)
+               FROM documents d LEFT JOIN sections s ON s.document_id = d.document_id
+               GROUP BY d.document_id ORDER BY d.path"""
+        ).fetchall()
+        return [
+            {"path": path, "filename": filename, "content_hash": content_hash,
+             "total_pages": total_pages, "section_count": section_count}
+            for path, filename, content_hash, total_pages, section_count in rows
+        ]
+
+    def search(self, persona_info: Dict[str, str], task_info: Dict[str, str],
+               pdf_paths: Optional[Iterable[str]] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        """
+        Retrieve candidate sections for a persona and job with one full-text query.
+
+        Args:
+            persona_info: Persona configuration with role description
+            task_info: Job-to-be-done specification
+            pdf_paths: Restrict retrieval to these documents (all indexed documents if None)
+            limit: Maximum number of candidates, best BM25 match first
+
+        Returns:
+            Section dicts in DocumentAnalyzer format, each with its "document" filename
+        """
+        match_expression = self._build_match_expression(
+            f"{persona_info.get('role', '')} {task_info.get('task', '')}"
+        )
+        selected_columns = ", ".join(f"s.{column}" for column in SECTION_COLUMNS)
+        query_parameters = []
+
+        if match_expression:
+            query = (f"SELECT d.filename, {selected_columns} FROM sections_fts "
+                     "JOIN sections s ON s.section_rowid = sections_fts.rowid "
+                     "JOIN documents d ON d.document_id = s.document_id "
+                     "WHERE sections_fts MATCH ?")
+            query_parameters.append(match_expression)
+        else:
+            query = (f"SELECT d.filename, {selected_columns} FROM sections s "
+                     "JOIN documents d ON d.document_id = s.document_id WHERE 1")
+
+        if pdf_paths is not None:
+            document_paths = [os.path.realpath(pdf_path) for pdf_path in pdf_paths]
+            query += f" AND d.path IN ({', '.join('?' * len(document_paths))})"
+            query_parameters.extend(document_paths)
+
+        query += " ORDER BY bm25(sections_fts)" if match_expression else " ORDER BY s.section_rowid"
+        query += " LIMIT ?"
+        query_parameters.append(limit)
+
+        candidate_sections = []
+        for row in self.connection.execute(query, query_parameters):
+            section = dict(zip(SECTION_COLUMNS, row[1:]))
+            section["document"] = row[0]
+            candidate_sections.append(section)
+        return candidate_sections
+
+    def _build_match_expression(self, query_text: str) -> str:
+        """OR together the distinct query words as quoted FTS5 terms."""
+        query_terms = dict.fromkeys(
+            term for term in WORD_PATTERN.findall(query_text.lower())
+            if len(term) >= self.min_term_length
+        )
+        return " OR ".join(f'"{term}"' for term in query_terms)
@@ -0,0 +1,133 @@
+"""
+Sentence Refiner for Challenge 1B - Persona-Driven Document Intelligence
+Extractive refined_text: the sentences of each top section most similar to the persona and job, within a character budget.
+"""
+
+import math
+import re
+import zlib
+from array import array
+from collections import Counter
+from operator import mul
+from typing import Dict, List, Any, Iterable
+
+from keyword_matcher import WORD_PATTERN
+
+# Sentence ends, and bullet characters that start list items in extracted PDF text
+SENTENCE_BREAK_PATTERN = re.compile(r'(?<=[.!?])\s+|\s*[•]\s*')
+
+
+class SentenceRefiner:
+    """Scores all sentences of a query's top sections in one sparse matrix-vector product"""
+
+    def __init__(self, char_budget: int = 300, feature_bits: int = 20, min_term_length: int = 3,
+                 max_cached_words: int = 200000):
+        """
+        Args:
+            char_budget: Maximum length of each refined text
+            feature_bits: Terms are hashed into 2 ** feature_bits columns
+            min_term_length: Shorter words are not used as terms
+            max_cached_words: Bound on the memoized word -> column map
+        """
+        self.char_budget = char_budget
+        self.feature_mask = (1 << feature_bits) - 1
+        self.min_term_length = min_term_length
+        self.max_cached_words = max_cached_words
+        self._word_columns = {}
+
+    def refine_sections(self, sections: Iterable[Dict[str, Any]], persona_info: Dict[str, str],
+                        task_info: Dict[str, str]) -> List[str]:
+        """
+        Select each section's sentences most similar to the persona and job.
+
+        Args:
+            sections: Ranked sections with their content
+            persona_info: Persona configuration with role description
+            task_info: Job-to-be-done specification
+
+        Returns:
+            One refined text per section, its chosen sentences in their original order
+        """
+        section_sentences = [self.split_sentences(section.get("content", "")) for section in sections]
+        sentences = [sentence for sentences in section_sentences for sentence in sentences]
+        sentence_scores = self.score_sentences(sentences, f"{persona_info.get('role', '')} {task_info.get('task', '')}")
+
+        refined_texts = []
+        sentence_offset = 0
+        for sentences_of_section in section_sentences:
+            scores = sentence_scores[sentence_offset:sentence_offset + len(sentences_of_section)]
+            refined_texts.append(self._select_sentences(sentences_of_section, scores))
+            sentence_offset += len(sentences_of_section)
+        return refined_texts
+
+    def split_sentences(self, text: str) -> List[str]:
+        """Split text into whitespace-normalized sentences and list items."""
+        return [" ".join(sentence.split()) for sentence in SENTENCE_BREAK_PATTERN.split(text) if sentence.strip()]
+
+    def score_sentences(self, sentences: List[str], query_text: str) -> array:
+        """
+        Similarity of every sentence to the query: TF-IDF dot product over the L2 norm of the sentence's term counts.
+
+        Sentences form a sparse sentence x hashed-term matrix stored by column. Only
+        the query's columns take part in the product, so only those are materialized,
+        and scoring is one pass over them.
+        """
+        query_counts = self._term_counts(query_text)
+        postings_sentences = {column: array('I') for column in query_counts}
+        postings_counts = {column: array('I') for column in query_counts}
+        squared_norms = array('d')
+        for sentence_index, sentence in enumerate(sentences):
+            term_counts = self._term_counts(sentence)
+            squared_norms.append(sum(map(mul, term_counts.values(), term_counts.values())))
+            for column in query_counts.keys() & term_counts.keys():
+                postings_sentences[column].append(sentence_index)
+                postings_counts[column].append(term_counts[column])
+
+        sentence_count = len(sentences)
+        sentence_scores = array('d', bytes(8 * sentence_count))
+        for column, query_count in query_counts.items():
+            indices = postings_sentences[column]
+            if not indices:
+                continue
+            idf = math.log((1 + sentence_count) / (1 + len(indices))) + 1.0
+            query_weight = query_count * idf * idf
+            for sentence_index, term_count in zip(indices, postings_counts[column]):
+                sentence_scores[sentence_index] += term_count * query_weight
+        for sentence_index in range(sentence_count):
+            if sentence_scores[sentence_index]:
+                sentence_scores[sentence_index] /= math.sqrt(squared_norms[sentence_index])
+        return sentence_scores
+
+    def _term_counts(self, text: str) -> Counter:
+        """Counts of a text's lowercase words by hashed column; CRC32 keeps columns stable across runs."""
+        words = WORD_PATTERN.findall(text.lower())
+        columns = list(map(self._word_columns.get, words))
+        if None in columns:
+            columns = [self._hash_word(word) if column is None else column for word, column in zip(words, columns)]
+        column_counts = Counter(columns)
+        column_counts.pop(-1, None)  # words too short to be terms
+        return column_counts
+
+    def _hash_word(self, word: str) -> int:
+        """Column of a word, or -1 if it is too short to be a term, memoized."""
+        if len(self._word_columns) >= self.max_cached_words:
+            self._word_columns.clear()
+        column = zlib.crc32(word.encode("utf-8")) & self.feature_mask if len(word) >= self.min_term_length else -1
+        self._word_columns[word] = column
+        return column
+
+    def _select_sentences(self, sentences: List[str], scores: array) -> str:
+        """Greedily take the best sentences that fit the budget, then restore their order."""
+        if not sentences:
+            return ""
+        best_first = sorted(range(len(sentences)), key=lambda sentence_index: (-scores[sentence_index], sentence_index))
+        chosen_indices = []
+        used_chars = 0
+        for sentence_index in best_first:
+            needed_chars = len(sentences[sentence_index]) + (1 if chosen_indices else 0)
+            if used_chars + needed_chars <= self.char_budget:
+                chosen_indices.append(sentence_index)
+                used_chars += needed_chars
+        if not chosen_indices:
+            return sentences[best_first[0]][:self.char_budget]  # no sentence fits: cut the best one
+        return " ".join(sentences[sentence_index] for sentence_index in sorted(chosen_indices))
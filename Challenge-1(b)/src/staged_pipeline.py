@@ -0,0 +1,172 @@
+"""
+Staged Pipeline for Challenge 1B - Persona-Driven Document Intelligence
+Producer/consumer stages connected by bounded queues, with per-stage utilization stats.
+"""
+
+import queue
+import threading
+import time
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+
+_STOP = object()  # end-of-stream marker, one per downstream worker
+
+
+class PipelineStage:
+    """One processing step served by a pool of worker threads"""
+
+    def __init__(self, name: str, handler: Callable[[Any], Optional[Any]], workers: int = 1,
+                 queue_size: int = 4):
+        """
+        Args:
+            name: Stage name used in stats
+            handler: Turns one input item into one output item, or None to forward nothing
+            workers: Worker threads serving the stage
+            queue_size: Capacity of the stage's input queue; a full queue blocks upstream
+        """
+        if workers < 1:
+            raise ValueError(f"Stage {name} needs at least one worker")
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.input_queue = queue.Queue(maxsize=queue_size)
+        self.items_processed = 0
+        self.busy_seconds = 0.0  # running the handler
+        self.idle_seconds = 0.0  # waiting for input
+        self.blocked_seconds = 0.0  # waiting for room downstream
+        self.max_queue_depth = 0
+        self._running_workers = workers
+        self._lock = threading.Lock()
+
+    def record(self, idle_seconds: float, busy_seconds: float, blocked_seconds: float, processed: bool) -> None:
+        """Fold one worker iteration into the stage totals."""
+        with self._lock:
+            self.idle_seconds += idle_seconds
+            self.busy_seconds += busy_seconds
+            self.blocked_seconds += blocked_seconds
+            self.items_processed += processed
+            self.max_queue_depth = max(self.max_queue_depth, self.input_queue.qsize())
+
+    def worker_finished(self) -> bool:
+        """Mark a worker as done; True for the last one."""
+        with self._lock:
+            self._running_workers -= 1
+            return self._running_workers == 0
+
+
+class StagedPipeline:
+    """Runs items through a chain of stages, overlapping the work of different stages"""
+
+    def __init__(self, stages: List[PipelineStage]):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.wall_seconds = 0.0
+        self.source_blocked_seconds = 0.0
+        self._results = []
+        self._errors = []
+        self._results_lock = threading.Lock()
+        self._failed = threading.Event()  # set by the first handler error: later items are discarded
+
+    def run(self, source_items: Iterable[Any]) -> List[Any]:
+        """
+        Feed items through every stage and wait for the pipeline to drain.
+
+        Returns:
+            Outputs of the last stage, in completion order
+
+        Raises:
+            The first exception raised by any handler; the pipeline stops taking new items
+            and discards the queued ones, so this is raised as soon as the stages have stopped
+        """
+        start = time.perf_counter()
+        worker_threads = [
+            threading.Thread(target=self._run_worker, args=(stage_position,),
+                             name=f"{stage.name}-{worker_index}", daemon=True)
+            for stage_position, stage in enumerate(self.stages)
+            for worker_index in range(stage.workers)
+        ]
+        for worker_thread in worker_threads:
+            worker_thread.start()
+
+        first_stage = self.stages[0]
+        for item in source_items:
+            if self._failed.is_set():
+                break
+            put_start = time.perf_counter()
+            first_stage.input_queue.put(item)
+            self.source_blocked_seconds += time.perf_counter() - put_start
+        for _ in range(first_stage.workers):
+            first_stage.input_queue.put(_STOP)
+
+        for worker_thread in worker_threads:
+            worker_thread.join()
+        self.wall_seconds = time.perf_counter() - start
+
+        if self._errors:
+            raise self._errors[0]
+        return self._results
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-stage throughput and utilization, naming the busiest stage as the bottleneck."""
+        stage_stats = {}
+        for stage in self.stages:
+            worker_seconds = stage.workers * self.wall_seconds
+            stage_stats[stage.name] = {
+                "workers": stage.workers,
+                "items": stage.items_processed,
+                "busy_seconds": round(stage.busy_seconds, 3),
+                "idle_seconds": round(stage.idle_seconds, 3),
+                "blocked_seconds": round(stage.blocked_seconds, 3),
+                "utilization": round(stage.busy_seconds / worker_seconds, 3) if worker_seconds else 0.0,
+                "max_queue_depth": stage.max_queue_depth
+            }
+        bottleneck = max(stage_stats, key=lambda name: stage_stats[name]["utilization"])
+        return {
+            "wall_seconds": round(self.wall_seconds, 3),
+            "source_blocked_seconds": round(self.source_blocked_seconds, 3),
+            "bottleneck": bottleneck,
+            "stages": stage_stats
+        }
+
+    def _run_worker(self, stage_position: int) -> None:
+        """Serve one stage until its end-of-stream marker arrives."""
+        stage = self.stages[stage_position]
+        next_stage = self.stages[stage_position + 1] if stage_position + 1 < len(self.stages) else None
+
+        while True:
+            wait_start = time.perf_counter()
+            item = stage.input_queue.get()
+            idle_seconds = time.perf_counter() - wait_start
+            if item is _STOP:
+                stage.record(idle_seconds, 0.0, 0.0, False)
+                break
+            if self._failed.is_set():
+                stage.record(idle_seconds, 0.0, 0.0, False)
+                continue  # keep draining so upstream never blocks
+
+            busy_start = time.perf_counter()
+            try:
+                output = stage.handler(item)
+            except Exception as error:
+                # Stop on the first error; run() re-raises it once the queues are drained
+                self._errors.append(error)
+                self._failed.set()
+                output = None
+            busy_seconds = time.perf_counter() - busy_start
+
+            blocked_seconds = 0.0
+            if output is not None:
+                if next_stage is not None:
+                    put_start = time.perf_counter()
+                    next_stage.input_queue.put(output)
+                    blocked_seconds = time.perf_counter() - put_start
+                else:
+                    with self._results_lock:
+                        self._results.append(output)
+            stage.record(idle_seconds, busy_seconds, blocked_seconds, True)
+
+        # The last worker out passes the end of the stream downstream
+        if stage.worker_finished() and next_stage is not None:
+            for _ in range(next_stage.workers):
+                next_stage.input_queue.put(_STOP)
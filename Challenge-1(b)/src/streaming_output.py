@@ -0,0 +1,121 @@
+"""
+Streaming Output for Challenge 1B - Persona-Driven Document Intelligence
+JSONL output written as documents finish, and a finalizer that assembles the schema JSON in bounded memory.
+"""
+
+import json
+import os
+from typing import Dict, Any, Iterator, Optional, TextIO
+
+# Record types, one JSON object per line; "record" is always the first key
+METADATA_RECORD = "metadata"
+DOCUMENT_RECORD = "document"
+SECTION_RECORD = "extracted_section"
+SUBSECTION_RECORD = "subsection_analysis"
+
+
+class StreamingOutputWriter:
+    """Appends a collection's output to a JSONL file one finished document at a time"""
+
+    def __init__(self, jsonl_path: str, metadata: Dict[str, Any]):
+        """
+        Args:
+            jsonl_path: File to write; replaced if it exists
+            metadata: Output metadata other than input_documents, which is built from document records
+        """
+        self.jsonl_path = jsonl_path
+        self.documents_written = 0
+        self._jsonl_file = open(jsonl_path, "w", encoding="utf-8")
+        self._write_record(METADATA_RECORD, {key: value for key, value in metadata.items() if key != "input_documents"})
+
+    def __enter__(self) -> "StreamingOutputWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write_document(self, document_output: Dict[str, Any]) -> None:
+        """
+        Write one document's share of the output and flush it to disk.
+
+        Args:
+            document_output: Output structure holding only this document's entries
+        """
+        for document_name in document_output["metadata"]["input_documents"]:
+            self._write_record(DOCUMENT_RECORD, {"filename": document_name})
+        for section in document_output["extracted_sections"]:
+            self._write_record(SECTION_RECORD, section)
+        for subsection in document_output["subsection_analysis"]:
+            self._write_record(SUBSECTION_RECORD, subsection)
+        self._jsonl_file.flush()
+        self.documents_written += 1
+
+    def close(self) -> None:
+        """Close the JSONL file."""
+        if not self._jsonl_file.closed:
+            self._jsonl_file.close()
+
+    def _write_record(self, record_type: str, fields: Dict[str, Any]) -> None:
+        """Write one record line."""
+        record = {"record": record_type}
+        record.update(fields)
+        self._jsonl_file.write(json.dumps(record) + "\n")
+
+
+def iter_jsonl_records(jsonl_path: str, record_type: str) -> Iterator[Dict[str, Any]]:
+    """Yield the fields of every record of one type, parsing only the matching lines."""
+    line_prefix = json.dumps({"record": record_type})[:-1]  # '{"record": "<type>"'
+    with open(jsonl_path, "r", encoding="utf-8") as jsonl_file:
+        for line in jsonl_file:
+            if line.startswith(line_prefix):
+                record = json.loads(line)
+                del record["record"]
+                yield record
+
+
+def finalize_output(jsonl_path: str, output_path: Optional[str] = None) -> str:
+    """
+    Assemble the schema output JSON from a JSONL file without loading all records.
+
+    Each array is streamed from its own pass over the JSONL file. The result is
+    byte-identical to json.dump(output, indent=2) of the same output.
+
+    Args:
+        jsonl_path: File written by StreamingOutputWriter
+        output_path: JSON file to write (jsonl_path with a .json suffix if None)
+
+    Returns:
+        Path of the written JSON file
+    """
+    if output_path is None:
+        output_path = os.path.splitext(jsonl_path)[0] + ".json"
+
+    metadata = {"input_documents": [record["filename"] for record in iter_jsonl_records(jsonl_path, DOCUMENT_RECORD)]}
+    for record in iter_jsonl_records(jsonl_path, METADATA_RECORD):
+        metadata.update(record)
+        break
+
+    temporary_path = f"{output_path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as output_file:
+        output_file.write('{\n  "metadata": ' + _indent_json(metadata, 2))
+        for key, record_type in (("extracted_sections", SECTION_RECORD), ("subsection_analysis", SUBSECTION_RECORD)):
+            output_file.write(f',\n  "{key}": ')
+            _write_json_array(output_file, iter_jsonl_records(jsonl_path, record_type), 2)
+        output_file.write("\n}")
+    os.replace(temporary_path, output_path)
+    return output_path
+
+
+def _indent_json(value: Any, level: int) -> str:
+    """Serialize a value with indent=2 as if nested level spaces deep."""
+    return json.dumps(value, indent=2).replace("\n", "\n" + " " * level)
+
+
+def _write_json_array(output_file: TextIO, items: Iterator[Any], level: int) -> None:
+    """Write an indent=2 JSON array item by item."""
+    item_indent = "\n" + " " * (level + 2)
+    wrote_item = False
+    for item in items:
+        output_file.write(("," if wrote_item else "[") + item_indent + _indent_json(item, level + 2))
+        wrote_item = True
+    output_file.write("\n" + " " * level + "]" if wrote_item else "[]")
@@ -1,14 +1,17 @@
 import fitz  # PyMuPDF
 
-def extract_text_from_pdf(file_path):
+def extract_text_from_pdf(file_path, pdf_bytes=None):
     """
-    Extracts text from each page of the given PDF.
+    Extracts text from each page of the given PDF, or from pdf_bytes if given.
 
     Returns a list of dictionaries containing:
     - page_number (starting from 1)
     - text (full page text)
     """
-    pdf_document = fitz.open(file_path)
+    if pdf_bytes is not None:
+        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+    else:
+        pdf_document = fitz.open(file_path)
     page_data = []
 
     for page_index in range(len(pdf_document)):
@@ -4,11 +4,25 @@ Schema validation script for Challenge 1B output
 Adobe India Hackathon 2025
 """
 
+import argparse
+import copy
 import json
+import multiprocessing
+import os
+import re
 import sys
+import time
+from collections import Counter, defaultdict
 from pathlib import Path
 import jsonschema
-from typing import List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+NO_SECTIONS_WARNING = "No sections or subsections found"
+UNSORTED_RANKS_WARNING = "Importance ranks are not sequential"
+STREAM_THRESHOLD_BYTES = 64 * 1024 * 1024
+STREAM_CHUNK_SIZE = 1024 * 1024
+# Array keywords that need the whole array at once, so such schemas are never streamed
+WHOLE_ARRAY_KEYWORDS = ("uniqueItems", "contains", "additionalItems")
 
 def color_text(message, text_color):
     colors = {
@@ -40,29 +54,47 @@ def load_schema() -> dict:
     except json.JSONDecodeError as error:
         print_schema_load_error(f"invalid JSON: {error}", schema_location)
 
-def check_sections_and_subsections(data_output: dict):
+def print_warning(message):
+    print(color_text(f"  Warning: {message}", "yellow"))
+
+def empty_output_warnings(section_count: int, subsection_count: int) -> List[str]:
+    if not section_count and not subsection_count:
+        return [NO_SECTIONS_WARNING]
+    return []
+
+def rank_order_warnings(rank_values: List[int]) -> List[str]:
+    if rank_values and rank_values != sorted(rank_values):
+        return [UNSORTED_RANKS_WARNING]
+    return []
+
+def check_sections_and_subsections(data_output: dict) -> List[str]:
     section_data = data_output.get('extracted_sections', [])
     subsection_data = data_output.get('subsection_analysis', [])
-    if not section_data and not subsection_data:
-        print(color_text("  Warning: No sections or subsections found", "yellow"))
+    return empty_output_warnings(len(section_data), len(subsection_data))
 
-def check_importance_ranks(section_list):
-    rank_values = [s.get('importance_rank', 0) for s in section_list]
-    if rank_values and rank_values != sorted(rank_values):
-        print(color_text("  Warning: Importance ranks are not sequential", "yellow"))
+def check_importance_ranks(section_list) -> List[str]:
+    return rank_order_warnings([s.get('importance_rank', 0) for s in section_list])
 
-def semantic_checks(data_output: dict):
-    check_sections_and_subsections(data_output)
+def collect_semantic_warnings(data_output: dict) -> List[str]:
+    warnings = check_sections_and_subsections(data_output)
     section_data = data_output.get('extracted_sections', [])
     if section_data:
-        check_importance_ranks(section_data)
+        warnings.extend(check_importance_ranks(section_data))
+    return warnings
+
+def semantic_checks(data_output: dict):
+    for warning in collect_semantic_warnings(data_output):
+        print_warning(warning)
+
+def format_validation_error(error, path_prefix=()) -> str:
+    return f"{error.message}\n      Path: {' -> '.join(str(p) for p in (*path_prefix, *error.path))}"
 
 def validate_json_schema(output_data: dict, schema: dict):
     try:
         jsonschema.validate(instance=output_data, schema=schema)
         return True, ""
     except jsonschema.ValidationError as e:
-        return False, f"{e.message}\n      Path: {' -> '.join(str(p) for p in e.path)}"
+        return False, format_validation_error(e)
 
 def validate_output_file(file_path: Path, schema: dict) -> bool:
     try:
@@ -84,6 +116,281 @@ def validate_output_file(file_path: Path, schema: dict) -> bool:
     print(color_text("  Perfect compliance!", "blue"))
     return True
 
+# ----------------- Bulk validation -----------------
+
+class CompiledSchema:
+    """Validators built once from the output schema, including per-item validators for streaming"""
+
+    def __init__(self, schema: dict):
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        self.validator = validator_class(schema)
+        self.item_validators = {}  # array property -> validator for its items
+        self.item_count_limits = {}  # array property -> (minItems, maxItems)
+        self.shell_validator = self._build_shell_validator(validator_class, schema)
+
+    def first_error(self, validator, instance, path_prefix=()) -> Optional[str]:
+        """Message of the error jsonschema.validate would raise, or None if the instance is valid."""
+        error = jsonschema.exceptions.best_match(validator.iter_errors(instance))
+        return format_validation_error(error, path_prefix) if error is not None else None
+
+    def _build_shell_validator(self, validator_class, schema: dict):
+        """
+        Validator for the top level with array properties emptied, so their items can
+        be checked one by one. None when the schema cannot be checked that way.
+        """
+        if schema.get("type") != "object" or "properties" not in schema:
+            return None
+        shell_schema = copy.deepcopy(schema)
+        for property_name, property_schema in shell_schema["properties"].items():
+            if not isinstance(property_schema, dict) or property_schema.get("type") != "array":
+                continue
+            if any(keyword in property_schema for keyword in WHOLE_ARRAY_KEYWORDS) or \
+                    not isinstance(property_schema.get("items", {}), dict):
+                return None
+            self.item_validators[property_name] = validator_class(property_schema.pop("items", {}))
+            self.item_count_limits[property_name] = (property_schema.pop("minItems", 0),
+                                                     property_schema.pop("maxItems", None))
+        return validator_class(shell_schema)
+
+class _ChunkedJsonReader:
+    """Decodes JSON values from a file one at a time, holding about one chunk in memory"""
+
+    _whitespace = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, file_handle, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.file_handle = file_handle
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.consumed = 0  # characters dropped from the front of the buffer
+        self.at_eof = False
+
+    @property
+    def offset(self) -> int:
+        """Character offset of the read position in the whole file."""
+        return self.consumed + self.position
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or "" at the end of the file."""
+        while True:
+            self.position = self._whitespace.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer) or not self._fill():
+                return self.buffer[self.position:self.position + 1]
+
+    def expect(self, character: str):
+        if self.peek() != character:
+            raise ValueError(f"Expected {character!r} at character {self.offset}")
+        self.position += 1
+
+    def decode_value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError as error:
+                if not self._fill():
+                    raise ValueError(f"{error.msg} (char {self.consumed + error.pos})") from None
+                continue
+            # A number ending exactly at the buffer end may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.position = end
+            return value
+
+    def _fill(self) -> bool:
+        """Drop consumed text and append the next chunk; False at the end of the file."""
+        if self.at_eof:
+            return False
+        chunk = self.file_handle.read(self.chunk_size)
+        if not chunk:
+            self.at_eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.consumed += self.position
+        self.position = 0
+        return True
+
+def iter_json_object_events(file_handle, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Tuple[str, str, Any]]:
+    """
+    Walk a top-level JSON object without loading it whole.
+
+    Yields ("member", key, value) for non-array members, and ("item", key, item)
+    for each element followed by ("array_end", key, count) for array members.
+    """
+    reader = _ChunkedJsonReader(file_handle, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.position += 1
+    else:
+        while True:
+            key = reader.decode_value()
+            if not isinstance(key, str):
+                raise ValueError(f"Expected an object key at character {reader.offset}")
+            reader.expect(":")
+            if reader.peek() == "[":
+                reader.position += 1
+                item_count = 0
+                if reader.peek() == "]":
+                    reader.position += 1
+                else:
+                    while True:
+                        yield "item", key, reader.decode_value()
+                        item_count += 1
+                        separator = reader.peek()
+                        reader.position += 1
+                        if separator == "]":
+                            break
+                        if separator != ",":
+                            raise ValueError(f"Expected ',' or ']' in {key!r} at character {reader.offset}")
+                yield "array_end", key, item_count
+            else:
+                yield "member", key, reader.decode_value()
+            separator = reader.peek()
+            reader.position += 1
+            if separator == "}":
+                break
+            if separator != ",":
+                raise ValueError(f"Expected ',' or '}}' at character {reader.offset}")
+    if reader.peek():
+        raise ValueError(f"Extra data after the JSON object at character {reader.offset}")
+
+def validate_streamed_output(file_handle, compiled: CompiledSchema) -> Tuple[Optional[str], List[str]]:
+    """Validate an output file item by item; returns (first schema error, semantic warnings)."""
+    shell = {}
+    array_counts = {}
+    rank_values = []
+    first_error = None
+
+    for event, key, value in iter_json_object_events(file_handle):
+        item_validator = compiled.item_validators.get(key)
+        if event == "member":
+            shell[key] = value
+        elif event == "item":
+            if item_validator is None:
+                shell.setdefault(key, []).append(value)  # not an array in the schema: keep it whole
+                continue
+            if first_error is None:
+                first_error = compiled.first_error(item_validator, value, (key, array_counts.get(key, 0)))
+            array_counts[key] = array_counts.get(key, 0) + 1
+            if key == 'extracted_sections' and isinstance(value, dict):
+                rank_values.append(value.get('importance_rank', 0))
+        elif item_validator is not None:
+            shell[key] = []
+        else:
+            shell.setdefault(key, [])
+
+    shell_error = compiled.first_error(compiled.shell_validator, shell)
+    if shell_error is not None:
+        return shell_error, []
+    if first_error is not None:
+        return first_error, []
+    for key, (min_items, max_items) in compiled.item_count_limits.items():
+        item_count = array_counts.get(key, 0)
+        if key in shell and (item_count < min_items or (max_items is not None and item_count > max_items)):
+            return f"{key} has {item_count} items, outside [{min_items}, {max_items}]\n      Path: {key}", []
+
+    warnings = empty_output_warnings(array_counts.get('extracted_sections', 0),
+                                     array_counts.get('subsection_analysis', 0))
+    warnings.extend(rank_order_warnings(rank_values))
+    return None, warnings
+
+_worker_schema = None
+
+def _init_bulk_worker(schema: dict):
+    global _worker_schema
+    _worker_schema = CompiledSchema(schema)
+
+def validate_output_file_bulk(file_path: Path, stream_threshold: int = STREAM_THRESHOLD_BYTES) -> Dict[str, Any]:
+    """Validate one file quietly with the worker's compiled schema and return the result."""
+    result = {"file": str(file_path), "valid": False, "error_type": None, "error": None,
+              "warnings": [], "streamed": False}
+    try:
+        streamed = os.path.getsize(file_path) > stream_threshold and _worker_schema.shell_validator is not None
+        with open(file_path, 'r', encoding='utf-8') as file_handle:
+            if streamed:
+                result["streamed"] = True
+                error_msg, warnings = validate_streamed_output(file_handle, _worker_schema)
+            else:
+                output_data = json.load(file_handle)
+                error_msg = _worker_schema.first_error(_worker_schema.validator, output_data)
+                warnings = collect_semantic_warnings(output_data) if error_msg is None else []
+    except FileNotFoundError:
+        result.update(error_type="missing", error="File not found")
+        return result
+    except ValueError as e:
+        result.update(error_type="json", error=f"Invalid JSON: {e}")
+        return result
+    except OSError as e:
+        # e.g. a directory matching an output pattern, or an unreadable file: one bad path must not end the run
+        result.update(error_type="io", error=f"Cannot read file: {e.strerror or e}")
+        return result
+
+    if error_msg is not None:
+        result.update(error_type="schema", error=error_msg)
+        return result
+    result.update(valid=True, warnings=warnings)
+    return result
+
+def validate_bulk(files: List[Path], schema: dict, workers: int = None,
+                  stream_threshold: int = STREAM_THRESHOLD_BYTES) -> List[Dict[str, Any]]:
+    """Validate many files across worker processes, each compiling the schema once."""
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files)))
+    arguments = [(file_path, stream_threshold) for file_path in files]
+    if workers == 1:
+        _init_bulk_worker(schema)
+        return [validate_output_file_bulk(*argument) for argument in arguments]
+    chunk_size = max(1, min(64, len(files) // (workers * 4)))
+    with multiprocessing.Pool(workers, initializer=_init_bulk_worker, initargs=(schema,)) as pool:
+        return pool.starmap(validate_output_file_bulk, arguments, chunksize=chunk_size)
+
+def build_bulk_report(results: List[Dict[str, Any]], elapsed: float, workers: int) -> Dict[str, Any]:
+    """Aggregate per-file results into one report, grouping identical errors and warnings."""
+    error_groups = defaultdict(list)
+    for result in results:
+        if not result["valid"]:
+            first_line = result["error"].split("\n")[0]
+            error_groups[(result["error_type"], first_line)].append(result["file"])
+    warning_counts = Counter(warning for result in results for warning in result["warnings"])
+    valid_count = sum(result["valid"] for result in results)
+    return {
+        "total_files": len(results),
+        "valid_files": valid_count,
+        "invalid_files": len(results) - valid_count,
+        "streamed_files": sum(result["streamed"] for result in results),
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "files_per_second": round(len(results) / elapsed, 1) if elapsed else None,
+        "errors": [
+            {"type": error_type, "message": message, "count": len(error_files), "files": error_files}
+            for (error_type, message), error_files in sorted(error_groups.items(), key=lambda group: -len(group[1]))
+        ],
+        "semantic_warnings": dict(warning_counts)
+    }
+
+def print_bulk_report(report: Dict[str, Any], examples: int = 3):
+    print("\n" + "=" * 40)
+    print(color_text("Bulk Validation Report:", "blue"))
+    print(f"   Files: {report['total_files']} in {report['seconds']} s "
+          f"({report['files_per_second']} files/s, {report['workers']} worker(s), {report['streamed_files']} streamed)")
+    valid_text = f"{report['valid_files']}/{report['total_files']}"
+    print(f"   Valid files: {color_text(valid_text, 'green' if not report['invalid_files'] else 'yellow')}")
+    for error_group in report["errors"]:
+        print(color_text(f"   {error_group['count']} x {error_group['type']} error: {error_group['message']}", "red"))
+        for file_name in error_group["files"][:examples]:
+            print(f"      {file_name}")
+        if error_group["count"] > examples:
+            print(f"      ... and {error_group['count'] - examples} more")
+    for warning, warning_count in report["semantic_warnings"].items():
+        print(color_text(f"   {warning_count} x Warning: {warning}", "yellow"))
+    if not report["invalid_files"]:
+        print(color_text("   All files passed validation!", "green"))
+
+def is_schema_file(path: Path) -> bool:
+    """Schema files match the output patterns too (challenge1b_output_schema.json) but are never outputs."""
+    return path.name.endswith("_schema.json") or path.resolve() == get_schema_path().resolve()
+
 def get_output_patterns() -> List[str]:
     return [
         "challenge1b_output*.json",
@@ -94,7 +401,7 @@ def get_output_patterns() -> List[str]:
 def find_output_files(directory: Path) -> List[Path]:
     files = []
     for pattern in get_output_patterns():
-        files.extend(directory.glob(pattern))
+        files.extend(path for path in directory.glob(pattern) if not is_schema_file(path))
     return sorted(set(files))
 
 def print_summary(valid_files, total_files):
@@ -106,25 +413,59 @@ def print_summary(valid_files, total_files):
     else:
         print(color_text(f"   {total_files - valid_files} file(s) failed validation", "yellow"))
 
-def get_files_to_validate(argv, output_dir: Path) -> List[Path]:
-    if len(argv) > 1:
-        return [Path(arg) for arg in argv[1:]]
-    return find_output_files(output_dir)
+def get_files_to_validate(file_arguments, output_dir: Path, recursive: bool = False) -> List[Path]:
+    if not file_arguments:
+        return find_output_files(output_dir)
+    files = []
+    for file_argument in map(Path, file_arguments):
+        if recursive and file_argument.is_dir():
+            files.extend(sorted({path for pattern in get_output_patterns() for path in file_argument.rglob(pattern)
+                                 if not is_schema_file(path)}))
+        else:
+            files.append(file_argument)
+    return files
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Challenge 1B output validator")
+    parser.add_argument("files", nargs="*", help="output files to validate (default: output/)")
+    parser.add_argument("--bulk", action="store_true",
+                        help="validate quietly across processes and print one aggregated report; "
+                             "directories are searched recursively")
+    parser.add_argument("--workers", type=int, help="bulk worker processes (default: CPU count)")
+    parser.add_argument("--stream-threshold-mb", type=float, default=STREAM_THRESHOLD_BYTES / (1024 * 1024),
+                        help="bulk mode streams files larger than this instead of loading them (default: 64)")
+    parser.add_argument("--report", metavar="PATH", help="also write the bulk report as JSON")
+    return parser.parse_args(argv)
 
-def main():
+def run_bulk(files: List[Path], schema: dict, arguments) -> int:
+    workers = max(1, min(arguments.workers or os.cpu_count() or 1, len(files)))
+    start = time.perf_counter()
+    results = validate_bulk(files, schema, workers, int(arguments.stream_threshold_mb * 1024 * 1024))
+    report = build_bulk_report(results, time.perf_counter() - start, workers)
+    print_bulk_report(report)
+    if arguments.report:
+        with open(arguments.report, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2)
+    return 0 if not report["invalid_files"] else 1
+
+def main(argv=None):
+    arguments = parse_arguments(argv)
     print(color_text("Challenge 1B Output Validator", "blue"))
     print("=" * 40)
     schema = load_schema()
     print(color_text("Schema loaded successfully", "green"))
 
     output_dir = Path(__file__).parent / "output"
-    files_to_validate = get_files_to_validate(sys.argv, output_dir)
+    files_to_validate = get_files_to_validate(arguments.files, output_dir, recursive=arguments.bulk)
 
     if not files_to_validate:
         print(color_text("No output files found to validate", "red"))
         return 1
 
     print(color_text(f"Found {len(files_to_validate)} output file(s)", "blue"))
+    if arguments.bulk:
+        return run_bulk(files_to_validate, schema, arguments)
+
     valid_files = 0
     total_files = len(files_to_validate)
 